@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 
+from matplotlib.colors import LogNorm
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
 
@@ -19,6 +21,27 @@ class NumericalVsNumericalAnalysis(BivariateAnalysisStrategy):
         plt.ylabel(feature2)
         plt.show()
 
+class DensityNumericalVsNumericalAnalysis(BivariateAnalysisStrategy):
+    def __init__(self, bins=100):
+        """bins: số ô mỗi chiều của lưới 2D, chi phí vẽ chỉ phụ thuộc bins x bins"""
+        self.bins = bins
+
+    def analyze(self, df: pd.DataFrame, feature1: str, feature2: str):
+        """Thay scatter plot bằng biểu đồ mật độ 2D (np.histogram2d) -> không vẽ từng điểm"""
+        x = df[feature1].to_numpy(dtype=float)
+        y = df[feature2].to_numpy(dtype=float)
+        valid = ~(np.isnan(x) | np.isnan(y))
+        counts, x_edges, y_edges = np.histogram2d(x[valid], y[valid], bins=self.bins)
+
+        plt.figure(figsize=(10, 6))
+        """Ô trống (count = 0) bị che đi, thang màu log để thấy được cả vùng thưa"""
+        plt.pcolormesh(x_edges, y_edges, np.ma.masked_equal(counts.T, 0), cmap="viridis", norm=LogNorm())
+        plt.colorbar(label="Số dòng")
+        plt.title(f"{feature1} vs {feature2} (density, {int(valid.sum())} rows)")
+        plt.xlabel(feature1)
+        plt.ylabel(feature2)
+        plt.show()
+
 class CategoricalVsNumericalAnalysis(BivariateAnalysisStrategy):
     def analyze(self, df: pd.DataFrame, feature1: str, feature2: str):
         """Sử dụng biểu đồ box plot"""
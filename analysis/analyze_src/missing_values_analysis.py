@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
 
@@ -37,5 +38,43 @@ class SimpleMissingValuesAnalysis(MissingValuesAnalysisTemplate):
         plt.title("Missing Values Heatmap")
         plt.show()
     
+class ScalableMissingValuesAnalysis(MissingValuesAnalysisTemplate):
+    def __init__(self, n_blocks=200):
+        """n_blocks: số khối dòng trên trục dọc của heatmap, cố định bất kể số dòng của df"""
+        self.n_blocks = n_blocks
+
+    def identity_missing_values(self, df: pd.DataFrame):
+        """In ra số và tỉ lệ giá trị missing của các cột (tính từng cột, không dựng ma trận isnull đầy đủ)"""
+        print("\nSố giá trị bị thiếu của cột:")
+        missing_value = pd.Series({col: int(df[col].isna().sum()) for col in df.columns})
+        missing_value = missing_value[missing_value > 0].sort_values(ascending=False)
+        print(pd.DataFrame({"missing": missing_value, "ratio": missing_value / len(df)}))
+
+    def missing_block_matrix(self, df: pd.DataFrame) -> np.ndarray:
+        """Ma trận (n_blocks x n_cột): tỉ lệ missing của mỗi cột trong từng khối dòng liên tiếp"""
+        n_blocks = max(1, min(self.n_blocks, len(df)))
+        starts = np.linspace(0, len(df), n_blocks + 1).astype(int)[:-1]
+        sizes = np.diff(np.append(starts, len(df)))
+        matrix = np.empty((n_blocks, df.shape[1]), dtype=np.float32)
+        for j, col in enumerate(df.columns):
+            matrix[:, j] = np.add.reduceat(df[col].isna().to_numpy(), starts, dtype=np.int64) / sizes
+        return matrix
+
+    def visualize_missing_values(self, df: pd.DataFrame):
+        """Vẽ heatmap tỉ lệ missing theo khối dòng -> số ô cần vẽ không phụ thuộc số dòng"""
+        print("\n Vẽ biểu đồ HeatMap giá trị bị thiếu theo khối dòng....")
+        if len(df) == 0:
+            print("DataFrame rỗng, không có gì để vẽ.")
+            return
+        matrix = self.missing_block_matrix(df)
+        plt.figure(figsize=(12, 8))
+        plt.imshow(matrix, aspect="auto", interpolation="nearest", cmap="viridis", vmin=0, vmax=1)
+        plt.colorbar(label="Tỉ lệ missing trong khối")
+        plt.xticks(range(df.shape[1]), df.columns, rotation=90, fontsize=6)
+        plt.ylabel(f"Khối dòng (~{len(df) // matrix.shape[0]} dòng/khối)")
+        plt.title("Missing Values Heatmap (block-aggregated)")
+        plt.tight_layout()
+        plt.show()
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
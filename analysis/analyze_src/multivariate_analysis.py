@@ -1,6 +1,9 @@
 from abc import ABC, abstractmethod
+import hashlib
+import os
 
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
 
@@ -31,5 +34,101 @@ class SimpleMultivariateAnalysis(MultivariateAnalysisTemplate):
         plt.suptitle("Pair Plot of Selected Features",y=1.02)
         plt.show()
 
+def reservoir_sample(df: pd.DataFrame, k: int, chunk_size=100_000, random_state=42) -> pd.DataFrame:
+    """Lấy mẫu đều k dòng khi duyệt df theo từng chunk (bottom-k theo khóa ngẫu nhiên,
+    tương đương reservoir sampling) -> bộ nhớ chỉ giữ k dòng + 1 chunk."""
+    if len(df) <= k:
+        return df
+    rng = np.random.default_rng(random_state)
+    keep_keys = np.empty(0)
+    keep_rows = np.empty(0, dtype=np.int64)
+    for start in range(0, len(df), chunk_size):
+        stop = min(start + chunk_size, len(df))
+        keys = np.concatenate([keep_keys, rng.random(stop - start)])
+        rows = np.concatenate([keep_rows, np.arange(start, stop)])
+        if len(keys) > k:
+            selected = np.argpartition(keys, k)[:k]
+            keys, rows = keys[selected], rows[selected]
+        keep_keys, keep_rows = keys, rows
+    return df.iloc[np.sort(keep_rows)]
+
+def chunked_correlation(df: pd.DataFrame, chunk_size=100_000) -> pd.DataFrame:
+    """Ma trận tương quan Pearson (pairwise bỏ NaN như df.corr()) tính dồn theo từng chunk dòng:
+    mỗi chunk chỉ cộng dồn vài ma trận p x p (số dòng đủ, tổng, tổng bình phương, tích chéo)."""
+    columns = df.columns
+    p = len(columns)
+    n = np.zeros((p, p))
+    sum_x = np.zeros((p, p))
+    sum_xx = np.zeros((p, p))
+    sum_xy = np.zeros((p, p))
+    for start in range(0, len(df), chunk_size):
+        values = df.iloc[start:start + chunk_size].to_numpy(dtype=np.float64)
+        mask = ~np.isnan(values)
+        x = np.where(mask, values, 0.0)
+        m = mask.astype(np.float64)
+        n += m.T @ m
+        sum_x += x.T @ m            # sum_x[i, j] = tổng x_i trên các dòng mà x_j không NaN
+        sum_xx += (x * x).T @ m
+        sum_xy += x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sum_xy - sum_x * sum_x.T
+        var = (n * sum_xx - sum_x ** 2) * (n * sum_xx - sum_x ** 2).T
+        corr = cov / np.sqrt(var)
+    corr = np.clip(corr, -1.0, 1.0)
+    corr[n < 2] = np.nan
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+class ScalableMultivariateAnalysis(MultivariateAnalysisTemplate):
+    """Ma trận tương quan tính theo chunk và được cache, pairplot vẽ trên mẫu reservoir cố định."""
+    _corr_cache = {}
+
+    def __init__(self, sample_size=5_000, max_features=8, chunk_size=100_000, cache_dir=None, random_state=42):
+        self.sample_size = sample_size
+        self.max_features = max_features
+        self.chunk_size = chunk_size
+        self.cache_dir = cache_dir
+        self.random_state = random_state
+
+    def _fingerprint(self, df: pd.DataFrame) -> str:
+        """Khóa cache: tên cột, số dòng và hash nội dung của từng cột"""
+        digest = hashlib.sha1(str((list(df.columns), df.shape)).encode())
+        for start in range(0, len(df), self.chunk_size):
+            digest.update(pd.util.hash_pandas_object(df.iloc[start:start + self.chunk_size], index=False).to_numpy().tobytes())
+        return digest.hexdigest()
+
+    def correlation(self, df: pd.DataFrame) -> pd.DataFrame:
+        numeric_df = df.select_dtypes(include="number")
+        key = self._fingerprint(numeric_df)
+        if key in self._corr_cache:
+            return self._corr_cache[key]
+
+        cache_path = os.path.join(self.cache_dir, f"corr_{key}.pkl") if self.cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            corr = pd.read_pickle(cache_path)
+        else:
+            corr = chunked_correlation(numeric_df, self.chunk_size)
+            if cache_path:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                corr.to_pickle(cache_path)
+        self._corr_cache[key] = corr
+        return corr
+
+    def visualization_heatmap(self, df: pd.DataFrame):
+        """Hiển thị ma trận tương quan (chỉ ghi số lên ô khi ma trận nhỏ)"""
+        corr = self.correlation(df)
+        plt.figure(figsize=(12, 10))
+        sns.heatmap(corr, annot=len(corr) <= 20, fmt=".2f", cmap="coolwarm", linewidths=0.5 if len(corr) <= 20 else 0)
+        plt.title("Correlation Heatmap (chunked)")
+        plt.show()
+
+    def visualization_matrix(self, df: pd.DataFrame):
+        """Pairplot trên tối đa sample_size dòng và max_features cột số"""
+        numeric_df = df.select_dtypes(include="number")
+        columns = numeric_df.columns[:self.max_features]
+        sample = reservoir_sample(numeric_df[columns], self.sample_size, self.chunk_size, self.random_state)
+        sns.pairplot(sample, plot_kws={"s": 5, "alpha": 0.5})
+        plt.suptitle(f"Pair Plot of Selected Features ({len(sample)} sampled rows)", y=1.02)
+        plt.show()
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
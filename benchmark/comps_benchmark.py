@@ -0,0 +1,80 @@
+"""Độ trễ truy vấn comps theo số giao dịch trong index: vét cạn theo block (float32 matmul) vs BallTree.
+
+Cách chạy (từ thư mục gốc dự án):
+    python -m benchmark.comps_benchmark --sizes 3000,30000,300000 --queries 1000 --k 5
+
+Index dựng trên Ames sau OneHotEncoding nhân bản tới từng kích thước (cộng nhiễu nhỏ để các bản sao không
+trùng nhau). Index vét cạn được lưu ra thư mục tạm rồi load memory-map như lúc scoring.
+BallTree (sklearn, cùng feature đã chuẩn hóa) chỉ chạy tới --max-tree-size vì dựng cây chậm ở kích thước lớn.
+"""
+import logging
+import tempfile
+import time
+
+import click
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from benchmark.materializer_benchmark import build_encoded_frame
+from pipeline.training_pipeline import DATA_PATH
+from src.comps_index import CompsIndex
+
+
+def scaled_frame(df: pd.DataFrame, n_rows: int, rng: np.random.Generator) -> pd.DataFrame:
+    repeated = df.iloc[np.arange(n_rows) % len(df)].reset_index(drop=True)
+    features = repeated.columns.difference(["Order", "PID", "SalePrice"])
+    noise = rng.normal(0, 0.01, size=(n_rows, len(features))) * repeated[features].std().to_numpy()
+    repeated[features] = repeated[features].to_numpy(dtype=np.float64) + noise
+    repeated["PID"] = np.arange(n_rows)
+    return repeated
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset gốc.")
+@click.option("--sizes", default="3000,30000,300000", help="Số giao dịch trong index, cách nhau bởi dấu phẩy.")
+@click.option("--queries", "n_queries", default=1000, help="Số căn truy vấn mỗi batch.")
+@click.option("--k", default=5, help="Số comps mỗi căn.")
+@click.option("--max-tree-size", default=30000, help="Kích thước lớn nhất chạy BallTree.")
+def main(file_path: str, sizes: str, n_queries: int, k: int, max_tree_size: int):
+    logging.disable(logging.WARNING)
+    rng = np.random.default_rng(0)
+    df = build_encoded_frame(file_path).select_dtypes("number")
+    queries = df.sample(n_queries, replace=len(df) < n_queries, random_state=0)
+
+    rows = []
+    for n_rows in [int(size) for size in sizes.split(",")]:
+        frame = scaled_frame(df, n_rows, rng)
+        with tempfile.TemporaryDirectory() as directory:
+            start = time.perf_counter()
+            index = CompsIndex().fit(frame).save(directory)
+            build = time.perf_counter() - start
+            brute = best_of(lambda: index.query(queries, k))
+            rows.append({"n_sales": n_rows, "method": "blocked matmul (memmap)", "build_s": build,
+                         "batch_ms": brute * 1e3, "us/query": brute / n_queries * 1e6})
+
+            if n_rows <= max_tree_size:
+                start = time.perf_counter()
+                tree = BallTree(np.asarray(index.matrix_))
+                build = time.perf_counter() - start
+                scaled_queries = index.transform(queries)
+                tree_time = best_of(lambda: tree.query(scaled_queries, k=k), repeat=1)
+                rows.append({"n_sales": n_rows, "method": "BallTree", "build_s": build,
+                             "batch_ms": tree_time * 1e3, "us/query": tree_time / n_queries * 1e6})
+            del index
+
+    print(f"{n_queries} truy vấn/batch, k = {k}, {len(df.columns) - 3} feature")
+    print(pd.DataFrame(rows).to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
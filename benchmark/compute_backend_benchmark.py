@@ -0,0 +1,90 @@
+"""Thời gian tiền xử lý của ml_pipeline theo compute backend: pandas vs Arrow (pyarrow.compute).
+
+Cách chạy (từ thư mục gốc dự án):
+    python -m benchmark.compute_backend_benchmark --scale 1 --scale 10 --scale 50
+
+Ames được nhân bản `scale` lần và ghi ra 1 file CSV tạm. Mỗi backend chạy cùng 1 chuỗi bước như ml_pipeline:
+đọc CSV -> điền mean -> điền "Missing" -> OneHot -> log1p -> lọc outlier z-score -> TrainingMatrix.
+Backend Arrow giữ dữ liệu trong pa.Table từ lúc đọc tới lúc bàn giao ma trận, không đi qua cột object của pandas.
+"""
+import logging
+import os
+import tempfile
+import time
+
+import click
+import pandas as pd
+import pyarrow.compute as pc
+
+from pipeline.training_pipeline import DATA_PATH
+from src.compute_backend import get_backend, numeric_columns, read_arrow
+from src.data_ingestion import read_shard
+from src.data_splitter import TrainingMatrix
+from src.feature_engineering import FeatureEngineer, LogTransformation, OneHotEncoding
+from src.handle_missing_values import FillMissingValuesStrategy, MissingValueHandler
+from src.outlier_detection import OutlierDetector, ZScoreOutlierDetection
+
+TARGET_COLUMN = "SalePrice"
+LOG_FEATURES = ["Gr Liv Area", "SalePrice"]
+STAGES = ["ingest", "fill_mean", "fill_constant", "one_hot", "log", "outlier", "handoff"]
+
+
+def continuous_columns(data) -> list:
+    """Cột số có > 2 giá trị khác nhau (như outlier_detection_step, bỏ qua cột OHE 0/1)"""
+    if isinstance(data, pd.DataFrame):
+        numeric = data.select_dtypes(include=["number"])
+        return numeric.columns[numeric.nunique().to_numpy() > 2].tolist()
+    return [col for col in numeric_columns(data) if pc.count_distinct(data[col]).as_py() > 2]
+
+
+def run_chain(csv_path: str, backend: str) -> tuple:
+    """Chạy chuỗi tiền xử lý với backend; trả về (đầu ra từng bước, thời gian từng bước)"""
+    compute = get_backend(backend)
+    stages = {
+        "ingest": lambda _: read_arrow(csv_path) if compute.name == "arrow" else pd.read_csv(csv_path),
+        "fill_mean": MissingValueHandler(FillMissingValuesStrategy(method="mean"), backend=compute).handle_missing_value,
+        "fill_constant": MissingValueHandler(FillMissingValuesStrategy(method="constant", fill_value="Missing"),
+                                             backend=compute).handle_missing_value,
+        "one_hot": FeatureEngineer(OneHotEncoding([]), backend=compute).apply_Transform,
+        "log": FeatureEngineer(LogTransformation(LOG_FEATURES), backend=compute).apply_Transform,
+        "outlier": lambda data: compute.remove_rows(data, OutlierDetector(ZScoreOutlierDetection(threshold=3), backend=compute)
+                                                    .detected_outlier(data.select(continuous_columns(data)) if compute.name == "arrow"
+                                                                      else data[continuous_columns(data)])),
+        "handoff": lambda data: TrainingMatrix.from_arrow(data, TARGET_COLUMN) if compute.name == "arrow"
+                   else TrainingMatrix.from_frame(data.drop(columns=[TARGET_COLUMN]), data[TARGET_COLUMN]),
+    }
+    outputs, timings, data = {}, {}, None
+    for stage in STAGES:
+        start = time.perf_counter()
+        data = stages[stage](data)
+        timings[stage] = time.perf_counter() - start
+        outputs[stage] = data
+    return outputs, timings
+
+
+def write_scaled_csv(file_path: str, scale: int, directory: str) -> str:
+    base = read_shard(file_path)
+    path = os.path.join(directory, f"ames_x{scale}.csv")
+    pd.concat([base] * scale, ignore_index=True).to_csv(path, index=False)
+    return path
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset gốc.")
+@click.option("--scale", "scales", multiple=True, default=[1, 10], type=int, help="Số lần nhân bản dataset.")
+def main(file_path: str, scales):
+    logging.disable(logging.WARNING)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            csv_path = write_scaled_csv(file_path, scale, directory)
+            for backend in ("pandas", "arrow"):
+                outputs, timings = run_chain(csv_path, backend)
+                rows.append({"scale": scale, "backend": backend, "rows": len(outputs["handoff"]), **timings,
+                             "total": sum(timings.values())})
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format="%.3f"))
+
+
+if __name__ == "__main__":
+    main()
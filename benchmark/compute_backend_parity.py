@@ -0,0 +1,99 @@
+"""Kiểm tra tương đương giữa PandasBackend và ArrowBackend trên từng bước tiền xử lý.
+
+Cách chạy (từ thư mục gốc dự án):
+    python -m benchmark.compute_backend_parity --scale 1 --scale 5
+
+Mỗi bước của chuỗi ml_pipeline (xem compute_backend_benchmark.run_chain) và từng strategy lẻ
+(median, mode, StandardScaling, MinMaxScaling, IQR, cap) được chạy trên cả 2 backend; kết quả Arrow đổi sang pandas
+rồi so với kết quả pandas: cùng tên + thứ tự cột, cùng số dòng, giá trị số lệch <= atol/rtol, giá trị chuỗi bằng nhau.
+Thoát với mã 1 nếu có bước không khớp.
+"""
+import logging
+import sys
+import tempfile
+
+import click
+import numpy as np
+import pandas as pd
+
+from benchmark.compute_backend_benchmark import STAGES, continuous_columns, run_chain, write_scaled_csv
+from pipeline.training_pipeline import DATA_PATH
+from src.compute_backend import ArrowBackend, PandasBackend
+from src.feature_engineering import MinMaxScaling, StandardScaling
+from src.handle_missing_values import FillMissingValuesStrategy
+from src.outlier_detection import IQROutlierDetection
+
+
+def compare_frames(expected: pd.DataFrame, actual: pd.DataFrame, rtol=1e-9, atol=1e-9) -> str:
+    """Chuỗi rỗng nếu khớp, ngược lại mô tả chỗ khác đầu tiên"""
+    if expected.columns.tolist() != actual.columns.tolist():
+        missing = [col for col in expected.columns if col not in actual.columns][:5]
+        extra = [col for col in actual.columns if col not in expected.columns][:5]
+        return f"khác cột (thiếu {missing}, thừa {extra}, hoặc khác thứ tự)"
+    if len(expected) != len(actual):
+        return f"khác số dòng: {len(expected)} vs {len(actual)}"
+    for col in expected.columns:
+        left, right = expected[col].reset_index(drop=True), actual[col].reset_index(drop=True)
+        if pd.api.types.is_numeric_dtype(left) or pd.api.types.is_bool_dtype(left):
+            if not np.allclose(left.to_numpy(dtype=np.float64), right.to_numpy(dtype=np.float64),
+                               rtol=rtol, atol=atol, equal_nan=True):
+                return f"cột '{col}' lệch giá trị số"
+        elif not left.fillna("<null>").astype(str).equals(right.fillna("<null>").astype(str)):
+            return f"cột '{col}' khác giá trị chuỗi"
+    return ""
+
+
+def compare_matrices(expected, actual) -> str:
+    if expected.columns != actual.columns:
+        return "khác cột của TrainingMatrix"
+    if expected.shape != actual.shape or not np.array_equal(expected.X, actual.X) or not np.array_equal(expected.y, actual.y):
+        return f"khác giá trị TrainingMatrix {expected.shape} vs {actual.shape}"
+    return ""
+
+
+def strategy_cases(numeric: pd.DataFrame):
+    """(tên, hàm(backend, data)) cho các strategy không nằm trong chuỗi ml_pipeline"""
+    columns = numeric.columns[:10].tolist()
+    return [
+        ("fill_median", lambda b, d: b.handle_missing(FillMissingValuesStrategy(method="median"), d)),
+        ("fill_mode", lambda b, d: b.handle_missing(FillMissingValuesStrategy(method="mode"), d)),
+        ("standard_scaling", lambda b, d: b.transform(StandardScaling(columns), b.handle_missing(FillMissingValuesStrategy(), d))),
+        ("minmax_scaling", lambda b, d: b.transform(MinMaxScaling(columns), d)),
+        ("iqr_outlier", lambda b, d: b.detect_outliers(IQROutlierDetection(), d)),
+        ("cap", lambda b, d: b.cap(b.handle_missing(FillMissingValuesStrategy(), d), 0.01, 0.99)),
+    ]
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset gốc.")
+@click.option("--scale", "scales", multiple=True, default=[1], type=int, help="Số lần nhân bản dataset.")
+def main(file_path: str, scales):
+    logging.disable(logging.WARNING)
+    pandas_backend, arrow_backend = PandasBackend(), ArrowBackend()
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            csv_path = write_scaled_csv(file_path, scale, directory)
+            expected, _ = run_chain(csv_path, "pandas")
+            actual, _ = run_chain(csv_path, "arrow")
+            for stage in STAGES:
+                if stage == "handoff":
+                    problem = compare_matrices(expected[stage], actual[stage])
+                else:
+                    problem = compare_frames(expected[stage], arrow_backend.to_pandas(actual[stage]))
+                results.append({"scale": scale, "check": stage, "ok": not problem, "detail": problem})
+
+            raw = expected["ingest"]
+            numeric = raw[continuous_columns(raw)]
+            for name, run in strategy_cases(numeric):
+                problem = compare_frames(run(pandas_backend, numeric),
+                                         arrow_backend.to_pandas(run(arrow_backend, arrow_backend.from_pandas(numeric))))
+                results.append({"scale": scale, "check": name, "ok": not problem, "detail": problem})
+
+    report = pd.DataFrame(results)
+    print(report.to_string(index=False))
+    sys.exit(0 if report["ok"].all() else 1)
+
+
+if __name__ == "__main__":
+    main()
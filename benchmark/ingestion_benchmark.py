@@ -0,0 +1,77 @@
+"""Throughput của DirectoryDataIngestor theo số worker.
+
+Cách chạy (từ thư mục gốc dự án):
+    python -m benchmark.ingestion_benchmark --scale 20 --format csv.gz
+
+Ames được chia thành các shard theo tháng bán (Yr Sold, Mo Sold), mỗi shard nhân bản `scale` lần,
+ghi ra thư mục tạm theo định dạng chọn, rồi đọc lại với 1, 2, 4, ... worker (process và thread).
+"""
+import logging
+import os
+import tempfile
+import time
+import zipfile
+
+import click
+import pandas as pd
+
+from pipeline.training_pipeline import DATA_PATH
+from src.data_ingestion import DirectoryDataIngestor, read_shard
+
+
+def write_monthly_shards(df: pd.DataFrame, directory: str, scale: int, fmt: str) -> int:
+    for (year, month), shard in df.groupby(["Yr Sold", "Mo Sold"]):
+        shard = pd.concat([shard] * scale, ignore_index=True)
+        name = os.path.join(directory, f"sales_{year}_{month:02d}")
+        if fmt == "parquet":
+            shard.to_parquet(f"{name}.parquet")
+        elif fmt == "zip":
+            with zipfile.ZipFile(f"{name}.zip", "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                zf.writestr(f"sales_{year}_{month:02d}.csv", shard.to_csv(index=False))
+        else:
+            shard.to_csv(f"{name}.{fmt}", index=False)
+    return len(os.listdir(directory))
+
+
+def worker_counts():
+    counts, n = [], 1
+    while n < os.cpu_count():
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count()]
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset gốc.")
+@click.option("--scale", default=20, help="Số lần nhân bản mỗi shard.")
+@click.option("--format", "fmt", default="csv.gz", type=click.Choice(["csv", "csv.gz", "parquet", "zip"]))
+def main(file_path: str, scale: int, fmt: str):
+    logging.disable(logging.WARNING)
+    base = read_shard(file_path)
+
+    with tempfile.TemporaryDirectory() as directory:
+        n_shards = write_monthly_shards(base, directory, scale, fmt)
+        print(f"{n_shards} shard .{fmt}, {len(base) * scale:,} dòng, core = {os.cpu_count()}")
+
+        rows = []
+        for use_processes in (True, False):
+            baseline = None
+            for workers in worker_counts():
+                ingestor = DirectoryDataIngestor(max_workers=workers, use_processes=use_processes)
+                start = time.perf_counter()
+                df = ingestor.ingest(directory)
+                elapsed = time.perf_counter() - start
+                baseline = baseline or elapsed
+                rows.append({
+                    "pool": "process" if use_processes else "thread",
+                    "workers": workers,
+                    "seconds": elapsed,
+                    "rows/s": len(df) / elapsed,
+                    "speedup": baseline / elapsed,
+                })
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
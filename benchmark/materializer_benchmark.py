@@ -0,0 +1,91 @@
+"""So sánh materializer mặc định của ZenML (parquet nén) với Arrow IPC và .npy memmap.
+
+Cách chạy (từ thư mục gốc dự án, cần ZenML stack local):
+    python -m benchmark.materializer_benchmark --scales 1 --scales 10 --scales 50
+
+Dữ liệu là Ames sau OneHotEncoding (frame rộng toàn số) được nhân bản theo số dòng.
+Với mỗi materializer in ra: thời gian save, thời gian load, thời gian load + đọc hết các cột,
+và bộ nhớ riêng cấp phát khi load (numpy qua tracemalloc + Arrow memory pool, không tính page memory-map).
+"""
+import logging
+import tempfile
+import time
+import tracemalloc
+
+import click
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from zenml.client import Client
+from zenml.integrations.pandas.materializers.pandas_materializer import PandasMaterializer
+
+from materializer.dataframe_materializer import ArrowDataFrameMaterializer, NumpyMemmapDataFrameMaterializer
+from pipeline.training_pipeline import DATA_PATH
+from src.data_ingestion import DataIngestorFactory
+from src.feature_engineering import FeatureEngineer, OneHotEncoding
+from src.handle_missing_values import FillMissingValuesStrategy, MissingValueHandler
+
+MATERIALIZERS = {
+    "pandas (default)": PandasMaterializer,
+    "arrow ipc": ArrowDataFrameMaterializer,
+    "npy memmap": NumpyMemmapDataFrameMaterializer,
+}
+
+
+def build_encoded_frame(file_path: str) -> pd.DataFrame:
+    df = DataIngestorFactory.get_data_ingestor(".zip").ingest(file_path)
+    df = MissingValueHandler(FillMissingValuesStrategy(method="mean")).handle_missing_value(df)
+    df = MissingValueHandler(FillMissingValuesStrategy(method="constant", fill_value="Missing")).handle_missing_value(df)
+    return FeatureEngineer(OneHotEncoding([])).apply_Transform(df)
+
+
+def benchmark_materializer(materializer_class, df: pd.DataFrame, root: str) -> dict:
+    with tempfile.TemporaryDirectory(dir=root) as uri:
+        start = time.perf_counter()
+        materializer_class(uri=uri).save(df)
+        save_time = time.perf_counter() - start
+
+        arrow_before = pa.total_allocated_bytes()
+        tracemalloc.start()
+        start = time.perf_counter()
+        loaded = materializer_class(uri=uri).load(pd.DataFrame)
+        load_time = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # Bộ nhớ riêng của frame sau khi load = numpy (tracemalloc) + buffer Arrow còn giữ
+        private_bytes = peak + pa.total_allocated_bytes() - arrow_before
+
+        start = time.perf_counter()
+        for col in loaded.columns:
+            np.asarray(loaded[col]).sum()
+        scan_time = time.perf_counter() - start
+        del loaded
+
+    return {
+        "save (s)": save_time,
+        "load (s)": load_time,
+        "load + scan (s)": load_time + scan_time,
+        "private mem (MB)": private_bytes / 1e6,
+    }
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset.")
+@click.option("--scales", multiple=True, default=[1, 10, 50], type=int, help="Hệ số nhân số dòng.")
+def main(file_path: str, scales: tuple):
+    logging.disable(logging.WARNING)
+    root = Client().active_stack.artifact_store.path
+    base = build_encoded_frame(file_path)
+
+    rows = []
+    for scale in scales:
+        df = pd.concat([base] * scale, ignore_index=True)
+        for name, materializer_class in MATERIALIZERS.items():
+            result = benchmark_materializer(materializer_class, df, root)
+            rows.append({"rows": len(df), "cols": df.shape[1], "materializer": name, **result})
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format="%.4f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""So sánh thời gian chạy ml_pipeline: local in-process vs ZenML.
+
+Cách chạy (từ thư mục gốc dự án):
+    python -m benchmark.pipeline_overhead --repeats 3
+    python -m benchmark.pipeline_overhead --skip-zenml
+
+Kết quả gồm:
+    - Thời gian từng step khi chạy local (chỉ tính thân hàm step).
+    - Thời gian save + load mỗi DataFrame trung gian bằng PandasMaterializer mặc định của ZenML.
+    - Tổng thời gian local vs ZenML -> phần chênh lệch là overhead orchestration + materialization.
+"""
+from contextlib import contextmanager
+import logging
+import statistics
+import tempfile
+import time
+
+import click
+import pandas as pd
+from zenml.steps import BaseStep
+
+from pipeline.local_runner import run_local_pipeline
+from pipeline.training_pipeline import DATA_PATH, ml_pipeline
+
+
+@contextmanager
+def record_steps(records: list):
+    """Bọc BaseStep.call_entrypoint để ghi lại tên step, thời gian và output của mỗi lần gọi."""
+    original = BaseStep.call_entrypoint
+
+    def timed_call_entrypoint(self, *args, **kwargs):
+        start = time.perf_counter()
+        output = original(self, *args, **kwargs)
+        records.append((self.name, time.perf_counter() - start, output))
+        return output
+
+    BaseStep.call_entrypoint = timed_call_entrypoint
+    try:
+        yield
+    finally:
+        BaseStep.call_entrypoint = original
+
+
+def materialize_roundtrip(df: pd.DataFrame) -> float:
+    """Thời gian save + load một DataFrame bằng PandasMaterializer mặc định
+    (thư mục tạm phải nằm trong artifact store đang active)."""
+    from zenml.client import Client
+    from zenml.integrations.pandas.materializers.pandas_materializer import PandasMaterializer
+
+    artifact_store_path = Client().active_stack.artifact_store.path
+    with tempfile.TemporaryDirectory(dir=artifact_store_path) as uri:
+        start = time.perf_counter()
+        materializer = PandasMaterializer(uri=uri)
+        materializer.save(df)
+        materializer.load(pd.DataFrame)
+        return time.perf_counter() - start
+
+
+def timed(func, repeats: int) -> float:
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset.")
+@click.option("--repeats", default=3, help="Số lần chạy, lấy trung vị.")
+@click.option("--skip-zenml", is_flag=True, default=False, help="Không chạy pipeline bằng ZenML.")
+def main(file_path: str, repeats: int, skip_zenml: bool):
+    logging.disable(logging.WARNING)
+
+    records = []
+    with record_steps(records):
+        run_local_pipeline(file_path=file_path)
+
+    print("\n=== Thời gian từng step (local) và chi phí materialize output ===")
+    print(f"{'step':<32}{'step (s)':>12}{'materialize (s)':>18}")
+    total_materialize = 0.0
+    for name, duration, output in records:
+        outputs = output if isinstance(output, tuple) else (output,)
+        cost = sum(materialize_roundtrip(o) for o in outputs if isinstance(o, (pd.DataFrame, pd.Series)))
+        total_materialize += cost
+        print(f"{name:<32}{duration:>12.4f}{cost:>18.4f}")
+
+    local_time = timed(lambda: run_local_pipeline(file_path=file_path), repeats)
+    print(f"\nLocal pipeline (trung vị {repeats} lần): {local_time:.3f}s")
+    print(f"Tổng chi phí materialize DataFrame: {total_materialize:.3f}s")
+
+    if not skip_zenml:
+        zenml_time = timed(lambda: ml_pipeline(file_path=file_path), repeats)
+        overhead = zenml_time - local_time
+        print(f"ZenML pipeline (trung vị {repeats} lần): {zenml_time:.3f}s")
+        print(f"Overhead orchestration + materialization: {overhead:.3f}s ({zenml_time / local_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Throughput khi train song song nhiều mô hình: có và không có ResourceController.
+
+Cách chạy (từ thư mục gốc dự án, nên chạy trên máy nhiều core):
+    python -m benchmark.resource_control_benchmark --scale 10 --tasks 16
+
+Mỗi task fit 1 mô hình (LinearRegression dùng BLAS/LAPACK, Random Forest dùng n_jobs) trên Ames sau
+OneHotEncoding nhân bản `scale` lần.
+- "không giới hạn": process pool = số core, mỗi worker để BLAS mặc định (= số core) và Random Forest n_jobs=-1
+  -> tối đa core x core thread tranh nhau.
+- "ResourceController": workers x blas_threads <= ngân sách core.
+"""
+from concurrent.futures import ProcessPoolExecutor
+import logging
+import os
+import tempfile
+import time
+
+import click
+import numpy as np
+import pandas as pd
+from joblib import parallel_config
+
+from benchmark.materializer_benchmark import build_encoded_frame
+from pipeline.training_pipeline import DATA_PATH
+from src.data_splitter import TrainingMatrix
+from src.model_bulding import LinearRegressionStratery, ModelBuilder, RandomForestStrategy
+from src.resource_control import ResourceController, core_budget, limit_threads
+
+TARGET_COLUMN = "SalePrice"
+STRATEGIES = {"linear_regression": LinearRegressionStratery, "random_forest": lambda: RandomForestStrategy(n_estimators=50)}
+
+
+def _fit_unlimited(model_name: str, matrix: TrainingMatrix) -> float:
+    start = time.perf_counter()
+    with parallel_config(n_jobs=-1):
+        ModelBuilder(STRATEGIES[model_name]()).build_model_from_matrix(matrix)
+    return time.perf_counter() - start
+
+
+def _fit_limited(model_name: str, matrix: TrainingMatrix, n_threads: int) -> float:
+    start = time.perf_counter()
+    with limit_threads(n_threads):
+        ModelBuilder(STRATEGIES[model_name]()).build_model_from_matrix(matrix)
+    return time.perf_counter() - start
+
+
+def run(tasks, executor, fit, *args) -> float:
+    start = time.perf_counter()
+    with executor:
+        list(executor.map(fit, [name for name, _ in tasks], [matrix for _, matrix in tasks], *args))
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset gốc.")
+@click.option("--scale", default=10, help="Số lần nhân bản dataset.")
+@click.option("--tasks", "n_tasks", default=16, help="Số mô hình train song song.")
+def main(file_path: str, scale: int, n_tasks: int):
+    logging.disable(logging.WARNING)
+    df = build_encoded_frame(file_path).select_dtypes("number")
+    df = pd.concat([df] * scale, ignore_index=True)
+
+    with tempfile.TemporaryDirectory() as directory:
+        matrix = TrainingMatrix.from_frame(df.drop(columns=[TARGET_COLUMN]), df[TARGET_COLUMN], dtype=np.float32).save(directory)
+        tasks = [(list(STRATEGIES)[i % len(STRATEGIES)], matrix) for i in range(n_tasks)]
+
+        cores = core_budget()
+        unlimited = run(tasks, ProcessPoolExecutor(max_workers=cores), _fit_unlimited)
+        controller = ResourceController()
+        allocation = controller.allocate(n_tasks)
+        limited = run(tasks, controller.process_pool(allocation), _fit_limited, [allocation.blas_threads] * n_tasks)
+
+    print(f"X: {matrix.shape}, {n_tasks} task, ngân sách core = {cores}, os.cpu_count() = {os.cpu_count()}")
+    print(pd.DataFrame([
+        {"mode": "không giới hạn", "workers": cores, "threads/worker": cores, "seconds": unlimited, "models/s": n_tasks / unlimited},
+        {"mode": "ResourceController", "workers": allocation.workers, "threads/worker": allocation.blas_threads,
+         "seconds": limited, "models/s": n_tasks / limited},
+    ]).to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Bộ nhớ và thời gian train: fit pipeline trên DataFrame vs trên TrainingMatrix memory-map.
+
+Cách chạy (từ thư mục gốc dự án):
+    python -m benchmark.training_handoff_benchmark --scale 20
+
+Dữ liệu là Ames sau OneHotEncoding nhân bản `scale` lần. Peak memory là bộ nhớ numpy cấp phát
+trong lúc fit (tracemalloc), không tính page của memory-map (đọc từ page cache, dùng chung giữa các process).
+"""
+import logging
+import tempfile
+import time
+import tracemalloc
+
+import click
+import numpy as np
+import pandas as pd
+
+from benchmark.materializer_benchmark import build_encoded_frame
+from pipeline.training_pipeline import DATA_PATH
+from src.data_splitter import TrainingMatrix
+from src.model_bulding import LinearRegressionStratery, ModelBuilder
+
+TARGET_COLUMN = "SalePrice"
+
+
+def measure(fit) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    fit()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+@click.command()
+@click.option("--file-path", default=DATA_PATH, help="Đường dẫn tới dataset gốc.")
+@click.option("--scale", default=20, help="Số lần nhân bản dataset.")
+def main(file_path: str, scale: int):
+    logging.disable(logging.WARNING)
+    df = build_encoded_frame(file_path).select_dtypes("number")
+    df = pd.concat([df] * scale, ignore_index=True)
+    X, y = df.drop(columns=[TARGET_COLUMN]), df[TARGET_COLUMN]
+    builder = ModelBuilder(LinearRegressionStratery())
+
+    rows = [("dataframe float64", X.memory_usage(index=False).sum() / 1e6,
+             *measure(lambda: builder.build_model(X, y)))]
+    with tempfile.TemporaryDirectory() as directory:
+        for dtype in (np.float64, np.float32):
+            matrix = TrainingMatrix.from_frame(X, y, dtype=dtype).save(f"{directory}/{np.dtype(dtype).name}")
+            rows.append((f"memmap {np.dtype(dtype).name}", matrix.nbytes / 1e6,
+                         *measure(lambda: builder.build_model_from_matrix(matrix))))
+
+    table = pd.DataFrame(rows, columns=["input", "matrix (MB)", "fit (s)", "peak fit memory (MB)"])
+    print(f"X: {X.shape}")
+    print(table.to_string(index=False, float_format="%.2f"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Materializer cho CompsIndex: ma trận feature float32, bình phương chuẩn, PID, giá bán, mean/scale là các
+file .npy + manifest.json (tên cột, cột định danh/target).
+
+Khi artifact store là ổ đĩa local, load bằng memory-map read-only -> service scoring không phải đọc cả index
+vào RAM, nhiều worker dùng chung page cache.
+"""
+from typing import Any, ClassVar, Dict, Tuple, Type
+import json
+import os
+
+import numpy as np
+from zenml.enums import ArtifactType
+from zenml.materializers.base_materializer import BaseMaterializer
+from zenml.metadata.metadata_types import MetadataType
+
+from src.comps_index import COMPS_ARRAYS, COMPS_MANIFEST, CompsIndex
+
+
+class CompsIndexMaterializer(BaseMaterializer):
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (CompsIndex,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.DATA
+
+    def save(self, index: CompsIndex) -> None:
+        for name, array in index.arrays().items():
+            with self.artifact_store.open(os.path.join(self.uri, f"{name}.npy"), mode="wb") as f:
+                np.save(f, array)
+        with self.artifact_store.open(os.path.join(self.uri, COMPS_MANIFEST), mode="w") as f:
+            json.dump(index.manifest(), f)
+
+    def load(self, data_type: Type[Any]) -> CompsIndex:
+        if os.path.isdir(self.uri):
+            return CompsIndex.load(self.uri)
+
+        with self.artifact_store.open(os.path.join(self.uri, COMPS_MANIFEST), mode="r") as f:
+            manifest = json.load(f)
+        arrays = {}
+        for name in COMPS_ARRAYS:
+            with self.artifact_store.open(os.path.join(self.uri, f"{name}.npy"), mode="rb") as f:
+                arrays[name] = np.load(f)
+        return CompsIndex.from_arrays(manifest, arrays)
+
+    def extract_metadata(self, index: CompsIndex) -> Dict[str, MetadataType]:
+        return {
+            "n_sales": len(index),
+            "n_features": len(index.columns_),
+            "size_mb": round(index.matrix_.nbytes / 1e6, 2),
+        }
@@ -0,0 +1,127 @@
+"""Materializer cho pd.DataFrame lưu ở dạng có thể memory-map thay vì parquet nén của ZenML.
+
+- ArrowDataFrameMaterializer: 1 file Arrow IPC/Feather v2 không nén. Khi artifact store là ổ đĩa local,
+  load bằng pa.memory_map -> cột số được đọc zero-copy (read-only) từ page cache, nhiều step
+  cùng đọc 1 artifact dùng chung page thay vì mỗi step giữ 1 bản riêng.
+- NumpyMemmapDataFrameMaterializer: mỗi cột số là 1 file .npy + manifest.json, load bằng
+  np.load(mmap_mode="c") (copy-on-write: ghi vào cột chỉ copy page bị ghi). Cột không phải số
+  và index không phải số được lưu trong 1 file Feather nhỏ đi kèm.
+"""
+from typing import Any, ClassVar, Dict, Tuple, Type
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from zenml.enums import ArtifactType
+from zenml.materializers.base_materializer import BaseMaterializer
+from zenml.metadata.metadata_types import MetadataType
+
+ARROW_FILENAME = "df.arrow"
+MANIFEST_FILENAME = "manifest.json"
+OTHER_COLUMNS_FILENAME = "other_columns.arrow"
+INDEX_FILENAME = "index.npy"
+
+
+class BaseDataFrameMaterializer(BaseMaterializer):
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (pd.DataFrame,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.DATA
+
+    def _is_local(self) -> bool:
+        """Chỉ memory-map được khi artifact nằm trên filesystem local."""
+        return os.path.isdir(self.uri)
+
+    def _read_arrow_table(self, path: str) -> pa.Table:
+        if self._is_local():
+            return pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+        with self.artifact_store.open(path, mode="rb") as f:
+            return pa.ipc.open_file(pa.BufferReader(f.read())).read_all()
+
+    def _write_arrow_table(self, df: pd.DataFrame, path: str):
+        with self.artifact_store.open(path, mode="wb") as f:
+            feather.write_feather(df, f, compression="uncompressed")
+
+    def extract_metadata(self, df: pd.DataFrame) -> Dict[str, MetadataType]:
+        return {
+            "shape": tuple(df.shape),
+            "num_numeric_columns": int(sum(dtype.kind in "biuf" for dtype in df.dtypes)),
+        }
+
+
+class ArrowDataFrameMaterializer(BaseDataFrameMaterializer):
+    def save(self, df: pd.DataFrame) -> None:
+        """Ghi DataFrame (kèm index) ra Arrow IPC không nén."""
+        self._write_arrow_table(df, os.path.join(self.uri, ARROW_FILENAME))
+
+    def load(self, data_type: Type[Any]) -> pd.DataFrame:
+        """split_blocks=True giữ mỗi cột là 1 block riêng -> cột số không null không bị copy."""
+        table = self._read_arrow_table(os.path.join(self.uri, ARROW_FILENAME))
+        return table.to_pandas(split_blocks=True)
+
+
+class NumpyMemmapDataFrameMaterializer(BaseDataFrameMaterializer):
+    def save(self, df: pd.DataFrame) -> None:
+        """Ghi mỗi cột số ra 1 file .npy, phần còn lại ra Feather, thứ tự cột vào manifest."""
+        if not df.columns.is_unique:
+            raise ValueError("DataFrame có tên cột trùng nhau, không thể lưu theo từng cột.")
+
+        manifest = {"columns": [], "other_columns": [], "index": None, "index_name": df.index.name}
+        for i, col in enumerate(df.columns):
+            if df[col].dtype.kind in "biuf":
+                filename = f"col_{i}.npy"
+                with self.artifact_store.open(os.path.join(self.uri, filename), mode="wb") as f:
+                    np.save(f, np.ascontiguousarray(df[col].to_numpy()))
+                manifest["columns"].append({"name": col, "file": filename})
+            else:
+                manifest["columns"].append({"name": col, "file": None})
+                manifest["other_columns"].append(col)
+
+        if isinstance(df.index, pd.RangeIndex):
+            manifest["index"] = {"start": df.index.start, "stop": df.index.stop, "step": df.index.step}
+        elif df.index.dtype.kind in "iu":
+            with self.artifact_store.open(os.path.join(self.uri, INDEX_FILENAME), mode="wb") as f:
+                np.save(f, df.index.to_numpy())
+            manifest["index"] = INDEX_FILENAME
+
+        if manifest["other_columns"] or manifest["index"] is None:
+            """Index không phải số nguyên được lưu cùng các cột không phải số trong Feather"""
+            other = df[manifest["other_columns"]]
+            if manifest["index"] is not None:
+                other = other.reset_index(drop=True)
+            self._write_arrow_table(other, os.path.join(self.uri, OTHER_COLUMNS_FILENAME))
+
+        with self.artifact_store.open(os.path.join(self.uri, MANIFEST_FILENAME), mode="w") as f:
+            json.dump(manifest, f)
+
+    def _load_column(self, filename: str) -> np.ndarray:
+        path = os.path.join(self.uri, filename)
+        if self._is_local():
+            # view ndarray thường trên vùng memmap -> pandas không giữ lớp np.memmap
+            return np.load(path, mmap_mode="c").view(np.ndarray)
+        with self.artifact_store.open(path, mode="rb") as f:
+            return np.load(f)
+
+    def load(self, data_type: Type[Any]) -> pd.DataFrame:
+        with self.artifact_store.open(os.path.join(self.uri, MANIFEST_FILENAME), mode="r") as f:
+            manifest = json.load(f)
+
+        other = None
+        if manifest["other_columns"] or manifest["index"] is None:
+            other = self._read_arrow_table(os.path.join(self.uri, OTHER_COLUMNS_FILENAME)).to_pandas(split_blocks=True)
+
+        index_spec = manifest["index"]
+        if isinstance(index_spec, dict):
+            index = pd.RangeIndex(index_spec["start"], index_spec["stop"], index_spec["step"])
+        elif index_spec is not None:
+            index = pd.Index(self._load_column(index_spec))
+        else:
+            index = other.index
+        index.name = manifest["index_name"]
+
+        data = {}
+        for column in manifest["columns"]:
+            name = column["name"]
+            data[name] = self._load_column(column["file"]) if column["file"] else other[name].array
+        return pd.DataFrame(data, index=index, copy=False)
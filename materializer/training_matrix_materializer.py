@@ -0,0 +1,53 @@
+"""Materializer cho TrainingMatrix: X, y, index là các file .npy liền kề + manifest.json (tên cột, dtype, shape).
+
+Khi artifact store là ổ đĩa local, load bằng memory-map read-only -> step train đọc thẳng từ page cache,
+các trainer chạy song song trên cùng artifact dùng chung page thay vì mỗi process giữ 1 bản.
+"""
+from typing import Any, ClassVar, Dict, Tuple, Type
+import json
+import os
+
+import numpy as np
+from zenml.enums import ArtifactType
+from zenml.materializers.base_materializer import BaseMaterializer
+from zenml.metadata.metadata_types import MetadataType
+
+from src.data_splitter import (
+    INDEX_FILENAME,
+    MANIFEST_FILENAME,
+    MATRIX_FILENAME,
+    TARGET_FILENAME,
+    TrainingMatrix,
+)
+
+
+class TrainingMatrixMaterializer(BaseMaterializer):
+    ASSOCIATED_TYPES: ClassVar[Tuple[Type[Any], ...]] = (TrainingMatrix,)
+    ASSOCIATED_ARTIFACT_TYPE: ClassVar[ArtifactType] = ArtifactType.DATA
+
+    def save(self, matrix: TrainingMatrix) -> None:
+        for filename, array in ((MATRIX_FILENAME, matrix.X), (TARGET_FILENAME, matrix.y), (INDEX_FILENAME, matrix.index)):
+            with self.artifact_store.open(os.path.join(self.uri, filename), mode="wb") as f:
+                np.save(f, array)
+        with self.artifact_store.open(os.path.join(self.uri, MANIFEST_FILENAME), mode="w") as f:
+            json.dump(matrix.manifest(), f)
+
+    def load(self, data_type: Type[Any]) -> TrainingMatrix:
+        if os.path.isdir(self.uri):
+            return TrainingMatrix.load(self.uri)
+
+        with self.artifact_store.open(os.path.join(self.uri, MANIFEST_FILENAME), mode="r") as f:
+            manifest = json.load(f)
+        arrays = []
+        for filename in (MATRIX_FILENAME, TARGET_FILENAME, INDEX_FILENAME):
+            with self.artifact_store.open(os.path.join(self.uri, filename), mode="rb") as f:
+                arrays.append(np.load(f))
+        X, y, index = arrays
+        return TrainingMatrix(X, y, manifest["columns"], manifest["target_column"], index)
+
+    def extract_metadata(self, matrix: TrainingMatrix) -> Dict[str, MetadataType]:
+        return {
+            "shape": tuple(matrix.shape),
+            "dtype": matrix.X.dtype.name,
+            "size_mb": round(matrix.nbytes / 1e6, 2),
+        }
@@ -0,0 +1,67 @@
+# File: drift_monitoring.py (Theo dõi drift của dữ liệu scoring so với dữ liệu train)
+
+from typing import Iterable, Optional
+import logging
+
+import pandas as pd
+from zenml import Model
+
+from pipeline.retrain_queue import RetrainQueue
+from src.drift_monitor import DriftMonitor, FeatureReference
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+MODEL_NAME = "prices_predictor"
+
+
+def load_drift_reference(model_name: str = MODEL_NAME, version: str = "production") -> FeatureReference:
+    """Load phân phối tham chiếu đã lưu cùng model version (artifact drift_reference)."""
+    return Model(name=model_name, version=version).load_artifact("drift_reference")
+
+
+def trigger_retrain(reason: dict, model_name: str = MODEL_NAME) -> int:
+    """Xếp hàng retrain khi phát hiện drift (gộp với job đang chờ nếu có), trả về id job.
+    Pipeline chạy ở worker của hàng đợi: python -m pipeline.retrain_queue worker"""
+    logging.warning(f"🔁 Phát hiện drift ở {reason['n_drifted_features']} feature -> xếp hàng retrain.")
+    return RetrainQueue().enqueue(model_name, trigger="drift", reason={
+        key: reason[key] for key in ("max_psi", "max_ks", "n_drifted_features") if key in reason
+    })
+
+
+def monitor_batches(
+    batches: Iterable[pd.DataFrame],
+    reference: Optional[FeatureReference] = None,
+    model_name: str = MODEL_NAME,
+    psi_threshold: float = 0.2,
+    ks_threshold: float = 0.1,
+    log_to_model: bool = True,
+    retrain: bool = True,
+) -> dict:
+    """Cập nhật sketch theo từng batch (cùng schema với clean_data), tính PSI/KS, log vào metadata
+    của model version production và kích hoạt retrain nếu có drift.
+
+    Bộ nhớ cố định: chỉ giữ ma trận đếm của DriftMonitor, batch được bỏ sau khi cập nhật.
+    """
+    if reference is None:
+        reference = load_drift_reference(model_name)
+
+    monitor = DriftMonitor(reference)
+    for i, batch in enumerate(batches):
+        monitor.update(batch)
+        logging.info(f"Đã cập nhật drift sketch với batch {i} ({len(batch)} dòng).")
+
+    summary = monitor.summary(psi_threshold=psi_threshold, ks_threshold=ks_threshold)
+    logging.info(f"Drift summary: max PSI={summary['max_psi']:.4f}, max KS={summary['max_ks']:.4f}, "
+                 f"{summary['n_drifted_features']} feature vượt ngưỡng.")
+
+    if log_to_model:
+        Model(name=model_name, version="production").log_metadata({"drift": summary})
+        logging.info("Drift scores đã được lưu vào Model Version metadata")
+
+    if retrain and summary["drift_detected"]:
+        summary["retrain_job"] = trigger_retrain(summary, model_name)
+    return summary
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,217 @@
+# File: experiment_grid.py (So sánh nhiều biến thể tiền xử lý x mô hình trong 1 lần chạy)
+
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+import itertools
+import logging
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from pipeline.local_runner import local_execution
+from pipeline.training_pipeline import DATA_PATH
+from src.evaluator_model import EvaluatorModel, RegressionEvaluatorModel
+from src.model_bulding import (
+    LinearRegressionStratery,
+    ModelBuilder,
+    RandomForestStrategy,
+    RidgeRegressionStrategy,
+)
+from src.resource_control import ResourceController, limit_threads
+from step.data_ingestion_step import data_ingestion_step
+from step.data_splitter_step import data_splitter_step
+from step.feature_engineering_step import feature_engineering_step
+from step.feature_selection_step import feature_selection_step
+from step.handle_missing_value_step import handle_missing_values_step
+from step.outlier_detection_step import outlier_detection_step
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+TARGET_COLUMN = "SalePrice"
+
+
+def _identity(df: pd.DataFrame) -> pd.DataFrame:
+    return df
+
+
+def _select_features(splits: tuple) -> tuple:
+    """Chọn feature chỉ trên tập train của splits; X_test giữ nguyên (mô hình tự cắt theo feature_names_in_)"""
+    train_matrix, X_test, y_test = splits
+    return feature_selection_step.entrypoint(train_matrix=train_matrix, report_speedup=False), X_test, y_test
+
+
+"""Các stage theo đúng thứ tự của ml_pipeline. Mỗi stage là (tên, {tên biến thể: hàm df -> output}).
+Các hàm là entrypoint của step -> dùng lại nguyên thân hàm step như local runner."""
+DEFAULT_STAGES: List[Tuple[str, Dict[str, Callable]]] = [
+    ("impute", {
+        "mean": partial(handle_missing_values_step.entrypoint, strategy="mean"),
+        "median": partial(handle_missing_values_step.entrypoint, strategy="median"),
+    }),
+    ("fill_categorical", {
+        "missing": partial(handle_missing_values_step.entrypoint, strategy="constant", fill_value="Missing"),
+    }),
+    ("encode", {
+        "onehot": partial(feature_engineering_step.entrypoint, strategy="onehot_encoding", features=None),
+    }),
+    ("log", {
+        "gr_liv_area": partial(feature_engineering_step.entrypoint, strategy="log", features=["Gr Liv Area", TARGET_COLUMN]),
+        "none": partial(feature_engineering_step.entrypoint, strategy="log", features=[TARGET_COLUMN]),
+    }),
+    ("outlier", {
+        "zscore": partial(outlier_detection_step.entrypoint, strategy="zscore"),
+        "iqr": partial(outlier_detection_step.entrypoint, strategy="iqr"),
+        "cap": partial(outlier_detection_step.entrypoint, strategy="cap"),
+    }),
+    ("split", {
+        "simple": partial(data_splitter_step.entrypoint, target_column=TARGET_COLUMN),
+    }),
+    ("select", {
+        "variance_corr": _select_features,
+        "none": _identity,
+    }),
+]
+
+"""Tên mô hình -> hàm tạo strategy. Tra theo tên trong worker process."""
+MODEL_STRATEGIES: Dict[str, Callable] = {
+    "linear_regression": LinearRegressionStratery,
+    "ridge": RidgeRegressionStrategy,
+    "random_forest": RandomForestStrategy,
+}
+
+
+class VariantNode:
+    """Một node trong cây tiền tố: key là chuỗi (stage, biến thể) từ gốc tới node.
+    Output của node được tính đúng 1 lần và dùng chung cho mọi nhánh con."""
+    def __init__(self, stage: str, option: str, parent: Optional["VariantNode"] = None):
+        self.stage = stage
+        self.option = option
+        self.parent = parent
+        self.children: List["VariantNode"] = []
+        self.output = None
+        self.duration = 0.0
+
+    @property
+    def chain(self) -> List["VariantNode"]:
+        node, chain = self, []
+        while node is not None:
+            chain.append(node)
+            node = node.parent
+        return chain[::-1]
+
+    @property
+    def key(self) -> Tuple[Tuple[str, str], ...]:
+        return tuple((node.stage, node.option) for node in self.chain)
+
+    def chain_duration(self) -> float:
+        """Thời gian nếu chạy riêng lẻ cả chuỗi từ gốc tới node (không memoize)."""
+        return sum(node.duration for node in self.chain)
+
+
+def _train_and_evaluate(model_name: str, splits: tuple, n_threads: int = 1) -> Tuple[Dict[str, float], float]:
+    """Chạy trong worker process: train 1 mô hình trên splits và trả về (metrics, thời gian train).
+    train_matrix đã ghi ra file -> worker chỉ nhận đường dẫn và memory-map, các worker dùng chung page.
+    n_threads: số thread BLAS / n_jobs của sklearn mà worker được dùng (theo ResourceController)."""
+    train_matrix, X_test, y_test = splits
+    start = time.perf_counter()
+    with limit_threads(n_threads):
+        model = ModelBuilder(MODEL_STRATEGIES[model_name]()).build_model_from_matrix(train_matrix)
+    fit_time = time.perf_counter() - start
+    metrics = EvaluatorModel(RegressionEvaluatorModel()).evaluate(model, X_test[list(model.feature_names_in_)], y_test.iloc[:, 0])
+    return metrics, fit_time
+
+
+class ExperimentGridRunner:
+    def __init__(self, stages: List[Tuple[str, Dict[str, Callable]]] = None, models: List[str] = None,
+                 max_workers: Optional[int] = None, controller: Optional[ResourceController] = None):
+        """controller: chia ngân sách core giữa số worker và số thread BLAS mỗi worker.
+        Mặc định ResourceController(max_workers=max_workers) với ngân sách core chung."""
+        self.stages = stages if stages is not None else DEFAULT_STAGES
+        self.models = models if models is not None else list(MODEL_STRATEGIES)
+        self.max_workers = max_workers
+        self.controller = controller or ResourceController(max_workers=max_workers)
+        self.allocation_ = None
+
+    def build_tree(self) -> Tuple[VariantNode, List[List[VariantNode]]]:
+        """Dựng cây tiền tố từ tích Descartes các biến thể. Trả về gốc và danh sách node theo từng tầng."""
+        root = VariantNode("ingest", "zip")
+        levels = [[root]]
+        for stage, options in self.stages:
+            level = []
+            for parent in levels[-1]:
+                for option in options:
+                    child = VariantNode(stage, option, parent)
+                    parent.children.append(child)
+                    level.append(child)
+            levels.append(level)
+        return root, levels
+
+    def _compute_node(self, node: VariantNode, func: Callable):
+        start = time.perf_counter()
+        node.output = func(node.parent.output)
+        node.duration = time.perf_counter() - start
+
+    def run(self, file_path: str = DATA_PATH) -> pd.DataFrame:
+        root, levels = self.build_tree()
+        n_combinations = len(levels[-1]) * len(self.models)
+        logging.info(f"Experiment grid: {n_combinations} tổ hợp, {sum(len(level) for level in levels)} node tiền xử lý.")
+
+        wall_start = time.perf_counter()
+        with local_execution():
+            start = time.perf_counter()
+            root.output = data_ingestion_step(file_path=file_path)
+            root.duration = time.perf_counter() - start
+
+            # Tiền xử lý theo từng tầng: các node cùng tầng độc lập -> chạy song song trong thread pool.
+            # threadpoolctl giới hạn theo process -> chia core cho tầng rộng nhất
+            preprocess = self.controller.allocate(max(len(level) for level in levels))
+            with ThreadPoolExecutor(max_workers=preprocess.workers) as executor, self.controller.limit(preprocess):
+                for (stage, options), level in zip(self.stages, levels[1:]):
+                    list(executor.map(lambda node: self._compute_node(node, options[node.option]), level))
+                    # Output tầng cha không còn cần nữa -> giải phóng bộ nhớ
+                    for node in level:
+                        node.parent.output = None
+
+        # Train mô hình ở các lá: mỗi (lá, mô hình) là 1 task độc lập trong process pool
+        leaves = levels[-1]
+        tasks = list(itertools.product(leaves, self.models))
+        self.allocation_ = self.controller.allocate(len(tasks))
+        with tempfile.TemporaryDirectory() as matrix_dir, self.controller.process_pool(self.allocation_) as executor:
+            for i, leaf in enumerate(leaves):
+                train_matrix, X_test, y_test = leaf.output
+                leaf.output = (train_matrix.save(os.path.join(matrix_dir, f"leaf_{i}")), X_test, y_test)
+            futures = [executor.submit(_train_and_evaluate, model_name, leaf.output, self.allocation_.blas_threads)
+                       for leaf, model_name in tasks]
+            results = [future.result() for future in futures]
+        wall_time = time.perf_counter() - wall_start
+
+        rows = []
+        for (leaf, model_name), (metrics, fit_time) in zip(tasks, results):
+            row = {stage: option for stage, option in leaf.key[1:]}
+            row["model"] = model_name
+            row["mse"] = metrics["Mean Squared Error"]
+            row["r2"] = metrics["R-Squared"]
+            row["n_train"] = len(leaf.output[0])
+            row["preprocess_time"] = leaf.chain_duration()
+            row["fit_time"] = fit_time
+            row["standalone_time"] = row["preprocess_time"] + fit_time
+            rows.append(row)
+
+        table = pd.DataFrame(rows).sort_values("r2", ascending=False).reset_index(drop=True)
+        standalone_total = table["standalone_time"].sum()
+        logging.info(
+            f"✅ Experiment grid hoàn tất trong {wall_time:.2f}s "
+            f"(chạy riêng từng tổ hợp ước tính {standalone_total:.2f}s, nhanh {standalone_total / wall_time:.1f}x)."
+        )
+        return table
+
+
+def run_experiment_grid(file_path: str = DATA_PATH, models: List[str] = None, max_workers: Optional[int] = None) -> pd.DataFrame:
+    """Chạy toàn bộ grid mặc định và trả về bảng so sánh metrics + thời gian."""
+    return ExperimentGridRunner(models=models, max_workers=max_workers).run(file_path)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,310 @@
+# File: retrain_queue.py (Hàng đợi retrain: gộp trigger, chạy pipeline ngoài luồng request)
+
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import asyncio
+import importlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+
+import click
+import pandas as pd
+
+from src.resource_control import ResourceController
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Đường dẫn mặc định của database hàng đợi (tương đối với thư mục gốc của dự án)"""
+RETRAIN_DB_PATH = os.path.join("data", "retrain_queue.db")
+
+"""Pipeline được phép chạy từ hàng đợi: tên -> "module:hàm" (import trong process worker)"""
+PIPELINES = {
+    "ml_pipeline": "pipeline.training_pipeline:ml_pipeline",
+    "incremental_ml_pipeline": "pipeline.training_pipeline:incremental_ml_pipeline",
+}
+
+"""Số trigger gần nhất giữ lại trong mỗi job (phần còn lại chỉ được đếm)"""
+MAX_TRIGGERS_KEPT = 50
+
+"""Job 'running' không có heartbeat trong khoảng này (giây) được coi là worker đã chết"""
+LEASE_SECONDS = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    model_name TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+    triggers TEXT NOT NULL,
+    trigger_count INTEGER NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    run_id TEXT,
+    error TEXT,
+    owner TEXT,
+    heartbeat_at REAL
+);
+-- Bất biến do SQLite đảm bảo: mỗi model tối đa 1 job đang chờ và 1 job đang chạy
+CREATE UNIQUE INDEX IF NOT EXISTS one_queued_per_model ON jobs(model_name) WHERE status = 'queued';
+CREATE UNIQUE INDEX IF NOT EXISTS one_running_per_model ON jobs(model_name) WHERE status = 'running';
+"""
+
+
+class RetrainQueue:
+    """Hàng đợi retrain trên SQLite (1 file, dùng chung giữa các process: drift monitor, CLI, worker).
+
+    - enqueue: đã có job 'queued' của model -> chỉ gộp trigger vào job đó (tăng trigger_count), không tạo job mới
+      -> 1 loạt trigger liên tiếp (drift, shard mới, gọi tay) chỉ sinh 1 lần retrain.
+    - claim: lấy job 'queued' cũ nhất của model không có job 'running' -> không bao giờ 2 retrain chồng nhau.
+      Job được gắn owner (host:pid của worker) và heartbeat_at; worker gia hạn heartbeat khi job còn chạy.
+    - recover: chỉ giải phóng job 'running' có owner đã chết (pid không còn trên cùng host) hoặc hết lease
+      (không heartbeat trong lease_s giây) -> worker thứ 2 không mở khóa job của worker còn sống.
+    Mọi thao tác đọc-ghi nằm trong transaction BEGIN IMMEDIATE; unique index theo status giữ bất biến ở mức database.
+    """
+    def __init__(self, db_path: str = RETRAIN_DB_PATH):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # Database tạo trước khi có owner/heartbeat -> thêm cột
+            existing = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (("owner", "TEXT"), ("heartbeat_at", "REAL")):
+                if column not in existing:
+                    conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def enqueue(self, model_name: str, trigger: str, reason: Optional[dict] = None,
+                pipeline: str = "ml_pipeline", params: Optional[dict] = None) -> int:
+        """Thêm yêu cầu retrain, trả về id job (job mới hoặc job đang chờ đã gộp trigger).
+        Khi gộp, pipeline/params của job đang chờ được giữ nguyên."""
+        if pipeline not in PIPELINES:
+            raise ValueError(f"Pipeline không được hỗ trợ: {pipeline}. Chọn một trong {list(PIPELINES)}")
+        now = time.time()
+        entry = {"trigger": trigger, "at": now, "reason": reason or {}}
+        with self._transaction() as conn:
+            row = conn.execute("SELECT id, triggers FROM jobs WHERE model_name = ? AND status = 'queued'", (model_name,)).fetchone()
+            if row is not None:
+                triggers = (json.loads(row["triggers"]) + [entry])[-MAX_TRIGGERS_KEPT:]
+                conn.execute("UPDATE jobs SET triggers = ?, trigger_count = trigger_count + 1 WHERE id = ?",
+                             (json.dumps(triggers, default=str), row["id"]))
+                logging.info(f"Gộp trigger '{trigger}' vào job retrain #{row['id']} đang chờ của {model_name}.")
+                return row["id"]
+            cursor = conn.execute(
+                "INSERT INTO jobs (model_name, pipeline, params, status, triggers, trigger_count, enqueued_at) "
+                "VALUES (?, ?, ?, 'queued', ?, 1, ?)",
+                (model_name, pipeline, json.dumps(params or {}), json.dumps([entry], default=str), now),
+            )
+            logging.info(f"Đã xếp hàng job retrain #{cursor.lastrowid} cho {model_name} (trigger '{trigger}').")
+            return cursor.lastrowid
+
+    def claim(self) -> Optional[dict]:
+        """Chuyển job 'queued' cũ nhất (của model không có job đang chạy) sang 'running' và trả về job đó"""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM jobs q WHERE status = 'queued' AND NOT EXISTS "
+                "(SELECT 1 FROM jobs r WHERE r.model_name = q.model_name AND r.status = 'running') "
+                "ORDER BY enqueued_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            started = time.time()
+            conn.execute("UPDATE jobs SET status = 'running', started_at = ?, owner = ?, heartbeat_at = ? WHERE id = ?",
+                         (started, self.worker_id, started, row["id"]))
+        return {**dict(row), "status": "running", "started_at": started, "owner": self.worker_id}
+
+    def heartbeat(self, job_ids: List[int]):
+        """Gia hạn lease của các job đang chạy thuộc worker này"""
+        if not job_ids:
+            return
+        with self._transaction() as conn:
+            conn.execute(f"UPDATE jobs SET heartbeat_at = ? WHERE status = 'running' AND owner = ? "
+                         f"AND id IN ({','.join('?' * len(job_ids))})", (time.time(), self.worker_id, *job_ids))
+
+    def finish(self, job_id: int, succeeded: bool, run_id: Optional[str] = None, error: Optional[str] = None):
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET status = ?, finished_at = ?, run_id = ?, error = ? WHERE id = ?",
+                         ("succeeded" if succeeded else "failed", time.time(), run_id, error, job_id))
+
+    @staticmethod
+    def _owner_alive(owner: Optional[str]) -> Optional[bool]:
+        """True/False nếu owner chạy trên host này (kiểm tra pid), None nếu không biết (host khác / job cũ)"""
+        if not owner or ":" not in owner:
+            return None
+        host, pid = owner.rsplit(":", 1)
+        if host != socket.gethostname() or not pid.isdigit():
+            return None
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def recover(self, lease_s: float = LEASE_SECONDS) -> int:
+        """Job 'running' của worker đã chết -> 'failed', để model đó không bị khóa mãi.
+        Worker đã chết = pid owner không còn (cùng host) hoặc heartbeat cũ hơn lease_s giây."""
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT id, owner, COALESCE(heartbeat_at, started_at) AS seen_at FROM jobs "
+                                "WHERE status = 'running'").fetchall()
+            dead = [row["id"] for row in rows
+                    if row["owner"] != self.worker_id
+                    and (self._owner_alive(row["owner"]) is False or now - (row["seen_at"] or 0) > lease_s)]
+            for job_id in dead:
+                conn.execute("UPDATE jobs SET status = 'failed', finished_at = ?, error = 'worker interrupted' "
+                             "WHERE id = ? AND status = 'running'", (now, job_id))
+        if dead:
+            logging.warning(f"Đánh dấu {len(dead)} job của worker đã dừng là failed: {dead}")
+        return len(dead)
+
+    def pending(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM jobs WHERE status IN ('queued', 'running')").fetchone()[0]
+
+    def jobs(self, limit: int = 20) -> pd.DataFrame:
+        """Các job gần nhất kèm thời gian chờ trong hàng đợi (wait_s) và thời gian chạy (run_s)"""
+        with self._connect() as conn:
+            df = pd.read_sql_query("SELECT id, model_name, pipeline, status, trigger_count, enqueued_at, started_at, "
+                                   "finished_at, run_id, owner, error FROM jobs ORDER BY id DESC LIMIT ?", conn, params=(limit,))
+        now = time.time()
+        df["wait_s"] = df["started_at"].fillna(now) - df["enqueued_at"]
+        df["run_s"] = df["finished_at"].fillna(now) - df["started_at"]
+        df["enqueued_at"] = pd.to_datetime(df["enqueued_at"], unit="s").dt.strftime("%Y-%m-%d %H:%M:%S")
+        return df.drop(columns=["started_at", "finished_at"])
+
+    def stats(self) -> pd.DataFrame:
+        """Theo model: số job theo trạng thái, tổng trigger đã gộp, thời gian chờ / chạy trung bình và lớn nhất"""
+        df = self.jobs(limit=-1)
+        if df.empty:
+            return df
+        done = df[df["status"].isin(["succeeded", "failed"])]
+        summary = df.groupby("model_name").agg(jobs=("id", "count"), triggers=("trigger_count", "sum"),
+                                               queued=("status", lambda s: (s == "queued").sum()),
+                                               running=("status", lambda s: (s == "running").sum()),
+                                               failed=("status", lambda s: (s == "failed").sum()))
+        timings = done.groupby("model_name").agg(mean_wait_s=("wait_s", "mean"), max_wait_s=("wait_s", "max"),
+                                                 mean_run_s=("run_s", "mean"), max_run_s=("run_s", "max"))
+        return summary.join(timings)
+
+
+def _run_pipeline(pipeline: str, params: dict) -> Optional[str]:
+    """Chạy trong process worker: import pipeline theo PIPELINES và chạy, trả về id của pipeline run"""
+    module_name, function_name = PIPELINES[pipeline].split(":")
+    run = getattr(importlib.import_module(module_name), function_name)(**params)
+    return str(run.id) if getattr(run, "id", None) is not None else None
+
+
+class RetrainScheduler:
+    """Vòng lặp asyncio lấy job từ RetrainQueue và chạy pipeline trong process pool (ngoài luồng request).
+
+    Nhiều model có thể retrain song song (tối đa max_workers); cùng 1 model thì không (claim của hàng đợi).
+    Số worker và số thread BLAS mỗi worker lấy từ ResourceController.
+    """
+    def __init__(self, queue: RetrainQueue, max_workers: int = 1, poll_interval: float = 1.0,
+                 controller: Optional[ResourceController] = None):
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.controller = controller or ResourceController(max_workers=max_workers)
+        self.allocation = self.controller.allocate(max_workers)
+
+    async def _execute(self, executor, job: dict):
+        loop = asyncio.get_running_loop()
+        logging.info(f"▶️ Bắt đầu job #{job['id']} ({job['pipeline']} cho {job['model_name']}, gộp {job['trigger_count']} trigger).")
+        try:
+            run_id = await loop.run_in_executor(executor, _run_pipeline, job["pipeline"], json.loads(job["params"]))
+            self.queue.finish(job["id"], succeeded=True, run_id=run_id)
+            logging.info(f"✅ Job #{job['id']} hoàn tất (run {run_id}).")
+        except Exception as e:
+            self.queue.finish(job["id"], succeeded=False, error=f"{type(e).__name__}: {e}")
+            logging.error(f"❌ Job #{job['id']} thất bại: {e}")
+
+    async def run(self, drain: bool = False):
+        """drain=True: dừng khi hàng đợi rỗng và không còn job đang chạy; ngược lại chạy mãi.
+        Mỗi vòng: gia hạn heartbeat các job đang chạy + giải phóng job của worker đã chết."""
+        running: dict = {}
+        with self.controller.process_pool(self.allocation) as executor:
+            while True:
+                self.queue.heartbeat(list(running.values()))
+                self.queue.recover()
+                while len(running) < self.allocation.workers:
+                    job = self.queue.claim()
+                    if job is None:
+                        break
+                    running[asyncio.create_task(self._execute(executor, job))] = job["id"]
+                if drain and not running and self.queue.pending() == 0:
+                    return
+                if running:
+                    done, _ = await asyncio.wait(set(running), timeout=self.poll_interval, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        running.pop(task)
+                else:
+                    await asyncio.sleep(self.poll_interval)
+
+
+@click.group()
+@click.option("--db", "db_path", default=RETRAIN_DB_PATH, help="Đường dẫn database hàng đợi.")
+@click.pass_context
+def cli(ctx, db_path: str):
+    """Hàng đợi retrain: python -m pipeline.retrain_queue [enqueue|worker|status]"""
+    ctx.obj = RetrainQueue(db_path)
+
+
+@cli.command()
+@click.option("--model", "model_name", default="prices_predictor")
+@click.option("--trigger", default="manual", help="Nguồn yêu cầu: manual, drift, shard, ...")
+@click.option("--pipeline", default="ml_pipeline", type=click.Choice(list(PIPELINES)))
+@click.pass_obj
+def enqueue(queue: RetrainQueue, model_name: str, trigger: str, pipeline: str):
+    click.echo(f"job #{queue.enqueue(model_name, trigger, pipeline=pipeline)}")
+
+
+@cli.command()
+@click.option("--workers", default=1, help="Số pipeline chạy song song (khác model).")
+@click.option("--poll", default=1.0, help="Chu kỳ kiểm tra hàng đợi (giây).")
+@click.option("--drain", is_flag=True, default=False, help="Thoát khi hàng đợi rỗng.")
+@click.pass_obj
+def worker(queue: RetrainQueue, workers: int, poll: float, drain: bool):
+    asyncio.run(RetrainScheduler(queue, max_workers=workers, poll_interval=poll).run(drain=drain))
+
+
+@cli.command()
+@click.option("--limit", default=20, help="Số job gần nhất.")
+@click.pass_obj
+def status(queue: RetrainQueue, limit: int):
+    click.echo(queue.jobs(limit).to_string(index=False, float_format="%.1f"))
+    stats = queue.stats()
+    if not stats.empty:
+        click.echo("")
+        click.echo(stats.to_string(float_format="%.1f"))
+
+
+if __name__ == "__main__":
+    cli()
@@ -1,40 +1,60 @@
 # File: training_pipeline.py (Phiên bản TỐI ƯU/TỰ ĐỘNG)
 
+from step.comps_index_step import comps_index_step
 from step.data_ingestion_step import data_ingestion_step
 from step.data_splitter_step import data_splitter_step
+from step.data_validation_step import data_validation_step
+from step.deduplication_step import deduplication_step
+from step.drift_reference_step import drift_reference_step
 from step.feature_engineering_step import feature_engineering_step
+from step.feature_selection_step import feature_selection_step
+from step.feature_store_step import feature_store_step
 from step.handle_missing_value_step import handle_missing_values_step
+from step.incremental_ingestion_step import incremental_ingestion_step
 from step.model_building_step import model_building_step
 from step.evaluator_model_step import model_evaluator_step
 from step.outlier_detection_step import outlier_detection_step
 from zenml import Model, pipeline
-from typing import Annotated, Tuple
+from typing import Annotated, Optional, Tuple
 import pandas as pd
 from sklearn.pipeline import Pipeline
 from zenml import ArtifactConfig
 import logging
+import os
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
+# Đường dẫn mặc định tới dataset (tương đối với thư mục gốc của dự án)
+DATA_PATH = os.path.join("data", "storage.zip")
+
 @pipeline(
     model=Model(name="prices_predictor"),
     enable_cache=False
 )
-def ml_pipeline() -> Tuple[Annotated[Pipeline, "trained_model_pipeline"], Annotated[dict, "evaluation_metrics"]]:
-    """Define an end-to-end machine learning pipeline."""
+def ml_pipeline(file_path: str = DATA_PATH, segment_column: Optional[str] = None, backend: str = "pandas") -> Tuple[Annotated[Pipeline, "trained_model_pipeline"], Annotated[dict, "evaluation_metrics"]]:
+    """Define an end-to-end machine learning pipeline.
+
+    segment_column (vd "Neighborhood"): train 1 mô hình cho mỗi segment + mô hình global cho segment nhỏ.
+    backend ("pandas" / "arrow"): engine tính toán của các bước điền thiếu, feature engineering, lọc outlier.
+    """
 
     logging.info("--- BẮT ĐẦU ML PIPELINE ---")
     target_column = "SalePrice"
     
     # 1. Data Ingestion
     raw_data: Annotated[pd.DataFrame, ArtifactConfig("raw_data")] = data_ingestion_step(
-        file_path="D:\\Project_Portfolio\\HOUSE-PRICE-MLOPS\\data\\storage.zip"
+        file_path=file_path
     )
 
+    # Kiểm tra schema/chất lượng dữ liệu thô: lỗi -> dừng run trước mọi bước tiền xử lý
+    data_validation_step(df=raw_data)
+
     # 2. Handling Missing Values - NUMERIC COLUMNS (Điền mean cho các cột số)
     filled_numeric_data: Annotated[pd.DataFrame, ArtifactConfig("filled_numeric_data")] = handle_missing_values_step(
         df=raw_data, 
-        strategy="mean"
+        strategy="mean",
+        backend=backend,
+        after="data_validation_step"
     )
     # Bước này không xử lý NaN trong cột object (string).
 
@@ -43,7 +63,8 @@ def ml_pipeline() -> Tuple[Annotated[Pipeline, "trained_model_pipeline"], Annota
     filled_data_final: Annotated[pd.DataFrame, ArtifactConfig("filled_data_final")] = handle_missing_values_step(
         df=filled_numeric_data, 
         strategy="constant",
-        fill_value="Missing" 
+        fill_value="Missing",
+        backend=backend
     )
 
     # 4. FEATURE ENGINEERING: ONE-HOT ENCODING (Tự động chọn cột object)
@@ -51,34 +72,65 @@ def ml_pipeline() -> Tuple[Annotated[Pipeline, "trained_model_pipeline"], Annota
     encoded_data: Annotated[pd.DataFrame, ArtifactConfig("encoded_data")] = feature_engineering_step(
         df=filled_data_final, 
         strategy="onehot_encoding", 
-        features=None # ⬅️ Kích hoạt tự động chọn cột object
+        features=None, # ⬅️ Kích hoạt tự động chọn cột object
+        backend=backend
     )
 
     # 5. Feature Engineering: LOG TRANSFORMATION (Áp dụng cho cột số)
     engineered_data: Annotated[pd.DataFrame, ArtifactConfig("engineered_data")] = feature_engineering_step(
         df=encoded_data, 
         strategy="log",
-        features=["Gr Liv Area", target_column] # Vẫn cần chỉ định thủ công các cột cần Log Transform
+        features=["Gr Liv Area", target_column], # Vẫn cần chỉ định thủ công các cột cần Log Transform
+        backend=backend
     )
     
+    # Bỏ tin đăng trùng, gom giao dịch gần trùng (bán lại cùng căn nhà) thành nhóm cho bước split
+    deduplicated_data, duplicate_groups = deduplication_step(
+        df=engineered_data
+    )
+
     # 6. Outlier Detection Step
     clean_data: Annotated[pd.DataFrame, ArtifactConfig("clean_data")] = outlier_detection_step(
-        df=engineered_data
+        df=deduplicated_data,
+        backend=backend
     )
 
-    # 7. Data Splitting Step
-    X_train, y_train, X_test, y_test = data_splitter_step(
+    # Feature store theo PID (version = pipeline run): engineered_data có mọi căn nhà, clean_data là tập train
+    feature_store_step(df=engineered_data, name="engineered_data")
+    feature_store_step(df=clean_data, name="clean_data")
+
+    # Phân phối tham chiếu cho drift monitor (gắn vào model version cùng với mô hình)
+    drift_reference_step(
+        df=clean_data,
+        target_column=target_column
+    )
+
+    # Index comps: k giao dịch lịch sử giống nhất làm bằng chứng cho từng giá dự đoán
+    comps_index_step(
         df=clean_data,
         target_column=target_column
     )
 
-    # 8. Model Building Step
+    # 7. Data Splitting Step (nhóm gần trùng nằm cùng 1 phía train/test)
+    train_matrix, X_test, y_test = data_splitter_step(
+        df=clean_data,
+        target_column=target_column,
+        strategy="group",
+        groups=duplicate_groups
+    )
+
+    # 8. Feature Selection Step (variance threshold + correlation pruning sau OHE), chỉ fit trên tập train
+    selected_train_matrix = feature_selection_step(
+        train_matrix=train_matrix
+    )
+
+    # 9. Model Building Step (fit trực tiếp trên ma trận train memory-map)
     trained_model: Annotated[Pipeline, ArtifactConfig("sklearn_pipeline")] = model_building_step(
-        X_train=X_train, 
-        y_train=y_train
+        train_matrix=selected_train_matrix,
+        segment_column=segment_column
     )
 
-    # 9. Model Evaluation Step
+    # 10. Model Evaluation Step
     evaluation_metrics: Annotated[dict, ArtifactConfig("evaluation_metrics")] = model_evaluator_step(
         trained_model=trained_model,
         X_test=X_test,
@@ -87,4 +139,63 @@ def ml_pipeline() -> Tuple[Annotated[Pipeline, "trained_model_pipeline"], Annota
     
     logging.info("--- HOÀN TẤT ML PIPELINE ---")
 
-    return trained_model, evaluation_metrics
\ No newline at end of file
+    return trained_model, evaluation_metrics
+
+
+@pipeline(
+    model=Model(name="prices_predictor"),
+    enable_cache=False
+)
+def incremental_ml_pipeline(file_path: str = DATA_PATH, refit: bool = False) -> Tuple[Annotated[Pipeline, "trained_model_pipeline"], Annotated[dict, "evaluation_metrics"]]:
+    """ml_pipeline với ingestion tăng dần: chỉ các dòng thêm mới / thay đổi theo PID đi qua tiền xử lý
+    (trạng thái đã fit lưu trong data/incremental), phần còn lại dùng lại bảng clean_data đã xử lý."""
+
+    logging.info("--- BẮT ĐẦU INCREMENTAL ML PIPELINE ---")
+    target_column = "SalePrice"
+
+    raw_data: Annotated[pd.DataFrame, ArtifactConfig("raw_data")] = data_ingestion_step(
+        file_path=file_path
+    )
+    data_validation_step(df=raw_data)
+
+    processed_data, delta_summary = incremental_ingestion_step(
+        df=raw_data,
+        refit=refit,
+        after="data_validation_step"
+    )
+
+    # Như ml_pipeline: bỏ tin đăng trùng, gom giao dịch gần trùng thành nhóm cho bước split
+    clean_data, duplicate_groups = deduplication_step(
+        df=processed_data
+    )
+
+    drift_reference_step(
+        df=clean_data,
+        target_column=target_column
+    )
+    comps_index_step(
+        df=clean_data,
+        target_column=target_column
+    )
+
+    train_matrix, X_test, y_test = data_splitter_step(
+        df=clean_data,
+        target_column=target_column,
+        strategy="group",
+        groups=duplicate_groups
+    )
+    selected_train_matrix = feature_selection_step(
+        train_matrix=train_matrix
+    )
+    trained_model: Annotated[Pipeline, ArtifactConfig("sklearn_pipeline")] = model_building_step(
+        train_matrix=selected_train_matrix
+    )
+    evaluation_metrics: Annotated[dict, ArtifactConfig("evaluation_metrics")] = model_evaluator_step(
+        trained_model=trained_model,
+        X_test=X_test,
+        y_test=y_test
+    )
+
+    logging.info("--- HOÀN TẤT INCREMENTAL ML PIPELINE ---")
+
+    return trained_model, evaluation_metrics
@@ -1,9 +1,39 @@
 import click
-from pipeline.training_pipeline import ml_pipeline
+from pipeline.training_pipeline import incremental_ml_pipeline, ml_pipeline
+from pipeline.local_runner import run_local_pipeline
+from pipeline.experiment_grid import run_experiment_grid
+from pipeline.drift_monitoring import MODEL_NAME, monitor_batches
+from pipeline.retrain_queue import RetrainQueue
+import pandas as pd
 
 
 @click.command()
-def main():
-    run = ml_pipeline()
+@click.option("--local", is_flag=True, default=False, help="Chạy pipeline in-process, không qua ZenML artifact store.")
+@click.option("--grid", is_flag=True, default=False, help="Chạy experiment grid các biến thể tiền xử lý x mô hình.")
+@click.option("--workers", default=None, type=int, help="Số worker song song cho experiment grid.")
+@click.option("--monitor", multiple=True, type=click.Path(exists=True), help="File batch (csv/parquet, cùng schema clean_data) để kiểm tra drift.")
+@click.option("--segment", default=None, help="Cột chia segment để train mô hình riêng (vd Neighborhood, \"MS Zoning\").")
+@click.option("--incremental", is_flag=True, default=False, help="Chỉ xử lý các dòng (PID) thêm mới / thay đổi so với lần chạy trước.")
+@click.option("--refit", is_flag=True, default=False, help="Cùng --incremental: fit lại tiền xử lý trên toàn bộ dữ liệu.")
+@click.option("--backend", default="pandas", type=click.Choice(["pandas", "arrow"]), help="Engine tính toán của các bước tiền xử lý.")
+@click.option("--queue", "enqueue", is_flag=True, default=False, help="Xếp hàng retrain thay vì chạy ngay (worker: python -m pipeline.retrain_queue worker).")
+def main(local: bool, grid: bool, workers: int, monitor: tuple, segment: str, incremental: bool, refit: bool, backend: str, enqueue: bool):
+    if enqueue:
+        pipeline_name, params = ("incremental_ml_pipeline", {"refit": refit}) if incremental else ("ml_pipeline", {"segment_column": segment, "backend": backend})
+        job_id = RetrainQueue().enqueue(MODEL_NAME, trigger="manual", pipeline=pipeline_name, params=params)
+        click.echo(f"Đã xếp hàng job retrain #{job_id}. Xem trạng thái: python -m pipeline.retrain_queue status")
+    elif monitor:
+        batches = (pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path) for path in monitor)
+        summary = monitor_batches(batches)
+        click.echo(summary)
+    elif grid:
+        results = run_experiment_grid(max_workers=workers)
+        click.echo(results.to_string())
+    elif incremental:
+        run = incremental_ml_pipeline(refit=refit)
+    elif local:
+        run = run_local_pipeline(segment_column=segment, backend=backend)
+    else:
+        run = ml_pipeline(segment_column=segment, backend=backend)
 if __name__ == "__main__":
     main()
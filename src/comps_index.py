@@ -0,0 +1,150 @@
+from typing import List, Optional, Tuple
+import json
+import os
+import numpy as np
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Tên file khi lưu CompsIndex ra thư mục (dùng chung với materializer)"""
+COMPS_ARRAYS = ("matrix", "norms", "ids", "prices", "mean", "scale")
+COMPS_MANIFEST = "manifest.json"
+
+
+class CompsIndex:
+    """Tìm k giao dịch lịch sử giống nhất (comps) cho mỗi căn cần định giá.
+
+    - fit: các cột số của clean_data (đã OHE + log) được chuẩn hóa, ghi vào ma trận float32 liền kề (n x p)
+      cùng bình phương chuẩn của từng dòng, PID và giá bán. clean_data lưu target đã log1p -> log_target=True
+      (mặc định) đổi lại bằng np.expm1, giá bán của comps trả về luôn theo thang gốc (đô la).
+    - query: tìm kiếm vét cạn chính xác theo block: d² = |q|² - 2 q·m + |m|², phần q·m là 1 phép nhân
+      ma trận float32 (BLAS) cho cả block truy vấn; argpartition lấy k nhỏ nhất.
+      Với ~250 chiều sau OHE, KD-tree/Ball-tree gần như phải duyệt hết -> vét cạn bằng matmul nhanh hơn.
+    - save/load: các mảng .npy + manifest; load memory-map read-only -> nhiều process scoring dùng chung page.
+    """
+    def __init__(self, id_column="PID", target_column: Optional[str] = "SalePrice", log_target: bool = True,
+                 exclude: Optional[List[str]] = None, block_elements=16_000_000):
+        self.id_column = id_column
+        self.target_column = target_column
+        self.log_target = log_target
+        self.exclude = exclude if exclude is not None else ["Order"]
+        self.block_elements = block_elements
+        self.columns_: List[str] = []
+        self.matrix_: Optional[np.ndarray] = None
+
+    def fit(self, df: pd.DataFrame) -> "CompsIndex":
+        if self.id_column not in df.columns:
+            raise KeyError(f"Không tìm thấy cột định danh '{self.id_column}'.")
+        drop = [self.id_column, self.target_column, *self.exclude]
+        features = df.select_dtypes(include="number").drop(columns=drop, errors="ignore")
+        self.columns_ = features.columns.tolist()
+
+        values = features.to_numpy(dtype=np.float64)
+        self.mean_ = np.nanmean(values, axis=0)
+        self.scale_ = np.nanstd(values, axis=0)
+        self.scale_[self.scale_ == 0] = 1.0
+        self.matrix_ = self._scale(values)
+        self.norms_ = np.einsum("ij,ij->i", self.matrix_, self.matrix_)
+        self.ids_ = df[self.id_column].to_numpy()
+        if self.target_column in df.columns:
+            prices = df[self.target_column].to_numpy(dtype=np.float64)
+            self.prices_ = np.expm1(prices) if self.log_target else prices
+        else:
+            self.prices_ = np.full(len(df), np.nan)
+        logging.info(f"Comps index: {self.matrix_.shape[0]} giao dịch x {self.matrix_.shape[1]} feature "
+                     f"({self.matrix_.nbytes / 1e6:.1f} MB float32).")
+        return self
+
+    def _scale(self, values: np.ndarray) -> np.ndarray:
+        """Chuẩn hóa theo mean/std của tập train, giá trị thiếu -> trung bình (0 sau chuẩn hóa)"""
+        scaled = (values - self.mean_) / self.scale_
+        return np.ascontiguousarray(np.nan_to_num(scaled, nan=0.0), dtype=np.float32)
+
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """Đưa các căn cần truy vấn về không gian của index (float32, đã chuẩn hóa). Cột thiếu -> trung bình."""
+        return self._scale(df.reindex(columns=self.columns_).to_numpy(dtype=np.float64))
+
+    def __len__(self) -> int:
+        return 0 if self.matrix_ is None else len(self.matrix_)
+
+    def query(self, df: pd.DataFrame, k: int = 5) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Trả về (PID, khoảng cách, giá bán thang gốc) của k comps gần nhất cho mỗi dòng, mỗi mảng (m x k), sắp theo khoảng cách.
+        Cột feature thiếu trong df được coi là bằng trung bình."""
+        if self.matrix_ is None:
+            raise RuntimeError("CompsIndex chưa được fit.")
+        k = min(k, len(self))
+        queries = self.transform(df)
+        query_norms = np.einsum("ij,ij->i", queries, queries)
+
+        rows_per_block = max(1, self.block_elements // len(self))
+        neighbours = np.empty((len(queries), k), dtype=np.int64)
+        distances = np.empty((len(queries), k), dtype=np.float32)
+        for start in range(0, len(queries), rows_per_block):
+            stop = min(start + rows_per_block, len(queries))
+            squared = queries[start:stop] @ self.matrix_.T
+            squared *= -2
+            squared += query_norms[start:stop, None]
+            squared += self.norms_[None, :]
+            nearest = np.argpartition(squared, k - 1, axis=1)[:, :k] if k < len(self) else \
+                np.broadcast_to(np.arange(len(self)), squared.shape)
+            nearest_squared = np.take_along_axis(squared, nearest, axis=1)
+            order = np.argsort(nearest_squared, axis=1)
+            neighbours[start:stop] = np.take_along_axis(nearest, order, axis=1)
+            distances[start:stop] = np.sqrt(np.maximum(np.take_along_axis(nearest_squared, order, axis=1), 0))
+
+        return self.ids_[neighbours], distances, self.prices_[neighbours]
+
+    def query_frame(self, df: pd.DataFrame, k: int = 5) -> pd.DataFrame:
+        """Kết quả dạng dài: (dòng truy vấn, hạng, PID comp, khoảng cách, giá bán comp theo thang gốc)"""
+        ids, distances, prices = self.query(df, k)
+        return pd.DataFrame({
+            "row": np.repeat(df.index.to_numpy(), ids.shape[1]),
+            "rank": np.tile(np.arange(1, ids.shape[1] + 1), len(df)),
+            "comp_" + self.id_column: ids.ravel(),
+            "distance": distances.ravel(),
+            "comp_" + str(self.target_column): prices.ravel(),
+        })
+
+    def manifest(self) -> dict:
+        return {
+            "columns": self.columns_,
+            "id_column": self.id_column,
+            "target_column": self.target_column,
+            "log_target": self.log_target,
+            "exclude": self.exclude,
+            "block_elements": self.block_elements,
+        }
+
+    def arrays(self) -> dict:
+        return {"matrix": self.matrix_, "norms": self.norms_, "ids": self.ids_, "prices": self.prices_,
+                "mean": self.mean_, "scale": self.scale_}
+
+    @classmethod
+    def from_arrays(cls, manifest: dict, arrays: dict) -> "CompsIndex":
+        index = cls(id_column=manifest["id_column"], target_column=manifest["target_column"],
+                    log_target=manifest.get("log_target", False), exclude=manifest["exclude"], block_elements=manifest["block_elements"])
+        index.columns_ = manifest["columns"]
+        index.matrix_, index.norms_, index.ids_ = arrays["matrix"], arrays["norms"], arrays["ids"]
+        index.prices_, index.mean_, index.scale_ = arrays["prices"], arrays["mean"], arrays["scale"]
+        return index
+
+    def save(self, directory: str) -> "CompsIndex":
+        """Ghi ra thư mục và trả về bản memory-map (read-only) trên các file vừa ghi."""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self.arrays().items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        with open(os.path.join(directory, COMPS_MANIFEST), "w") as f:
+            json.dump(self.manifest(), f)
+        return CompsIndex.load(directory)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "CompsIndex":
+        with open(os.path.join(directory, COMPS_MANIFEST)) as f:
+            manifest = json.load(f)
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in COMPS_ARRAYS}
+        return cls.from_arrays(manifest, arrays)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,319 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional
+import io
+import zipfile
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Chuỗi được hiểu là null khi đọc CSV: giống danh sách mặc định của pandas.read_csv (Ames dùng "NA")"""
+NULL_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+               "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+
+def read_arrow(file_path: str) -> pa.Table:
+    """Đọc .zip (mọi CSV bên trong, không giải nén ra đĩa) / .csv / .csv.gz / .parquet thẳng thành pa.Table"""
+    convert = pa_csv.ConvertOptions(null_values=NULL_VALUES, strings_can_be_null=True)
+    if file_path.endswith(".parquet"):
+        return pq.read_table(file_path)
+    if file_path.endswith(".zip"):
+        with zipfile.ZipFile(file_path, "r") as zip_ref:
+            members = sorted(name for name in zip_ref.namelist() if name.endswith(".csv"))
+            if not members:
+                raise FileNotFoundError(f"Không tồn tại bất kì file CSV nào trong {file_path}.")
+            tables = [pa_csv.read_csv(io.BytesIO(zip_ref.read(name)), convert_options=convert) for name in members]
+        return pa.concat_tables(tables, promote_options="permissive")
+    return pa_csv.read_csv(file_path, convert_options=convert)
+
+
+def is_numeric(column) -> bool:
+    return pa.types.is_integer(column.type) or pa.types.is_floating(column.type)
+
+
+def is_string(column) -> bool:
+    return pa.types.is_string(column.type) or pa.types.is_large_string(column.type)
+
+
+def numeric_columns(table: pa.Table) -> List[str]:
+    return [name for name, column in zip(table.column_names, table.columns) if is_numeric(column)]
+
+
+def string_columns(table: pa.Table) -> List[str]:
+    return [name for name, column in zip(table.column_names, table.columns) if is_string(column)]
+
+
+def _as_float(column) -> pa.ChunkedArray:
+    return pc.cast(column, pa.float64())
+
+
+def _set_columns(table: pa.Table, columns: Dict[str, pa.ChunkedArray]) -> pa.Table:
+    for name, column in columns.items():
+        table = table.set_column(table.column_names.index(name), name, column)
+    return table
+
+
+def _any(masks: List[pa.ChunkedArray], n_rows: int) -> pa.ChunkedArray:
+    """OR theo dòng của nhiều mask bool (null -> False)"""
+    result = pa.chunked_array([pa.array(np.zeros(n_rows, dtype=bool))])
+    for mask in masks:
+        result = pc.or_(result, pc.fill_null(mask, False))
+    return result
+
+
+class ComputeBackend(ABC):
+    """Nơi thực thi các strategy của MissingValueHandler, FeatureEngineer, OutlierDetector.
+
+    Strategy giữ tham số (method, features, threshold, ...); backend quyết định chạy trên kiểu dữ liệu nào:
+    - PandasBackend: pd.DataFrame, gọi thẳng code pandas của strategy (hành vi hiện tại)
+    - ArrowBackend: pa.Table, cài đặt bằng pyarrow.compute trên buffer Arrow (không qua cột object của pandas)
+    """
+    name = ""
+
+    @abstractmethod
+    def from_pandas(self, df: pd.DataFrame):
+        pass
+
+    @abstractmethod
+    def to_pandas(self, data) -> pd.DataFrame:
+        pass
+
+    @abstractmethod
+    def handle_missing(self, strategy, data):
+        pass
+
+    @abstractmethod
+    def transform(self, strategy, data):
+        pass
+
+    @abstractmethod
+    def detect_outliers(self, strategy, data):
+        """Mask outlier theo từng cột (cùng shape với data)"""
+        pass
+
+    @abstractmethod
+    def remove_rows(self, data, outliers):
+        """Giữ các dòng không bị đánh dấu outlier ở cột nào"""
+        pass
+
+    @abstractmethod
+    def cap(self, data, lower_quantile: float, upper_quantile: float):
+        pass
+
+
+class PandasBackend(ComputeBackend):
+    name = "pandas"
+
+    def from_pandas(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df
+
+    def to_pandas(self, data: pd.DataFrame) -> pd.DataFrame:
+        return data
+
+    def handle_missing(self, strategy, data: pd.DataFrame) -> pd.DataFrame:
+        return strategy.handle(data)
+
+    def transform(self, strategy, data: pd.DataFrame) -> pd.DataFrame:
+        return strategy.transformation(data)
+
+    def detect_outliers(self, strategy, data: pd.DataFrame) -> pd.DataFrame:
+        return strategy.detected_outlier(data)
+
+    def remove_rows(self, data: pd.DataFrame, outliers: pd.DataFrame) -> pd.DataFrame:
+        return data[(~outliers).all(axis=1)]
+
+    def cap(self, data: pd.DataFrame, lower_quantile: float, upper_quantile: float) -> pd.DataFrame:
+        from src.outlier_detection import WinsorizationCapper
+        return WinsorizationCapper(lower_quantile=lower_quantile, upper_quantile=upper_quantile).fit_transform(data)
+
+
+class ArrowBackend(ComputeBackend):
+    """Cài đặt pyarrow.compute cho các strategy phổ biến. Strategy chưa có kernel Arrow (KNN/iterative imputer,
+    rare/target/hashing encoding, strategy đã fit trạng thái như FillMissingValuesStrategy.fit, ZScoreOutlierDetection.fit)
+    -> chạy bằng PandasBackend cho riêng lần gọi đó (log cảnh báo), nên chọn backend "arrow" không làm strategy nào hỏng.
+
+    Kết quả khớp với PandasBackend (xem benchmark/compute_backend_parity.py): cột số có null được đưa về float64
+    khi điền như pandas, OneHot theo thứ tự category đã sắp xếp + drop first như sklearn, std ddof=1 cho z-score
+    (pandas) và ddof=0 cho StandardScaling (sklearn).
+    """
+    name = "arrow"
+
+    def from_pandas(self, df: pd.DataFrame) -> pa.Table:
+        return pa.Table.from_pandas(df, preserve_index=False)
+
+    def to_pandas(self, data: pa.Table) -> pd.DataFrame:
+        return data.to_pandas()
+
+    def _fallback(self, operation: str, strategy, data: pa.Table) -> pa.Table:
+        """Strategy chưa có kernel Arrow -> chạy bằng PandasBackend cho lần gọi này rồi đổi lại pa.Table"""
+        logging.warning(f"ArrowBackend chưa hỗ trợ {type(strategy).__name__} -> dùng PandasBackend cho bước này.")
+        result = getattr(PandasBackend(), operation)(strategy, self.to_pandas(data))
+        return self.from_pandas(result)
+
+    # ---------------- Missing values ----------------
+    def handle_missing(self, strategy, data: pa.Table) -> pa.Table:
+        from src.handle_missing_values import DropMissingValueStrategy, FillMissingValuesStrategy
+        if isinstance(strategy, FillMissingValuesStrategy) and strategy.statistics_ is None:
+            if strategy.method == "constant":
+                return self._fill_constant(data, strategy.fill_value)
+            return self._fill_statistic(data, strategy.method)
+        if isinstance(strategy, DropMissingValueStrategy) and strategy.axis == 0 and strategy.thresh is None:
+            return data.drop_null()
+        return self._fallback("handle_missing", strategy, data)
+
+    def _fill_statistic(self, table: pa.Table, method: str) -> pa.Table:
+        filled = {}
+        for name in numeric_columns(table):
+            column = table[name]
+            if column.null_count == 0:
+                continue
+            values = _as_float(column)
+            if method == "mean":
+                value = pc.mean(values)
+            elif method == "median":
+                value = pc.quantile(values, q=0.5)[0]
+            elif method == "mode":
+                value = pc.mode(values)[0]["mode"]
+            else:
+                logging.warning(f"Method '{method}' không được hỗ trợ.")
+                return table
+            filled[name] = pc.fill_null(values, value)
+        logging.info(f"Arrow: điền {len(filled)} cột số bằng {method}.")
+        return _set_columns(table, filled)
+
+    def _fill_constant(self, table: pa.Table, fill_value) -> pa.Table:
+        if fill_value is None:
+            logging.warning("Sử dụng strategy='constant' nhưng 'fill_value' là None. Không có gì được điền.")
+            return table
+        targets = string_columns(table) if isinstance(fill_value, str) else numeric_columns(table)
+        filled = {name: pc.fill_null(table[name], fill_value) for name in targets if table[name].null_count}
+        logging.info(f"Arrow: điền {len(filled)} cột bằng hằng số {fill_value!r}.")
+        return _set_columns(table, filled)
+
+    # ---------------- Feature engineering ----------------
+    def transform(self, strategy, data: pa.Table) -> pa.Table:
+        from src.feature_engineering import LogTransformation, MinMaxScaling, OneHotEncoding, StandardScaling
+        if isinstance(strategy, LogTransformation):
+            features = [f for f in strategy._features if f in data.column_names and is_numeric(data[f])]
+            return _set_columns(data, {f: pc.log1p(_as_float(data[f])) for f in features})
+        if isinstance(strategy, StandardScaling):
+            features = [f for f in strategy._features if f in data.column_names and is_numeric(data[f])]
+            return _set_columns(data, {f: self._standardize(data[f]) for f in features})
+        if isinstance(strategy, MinMaxScaling):
+            low, high = strategy.scaler.feature_range
+            features = [f for f in strategy._features if f in data.column_names and is_numeric(data[f])]
+            return _set_columns(data, {f: self._min_max(data[f], low, high) for f in features})
+        if isinstance(strategy, OneHotEncoding) and strategy.fitted_columns_ is None:
+            return self._one_hot(data, strategy._features)
+        return self._fallback("transform", strategy, data)
+
+    @staticmethod
+    def _standardize(column) -> pa.ChunkedArray:
+        values = _as_float(column)
+        std = pc.stddev(values, ddof=0).as_py() or 1.0
+        return pc.divide(pc.subtract(values, pc.mean(values)), std)
+
+    @staticmethod
+    def _min_max(column, low: float, high: float) -> pa.ChunkedArray:
+        values = _as_float(column)
+        bounds = pc.min_max(values)
+        span = (bounds["max"].as_py() - bounds["min"].as_py()) or 1.0
+        return pc.add(pc.multiply(pc.divide(pc.subtract(values, bounds["min"]), span), high - low), low)
+
+    def _one_hot(self, table: pa.Table, features: list) -> pa.Table:
+        """dictionary_encode mỗi cột 1 lần; cột dummy của level k = (chỉ số == k), level nhỏ nhất bị drop"""
+        features = features or string_columns(table)
+        ohe_cols = [col for col in features if col in table.column_names and is_string(table[col])]
+        if not ohe_cols:
+            logging.warning("Không tìm thấy cột object/categorical nào hợp lệ để áp dụng OneHotEncoding.")
+            return table
+
+        names, arrays = [], []
+        for col in ohe_cols:
+            encoded = pc.dictionary_encode(table[col].combine_chunks())
+            levels = encoded.dictionary
+            order = pc.sort_indices(levels)
+            # rank[i] = vị trí của level i sau khi sắp xếp -> chỉ số theo thứ tự của sklearn
+            rank = np.empty(len(levels), dtype=np.int32)
+            rank[order.to_numpy()] = np.arange(len(levels), dtype=np.int32)
+            indices = pc.take(pa.array(rank), encoded.indices)
+            sorted_levels = pc.take(levels, order).to_pylist()
+            for k, level in enumerate(sorted_levels[1:], start=1):
+                names.append(f"{col}_{level}")
+                arrays.append(pc.cast(pc.equal(indices, k), pa.float64()))
+
+        kept = table.drop_columns(ohe_cols)
+        result = pa.Table.from_arrays(kept.columns + arrays, names=kept.column_names + names)
+        logging.info(f"Arrow: OneHot {len(ohe_cols)} cột -> bảng mới có {result.num_columns} cột.")
+        return result
+
+    # ---------------- Outliers ----------------
+    def detect_outliers(self, strategy, data: pa.Table) -> pa.Table:
+        from src.outlier_detection import IQROutlierDetection, ZScoreOutlierDetection
+        columns = numeric_columns(data)
+        if isinstance(strategy, ZScoreOutlierDetection) and strategy.mean_ is None:
+            masks = [self._zscore_mask(data[col], strategy._threshold) for col in columns]
+        elif isinstance(strategy, IQROutlierDetection):
+            masks = [self._iqr_mask(data[col]) for col in columns]
+        else:
+            return self._fallback("detect_outliers", strategy, data)
+        return pa.Table.from_arrays(masks, names=columns)
+
+    @staticmethod
+    def _zscore_mask(column, threshold: float) -> pa.ChunkedArray:
+        values = _as_float(column)
+        zscore = pc.abs(pc.divide(pc.subtract(values, pc.mean(values)), pc.stddev(values, ddof=1)))
+        return pc.fill_null(pc.greater(zscore, threshold), False)
+
+    @staticmethod
+    def _iqr_mask(column) -> pa.ChunkedArray:
+        values = _as_float(column)
+        q1, q3 = pc.quantile(values, q=[0.25, 0.75]).to_pylist()
+        iqr = q3 - q1
+        outside = pc.or_(pc.less(values, q1 - 1.5 * iqr), pc.greater(values, q3 + 1.5 * iqr))
+        return pc.fill_null(outside, False)
+
+    def remove_rows(self, data: pa.Table, outliers: pa.Table) -> pa.Table:
+        return data.filter(pc.invert(_any(outliers.columns, data.num_rows)))
+
+    def cap(self, data: pa.Table, lower_quantile: float, upper_quantile: float) -> pa.Table:
+        capped = {}
+        for col in numeric_columns(data):
+            values = _as_float(data[col])
+            low, high = pc.quantile(values, q=[lower_quantile, upper_quantile]).to_pylist()
+            capped[col] = pc.max_element_wise(pc.min_element_wise(values, high), low)
+        return _set_columns(data, capped)
+
+
+BACKENDS = {"pandas": PandasBackend, "arrow": ArrowBackend}
+
+
+def get_backend(backend: Optional[object] = None) -> ComputeBackend:
+    """None -> PandasBackend; tên ("pandas"/"arrow") hoặc instance ComputeBackend"""
+    if backend is None:
+        return PandasBackend()
+    if isinstance(backend, ComputeBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend không được hỗ trợ: {backend}. Chọn một trong {list(BACKENDS)}")
+    return BACKENDS[backend]()
+
+
+def apply_to_frame(backend: Optional[object], func: Callable, df: pd.DataFrame) -> pd.DataFrame:
+    """Chạy func (nhận và trả dữ liệu của backend) trên 1 DataFrame, trả lại DataFrame -> dùng ở ranh giới step,
+    nơi artifact vẫn là pandas. Số dòng không đổi -> giữ index gốc của df (Arrow không mang index, mà index
+    được dùng để khớp với duplicate_groups ở bước split)."""
+    compute = get_backend(backend)
+    result = compute.to_pandas(func(compute.from_pandas(df)))
+    if compute.name != PandasBackend.name and len(result) == len(df):
+        result.index = df.index
+    return result
+
+
+if __name__ == "__main__":
+    pass
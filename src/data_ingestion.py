@@ -1,7 +1,17 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, List, Optional
 import pandas as pd
+from src.resource_control import ResourceAllocation, ResourceController, core_budget
 import zipfile
+import glob
+import logging
 import os
+import time
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+SHARD_EXTENSIONS = (".zip", ".csv", ".csv.gz", ".parquet")
 
 
 """Product - Sản phẩm trừu tượng -- Chứa rất nhiều nguồn dữ liệu"""
@@ -36,13 +46,139 @@ class ZipDataIngestor(DataIngestor):
 
         return df
 
+class CsvDataIngestor(DataIngestor):
+    def ingest(self, file_path: str) -> pd.DataFrame:
+        """Đọc file .csv hoặc .csv.gz (pandas tự nhận dạng nén theo đuôi file)"""
+        return pd.read_csv(file_path)
+
+class ParquetDataIngestor(DataIngestor):
+    def ingest(self, file_path: str) -> pd.DataFrame:
+        return pd.read_parquet(file_path)
+
+def file_extension_of(file_path: str) -> str:
+    """Đuôi file dùng cho DataIngestorFactory: thư mục/glob -> "dir", .csv.gz giữ nguyên 2 phần"""
+    if os.path.isdir(file_path) or glob.has_magic(file_path):
+        return "dir"
+    if file_path.endswith(".csv.gz"):
+        return ".csv.gz"
+    return os.path.splitext(file_path)[1]
+
+def read_shard(file_path: str) -> pd.DataFrame:
+    """Đọc 1 shard. File zip được đọc trực tiếp trong bộ nhớ (không giải nén ra đĩa), mọi CSV bên trong được nối lại."""
+    if file_path.endswith(".zip"):
+        with zipfile.ZipFile(file_path, "r") as zip_ref:
+            members = sorted(name for name in zip_ref.namelist() if name.endswith(".csv"))
+            if not members:
+                raise FileNotFoundError(f"Không tồn tại bất kì file CSV nào trong {file_path}.")
+            frames = []
+            for name in members:
+                with zip_ref.open(name) as f:
+                    frames.append(pd.read_csv(f))
+        return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+    if file_path.endswith(".parquet"):
+        return pd.read_parquet(file_path)
+    return pd.read_csv(file_path)
+
+class DirectoryDataIngestor(DataIngestor):
+    def __init__(self, max_workers: Optional[int] = None, use_processes: bool = True):
+        """
+            - Nhận 1 thư mục hoặc 1 glob pattern chứa nhiều shard (.zip/.csv/.csv.gz/.parquet)
+            - max_workers: số worker đọc song song (mặc định = ngân sách core, xem src/resource_control.py)
+            - use_processes: True -> process pool (parse CSV giữ GIL), False -> thread pool
+        """
+        self.max_workers = max_workers or core_budget()
+        self.use_processes = use_processes
+        self.allocation_: Optional[ResourceAllocation] = None
+
+    def list_shards(self, file_path: str) -> List[str]:
+        """Danh sách shard sắp theo tên -> thứ tự ổn định (vd các shard theo tháng)"""
+        pattern = os.path.join(file_path, "*") if os.path.isdir(file_path) else file_path
+        shards = sorted(path for path in glob.glob(pattern) if path.endswith(SHARD_EXTENSIONS))
+        if not shards:
+            raise FileNotFoundError(f"Không tìm thấy shard nào ({', '.join(SHARD_EXTENSIONS)}) trong {file_path}.")
+        return shards
+
+    def _executor(self, n_shards: int):
+        """Process pool theo ResourceController: mỗi worker chỉ dùng phần core còn lại cho BLAS/Arrow"""
+        if self.use_processes:
+            controller = ResourceController(total_cores=core_budget(), max_workers=self.max_workers)
+            self.allocation_ = controller.allocate(n_shards)
+            return controller.process_pool(self.allocation_)
+        return ThreadPoolExecutor(max_workers=self.max_workers)
+
+    def iter_shards(self, file_path: str, columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Đọc song song nhưng trả về từng shard theo đúng thứ tự -> xử lý dạng stream.
+        columns: nếu có, mỗi shard được đưa về đúng schema này (cột thiếu = NaN, cột thừa bị bỏ)."""
+        shards = self.list_shards(file_path)
+        with self._executor(len(shards)) as executor:
+            for path, df in zip(shards, executor.map(read_shard, shards)):
+                logging.info(f"Đã đọc shard {os.path.basename(path)}: {df.shape}")
+                yield df if columns is None else df.reindex(columns=columns)
+
+    def ingest(self, file_path: str) -> pd.DataFrame:
+        """Đọc song song tất cả shard, hợp nhất schema rồi nối thành 1 DataFrame"""
+        start = time.perf_counter()
+        shards = self.list_shards(file_path)
+        logging.info(f"Đọc {len(shards)} shard với {self.max_workers} worker ({'process' if self.use_processes else 'thread'}).")
+        frames = list(self.iter_shards(file_path))
+
+        df = pd.concat(reconcile_schemas(frames), ignore_index=True)
+
+        elapsed = time.perf_counter() - start
+        size_mb = sum(os.path.getsize(path) for path in shards) / 1e6
+        logging.info(f"✅ Ingest {len(df)} dòng ({size_mb:.1f} MB) trong {elapsed:.2f}s "
+                     f"-> {len(df) / elapsed:,.0f} dòng/s, {size_mb / elapsed:.1f} MB/s.")
+        return df
+
+def reconcile_schemas(frames: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """Đưa các shard về chung 1 schema: hợp các cột theo thứ tự xuất hiện đầu tiên.
+
+    Kiểu của 1 cột chỉ xét trên các shard có giá trị khác null (shard toàn NaN -> float64 nhưng không mang kiểu).
+    Cột là số ở shard này nhưng là chuỗi ở shard khác:
+    - mọi giá trị chuỗi đều đổi được sang số (vd "12") -> ép về số
+    - ngược lại -> giữ dạng chuỗi (object), không xóa giá trị nào
+    """
+    columns = list(dict.fromkeys(col for df in frames for col in df.columns))
+    for col in columns:
+        missing = sum(col not in df.columns for df in frames)
+        if missing:
+            logging.warning(f"Cột '{col}' không có trong {missing}/{len(frames)} shard -> điền NaN.")
+
+    kinds = {col: {df[col].dtype.kind for df in frames if col in df.columns and df[col].notna().any()} for col in columns}
+    conflicted = [col for col, k in kinds.items() if "O" in k and k & set("biuf")]
+    to_numeric, to_object = [], []
+    for col in conflicted:
+        values = pd.concat([df[col].dropna() for df in frames if col in df.columns and df[col].dtype.kind == "O"])
+        (to_numeric if pd.to_numeric(values, errors="coerce").notna().all() else to_object).append(col)
+    if to_numeric:
+        logging.warning(f"Các cột lẫn kiểu số/chuỗi (chuỗi đều là số) giữa các shard, ép về số: {to_numeric}")
+    if to_object:
+        logging.warning(f"Các cột lẫn kiểu số/chuỗi giữa các shard, giữ dạng chuỗi: {to_object}")
+
+    reconciled = []
+    for df in frames:
+        df = df.reindex(columns=columns)
+        for col in to_numeric:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        for col in to_object:
+            df[col] = df[col].astype(object)
+        reconciled.append(df)
+    return reconciled
+
 class DataIngestorFactory:
     @staticmethod
     def get_data_ingestor(file_extension: str) -> DataIngestor:
-        """Nếu là file zip thì trả về đối tượng Data Ingestor còn không thì báo lỗi -> đảm bảo tính đa hình
-           File_extension được định nghĩa là chuỗi kí tự đứng sau dấu chấm cuối cùng trong file, dùng để chỉ cái định dạng của file là gì."""
+        """Trả về Data Ingestor theo đuôi file, đuôi không hỗ trợ thì báo lỗi -> đảm bảo tính đa hình
+           File_extension được định nghĩa là chuỗi kí tự đứng sau dấu chấm cuối cùng trong file, dùng để chỉ cái định dạng của file là gì.
+           "dir" là thư mục/glob nhiều shard (xem file_extension_of)."""
         if file_extension == ".zip":
             return ZipDataIngestor()
+        elif file_extension in (".csv", ".csv.gz"):
+            return CsvDataIngestor()
+        elif file_extension == ".parquet":
+            return ParquetDataIngestor()
+        elif file_extension == "dir":
+            return DirectoryDataIngestor()
         else:
             raise ValueError(f"Tệp {file_extension} không được sử dụng cho dự án này.")
 
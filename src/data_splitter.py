@@ -1,7 +1,11 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+import json
+import os
+import numpy as np
 import pandas as pd
 import logging
-from sklearn.model_selection import train_test_split
+from sklearn.model_selection import GroupShuffleSplit, ShuffleSplit, StratifiedShuffleSplit, train_test_split
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -48,6 +52,225 @@ class SimpleTrainTestSplitStrategy(DataSplittingStrategy):
         
         return X_train, y_train, X_test, y_test
 
+class IndexSplittingStrategy(DataSplittingStrategy):
+    """Các strategy chỉ tính chỉ số dòng (vị trí) của train/test, không copy DataFrame.
+
+    split() dựng X/y từ chỉ số: các dòng được ghi đúng 1 lần vào một ma trận liền kề
+    (mặc định float32) theo thứ tự [train..., test...] -> X_train/X_test chỉ là view trên ma trận đó.
+    Peak memory của bước split ~ 1 bản ma trận (float32 = 1/2 bản float64 gốc) + 1 cột tạm.
+    """
+    def __init__(self, test_size=0.2, random_state=42, dtype=np.float32):
+        self.test_size = test_size
+        self.random_state = random_state
+        self.dtype = dtype
+
+    @abstractmethod
+    def split_indices(self, df: pd.DataFrame, target_column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Trả về (train_idx, test_idx) là mảng vị trí dòng (dùng với iloc / numpy)."""
+        pass
+
+    def split(self, df: pd.DataFrame, target_column: str):
+        logging.info(f"Thực hiện chia dữ liệu theo chỉ số dòng với {type(self).__name__}.")
+        train_idx, test_idx = self.split_indices(df, target_column)
+
+        feature_columns = df.columns.drop(target_column)
+        non_numeric = [col for col in feature_columns if df[col].dtype.kind not in "biuf"]
+        if non_numeric:
+            raise TypeError(f"Các cột không phải kiểu số, không thể dựng ma trận {np.dtype(self.dtype).name}: {non_numeric[:5]}")
+
+        order = np.concatenate([train_idx, test_idx])
+        n_train = len(train_idx)
+
+        # Ghi từng cột vào ma trận liền kề theo thứ tự dòng [train..., test...]
+        matrix = np.empty((len(order), len(feature_columns)), dtype=self.dtype)
+        for j, col in enumerate(feature_columns):
+            matrix[:, j] = df[col].to_numpy()[order]
+        target = df[target_column].to_numpy()[order].astype(self.dtype, copy=False)
+
+        index = df.index[order]
+        X_train = pd.DataFrame(matrix[:n_train], index=index[:n_train], columns=feature_columns, copy=False)
+        X_test = pd.DataFrame(matrix[n_train:], index=index[n_train:], columns=feature_columns, copy=False)
+        y_train = pd.Series(target[:n_train], index=index[:n_train], name=target_column, copy=False)
+        y_test = pd.Series(target[n_train:], index=index[n_train:], name=target_column, copy=False)
+
+        logging.info(f"Ma trận {matrix.shape} {matrix.dtype} ({matrix.nbytes / 1e6:.1f} MB) dùng chung cho train và test.")
+        logging.info(f"Train set - X: {X_train.shape}, y: {y_train.shape}")
+        logging.info(f"Test set - X: {X_test.shape}, y: {y_test.shape}")
+        logging.info("Đã chia xong tập train và test.")
+
+        return X_train, y_train, X_test, y_test
+
+class RandomIndexSplitStrategy(IndexSplittingStrategy):
+    def split_indices(self, df: pd.DataFrame, target_column: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Cùng cách xáo trộn với train_test_split -> cùng các dòng như SimpleTrainTestSplitStrategy."""
+        splitter = ShuffleSplit(n_splits=1, test_size=self.test_size, random_state=self.random_state)
+        return next(splitter.split(np.empty((len(df), 0))))
+
+class StratifiedBinnedSplitStrategy(IndexSplittingStrategy):
+    def __init__(self, n_bins=10, test_size=0.2, random_state=42, dtype=np.float32):
+        """n_bins: số bin theo quantile của target, train và test giữ cùng phân phối giá."""
+        super().__init__(test_size=test_size, random_state=random_state, dtype=dtype)
+        self.n_bins = n_bins
+
+    def split_indices(self, df: pd.DataFrame, target_column: str) -> Tuple[np.ndarray, np.ndarray]:
+        target = df[target_column].to_numpy()
+        edges = np.unique(np.quantile(target, np.linspace(0, 1, self.n_bins + 1)[1:-1]))
+        bins = np.searchsorted(edges, target, side="right")
+        logging.info(f"Chia target '{target_column}' thành {len(edges) + 1} bin để stratify.")
+
+        splitter = StratifiedShuffleSplit(n_splits=1, test_size=self.test_size, random_state=self.random_state)
+        return next(splitter.split(np.empty((len(df), 0)), bins))
+
+class TimeBasedSplitStrategy(IndexSplittingStrategy):
+    def __init__(self, year_column="Yr Sold", month_column="Mo Sold", test_size=0.2, dtype=np.float32):
+        """Các giao dịch gần nhất (theo năm/tháng bán) vào tập test, không xáo trộn."""
+        super().__init__(test_size=test_size, random_state=None, dtype=dtype)
+        self.year_column = year_column
+        self.month_column = month_column
+
+    def split_indices(self, df: pd.DataFrame, target_column: str) -> Tuple[np.ndarray, np.ndarray]:
+        for col in (self.year_column, self.month_column):
+            if col not in df.columns:
+                raise KeyError(f"Không tìm thấy cột thời gian '{col}'.")
+
+        sold_at = df[self.year_column].to_numpy().astype(np.int64) * 12 + (df[self.month_column].to_numpy().astype(np.int64) - 1)
+        order = np.argsort(sold_at, kind="stable")
+        n_test = int(np.ceil(len(df) * self.test_size))
+        train_idx, test_idx = order[:len(df) - n_test], order[len(df) - n_test:]
+        first = int(sold_at[test_idx].min())
+        logging.info(f"Tập test gồm {n_test} giao dịch gần nhất (từ {first % 12 + 1:02d}/{first // 12}).")
+        return train_idx, test_idx
+
+class GroupShuffleSplitStrategy(IndexSplittingStrategy):
+    def __init__(self, groups: pd.Series, test_size=0.2, random_state=42, dtype=np.float32):
+        """groups: id nhóm theo index của df (vd duplicate_group của deduplication_step) -> cả nhóm nằm cùng 1 phía.
+        Dòng không có trong groups là nhóm riêng của chính nó."""
+        super().__init__(test_size=test_size, random_state=random_state, dtype=dtype)
+        self.groups = groups
+
+    def split_indices(self, df: pd.DataFrame, target_column: str) -> Tuple[np.ndarray, np.ndarray]:
+        positions = np.arange(len(df))
+        codes = pd.factorize(self.groups.reindex(df.index))[0]
+        grouped = codes >= 0
+        # Nhãn nhóm = vị trí dòng đầu tiên của nhóm trong df, dòng không có nhóm -> vị trí của chính nó
+        # -> không có nhóm gần trùng nào thì ra cùng tập dòng với RandomIndexSplitStrategy
+        labels = positions.copy()
+        if grouped.any():
+            first = np.full(codes.max() + 1, len(df), dtype=np.int64)
+            np.minimum.at(first, codes[grouped], positions[grouped])
+            labels[grouped] = first[codes[grouped]]
+        n_groups = len(np.unique(labels))
+        logging.info(f"Chia theo nhóm: {len(df)} dòng thuộc {n_groups} nhóm ({len(df) - n_groups} dòng gần trùng đi cùng nhóm).")
+
+        splitter = GroupShuffleSplit(n_splits=1, test_size=self.test_size, random_state=self.random_state)
+        return next(splitter.split(np.empty((len(df), 0)), groups=labels))
+
+MATRIX_FILENAME = "X.npy"
+TARGET_FILENAME = "y.npy"
+INDEX_FILENAME = "index.npy"
+MANIFEST_FILENAME = "manifest.json"
+
+class TrainingMatrix:
+    """Dữ liệu train dạng ma trận liền kề (C-order) để bàn giao cho bước train mô hình.
+
+    - X: (n x p) float32/float64, y: (n,) cùng dtype, columns: tên cột theo thứ tự của X.
+    - save() ghi X, y, index ra .npy + manifest.json; load() mở lại bằng memory-map read-only
+      -> nhiều trainer (process) đọc cùng 1 file dùng chung page cache, không mỗi process 1 bản.
+    - Khi đã gắn với file (path), pickle chỉ gửi đường dẫn, process nhận tự memory-map lại.
+    """
+    def __init__(self, X: np.ndarray, y: np.ndarray, columns: List[str], target_column: str,
+                 index: Optional[np.ndarray] = None, path: Optional[str] = None):
+        if X.ndim != 2 or y.ndim != 1 or len(X) != len(y):
+            raise ValueError(f"X phải là ma trận (n x p) và y là vector (n,), nhận được {X.shape} và {y.shape}")
+        if X.shape[1] != len(columns):
+            raise ValueError(f"Số cột của X ({X.shape[1]}) khác số tên cột ({len(columns)})")
+        self.X = X
+        self.y = y
+        self.columns = list(columns)
+        self.target_column = target_column
+        self.index = index if index is not None else np.arange(len(X))
+        self.path = path
+
+    @classmethod
+    def from_frame(cls, X: pd.DataFrame, y: pd.Series, dtype=np.float32) -> "TrainingMatrix":
+        """Dựng ma trận liền kề từ X/y. Nếu X đã là view trên ma trận cùng dtype (IndexSplittingStrategy) thì không copy."""
+        non_numeric = [col for col in X.columns if X[col].dtype.kind not in "biuf"]
+        if non_numeric:
+            raise TypeError(f"Các cột không phải kiểu số, không thể dựng ma trận {np.dtype(dtype).name}: {non_numeric[:5]}")
+        matrix = np.ascontiguousarray(X.to_numpy(dtype=dtype))
+        target = np.ascontiguousarray(np.asarray(y, dtype=dtype))
+        index = X.index.to_numpy() if X.index.dtype.kind in "iu" else None
+        return cls(matrix, target, X.columns.tolist(), y.name, index)
+
+    @classmethod
+    def from_arrow(cls, table, target_column: str, dtype=np.float32) -> "TrainingMatrix":
+        """Dựng ma trận thẳng từ pa.Table (ArrowBackend), ghi từng cột vào ma trận cấp phát sẵn -> không qua pandas."""
+        import pyarrow as pa
+        features = [name for name in table.column_names if name != target_column]
+        non_numeric = [name for name in features
+                       if not (pa.types.is_integer(table[name].type) or pa.types.is_floating(table[name].type)
+                               or pa.types.is_boolean(table[name].type))]
+        if non_numeric:
+            raise TypeError(f"Các cột không phải kiểu số, không thể dựng ma trận {np.dtype(dtype).name}: {non_numeric[:5]}")
+        matrix = np.empty((table.num_rows, len(features)), dtype=dtype)
+        for j, name in enumerate(features):
+            matrix[:, j] = table[name].to_numpy()
+        target = np.ascontiguousarray(table[target_column].to_numpy(), dtype=dtype)
+        return cls(matrix, target, features, target_column)
+
+    def __len__(self) -> int:
+        return len(self.X)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.X.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.X.nbytes + self.y.nbytes
+
+    def to_frame(self) -> Tuple[pd.DataFrame, pd.Series]:
+        """X, y dạng pandas (view trên ma trận, không copy) cho code cần DataFrame."""
+        X = pd.DataFrame(self.X, index=self.index, columns=self.columns, copy=False)
+        return X, pd.Series(self.y, index=self.index, name=self.target_column, copy=False)
+
+    def select_columns(self, columns: List[str]) -> "TrainingMatrix":
+        """Ma trận mới (liền kề, cùng dtype) chỉ gồm các cột columns theo thứ tự đã cho."""
+        positions = [self.columns.index(col) for col in columns]
+        return TrainingMatrix(np.ascontiguousarray(self.X[:, positions]), np.asarray(self.y), columns,
+                              self.target_column, np.asarray(self.index))
+
+    def manifest(self) -> dict:
+        return {
+            "columns": self.columns,
+            "target_column": self.target_column,
+            "dtype": self.X.dtype.name,
+            "shape": list(self.X.shape),
+        }
+
+    def save(self, directory: str) -> "TrainingMatrix":
+        """Ghi ra thư mục và trả về bản memory-map (read-only) trên các file vừa ghi."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, MATRIX_FILENAME), self.X)
+        np.save(os.path.join(directory, TARGET_FILENAME), self.y)
+        np.save(os.path.join(directory, INDEX_FILENAME), self.index)
+        with open(os.path.join(directory, MANIFEST_FILENAME), "w") as f:
+            json.dump(self.manifest(), f)
+        return TrainingMatrix.load(directory)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = "r") -> "TrainingMatrix":
+        with open(os.path.join(directory, MANIFEST_FILENAME)) as f:
+            manifest = json.load(f)
+        load = lambda name: np.load(os.path.join(directory, name), mmap_mode=mmap_mode)
+        return cls(load(MATRIX_FILENAME), load(TARGET_FILENAME), manifest["columns"], manifest["target_column"],
+                   load(INDEX_FILENAME), path=directory if mmap_mode else None)
+
+    def __reduce__(self):
+        if self.path is not None:
+            return TrainingMatrix.load, (self.path,)
+        return TrainingMatrix, (self.X, self.y, self.columns, self.target_column, self.index)
+
 class DataSplitter:
     def __init__(self, strategy: DataSplittingStrategy):
         self.strategy = strategy
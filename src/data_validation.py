@@ -0,0 +1,193 @@
+from typing import Dict, List, Optional
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Đường dẫn mặc định của hợp đồng schema dữ liệu thô (tương đối với thư mục gốc của dự án)"""
+CONTRACT_PATH = os.path.join("data", "schema_contract.json")
+
+
+class DataValidationError(ValueError):
+    """Dữ liệu vi phạm hợp đồng schema; report chứa toàn bộ lỗi/cảnh báo"""
+    def __init__(self, report: "ValidationReport"):
+        self.report = report
+        errors = report.errors()
+        preview = "; ".join(f"{issue['column']}: {issue['check']} ({issue['detail']})" for issue in errors[:5])
+        super().__init__(f"{len(errors)} lỗi dữ liệu: {preview}{' ...' if len(errors) > 5 else ''}")
+
+
+class ValidationReport:
+    """Kết quả kiểm tra: danh sách issue {column, check, severity, detail, n_rows}"""
+    def __init__(self, n_rows: int, n_columns: int):
+        self.n_rows = n_rows
+        self.n_columns = n_columns
+        self.issues: List[dict] = []
+        self.duration_ms = 0.0
+
+    def add(self, column: str, check: str, severity: str, detail: str, n_rows: int = 0):
+        self.issues.append({"column": column, "check": check, "severity": severity, "detail": detail, "n_rows": int(n_rows)})
+
+    def errors(self) -> List[dict]:
+        return [issue for issue in self.issues if issue["severity"] == "error"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors()
+
+    def raise_for_errors(self) -> "ValidationReport":
+        if not self.ok:
+            raise DataValidationError(self)
+        return self
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.issues, columns=["column", "check", "severity", "detail", "n_rows"])
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "n_rows": self.n_rows,
+            "n_columns": self.n_columns,
+            "n_errors": len(self.errors()),
+            "n_warnings": len(self.issues) - len(self.errors()),
+            "duration_ms": round(self.duration_ms, 3),
+            "issues": self.issues,
+        }
+
+
+class SchemaContract:
+    """Hợp đồng schema cho dữ liệu thô: cột bắt buộc, kiểu (numeric/categorical), miền giá trị, tỉ lệ null, tập category.
+
+    validate() kiểm tra theo cột và vector hóa: các cột số được gom thành 1 ma trận -> tỉ lệ null và số giá trị
+    ngoài miền tính bằng 1 phép so sánh trên cả ma trận; cột category dùng isin (hash) -> vài ms cho batch
+    vài nghìn dòng, đủ rẻ để gọi trên mọi batch scoring.
+
+    Mức lỗi:
+    - error: thiếu cột, sai kiểu (giá trị không đổi được sang số), giá trị ngoài miền, null ở cột không được null,
+      tỉ lệ null / category lạ vượt ngưỡng (chỉ khi batch >= min_rows_for_rates dòng, batch nhỏ -> warning)
+    - warning: cột thừa, có category lạ dưới ngưỡng
+    """
+    def __init__(self, columns: Dict[str, dict], target_column: Optional[str] = "SalePrice",
+                 max_unknown_rate=0.05, min_rows_for_rates=30):
+        self.columns = columns
+        self.target_column = target_column
+        self.max_unknown_rate = max_unknown_rate
+        self.min_rows_for_rates = min_rows_for_rates
+        # Index hash của từng tập category, dựng 1 lần -> mỗi batch chỉ còn get_indexer
+        self._domains = {col: pd.Index(spec["domain"]) for col, spec in columns.items() if spec.get("domain") is not None}
+
+    @classmethod
+    def infer(cls, df: pd.DataFrame, target_column: Optional[str] = "SalePrice",
+              non_nullable: Optional[List[str]] = None, null_slack=0.2, range_margin=1.0,
+              max_categories=100) -> "SchemaContract":
+        """Suy ra hợp đồng từ dữ liệu tham chiếu.
+        - miền số: [min - range_margin x (max - min), max + range_margin x (max - min)], cột không âm giữ cận dưới 0
+        - max_null_rate = tỉ lệ null tham chiếu + null_slack; cột trong non_nullable (mặc định PID + target) -> 0
+        """
+        non_nullable = non_nullable if non_nullable is not None else [col for col in ("PID", target_column) if col]
+        null_rates = df.isna().mean()
+        columns = {}
+        for col in df.columns:
+            spec = {"max_null_rate": 0.0 if col in non_nullable else min(1.0, round(float(null_rates[col]) + null_slack, 4))}
+            if pd.api.types.is_numeric_dtype(df[col]):
+                low, high = float(df[col].min()), float(df[col].max())
+                margin = range_margin * (high - low)
+                spec.update(kind="numeric", min=max(low - margin, 0.0) if low >= 0 else low - margin, max=high + margin)
+            else:
+                levels = df[col].dropna().astype(str).unique()
+                spec.update(kind="categorical", domain=sorted(levels.tolist()) if len(levels) <= max_categories else None)
+            columns[col] = spec
+        return cls(columns, target_column=target_column)
+
+    def to_dict(self) -> dict:
+        return {
+            "target_column": self.target_column,
+            "max_unknown_rate": self.max_unknown_rate,
+            "min_rows_for_rates": self.min_rows_for_rates,
+            "columns": self.columns,
+        }
+
+    def save(self, path: str) -> "SchemaContract":
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+        return self
+
+    @classmethod
+    def load(cls, path: str) -> "SchemaContract":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["columns"], target_column=data["target_column"],
+                   max_unknown_rate=data["max_unknown_rate"], min_rows_for_rates=data["min_rows_for_rates"])
+
+    def validate(self, df: pd.DataFrame, with_target: bool = True) -> ValidationReport:
+        """Kiểm tra df theo hợp đồng. with_target=False cho batch scoring (không có cột target)."""
+        start = time.perf_counter()
+        report = ValidationReport(len(df), len(df.columns))
+        rates_severity = "error" if len(df) >= self.min_rows_for_rates else "warning"
+        expected = {col: spec for col, spec in self.columns.items() if with_target or col != self.target_column}
+
+        for col in [col for col in expected if col not in df.columns]:
+            report.add(col, "missing_column", "error", "cột bắt buộc không có trong dữ liệu", len(df))
+        for col in [col for col in df.columns if col not in self.columns]:
+            report.add(col, "unexpected_column", "warning", "cột không có trong hợp đồng")
+        present = [col for col in expected if col in df.columns]
+
+        # Tỉ lệ null: 1 phép isna trên cả frame
+        null_counts = df[present].isna().sum().to_numpy()
+        max_null = np.array([expected[col]["max_null_rate"] for col in present])
+        for i in np.flatnonzero(null_counts > max_null * len(df)):
+            col = present[i]
+            severity = "error" if max_null[i] == 0 else rates_severity
+            report.add(col, "null_rate", severity, f"{null_counts[i] / max(len(df), 1):.1%} null > cho phép {max_null[i]:.1%}", null_counts[i])
+
+        self._check_numeric(df, [col for col in present if expected[col]["kind"] == "numeric"], report)
+        nulls = dict(zip(present, null_counts))
+        self._check_categorical(df, [col for col in present if expected[col]["kind"] == "categorical"], nulls, report, rates_severity)
+
+        report.duration_ms = (time.perf_counter() - start) * 1e3
+        return report
+
+    def _check_numeric(self, df: pd.DataFrame, columns: List[str], report: ValidationReport):
+        # Cột đáng lẽ là số nhưng đọc ra object (vd "12a", "N/A"): đếm giá trị không đổi được sang số
+        numeric = [col for col in columns if pd.api.types.is_numeric_dtype(df[col])]
+        for col in [col for col in columns if col not in numeric]:
+            coerced = pd.to_numeric(df[col], errors="coerce")
+            invalid = coerced.isna() & df[col].notna()
+            if invalid.any():
+                examples = df[col][invalid].astype(str).unique()[:3].tolist()
+                report.add(col, "dtype", "error", f"kiểu {df[col].dtype}, giá trị không phải số: {examples}", invalid.sum())
+            else:
+                report.add(col, "dtype", "warning", f"kiểu {df[col].dtype}, đổi được sang số")
+
+        if not numeric:
+            return
+        # Miền giá trị: 1 ma trận (n x p) so với 2 vector cận -> số vi phạm mỗi cột
+        values = df[numeric].to_numpy(dtype=np.float64)
+        low = np.array([self.columns[col]["min"] for col in numeric])
+        high = np.array([self.columns[col]["max"] for col in numeric])
+        with np.errstate(invalid="ignore"):
+            violations = ((values < low) | (values > high)).sum(axis=0)
+        for i in np.flatnonzero(violations):
+            report.add(numeric[i], "range", "error", f"ngoài miền [{low[i]:g}, {high[i]:g}]", violations[i])
+
+    def _check_categorical(self, df: pd.DataFrame, columns: List[str], nulls: Dict[str, int],
+                           report: ValidationReport, rates_severity: str):
+        for col in [col for col in columns if col in self._domains]:
+            values = df[col] if df[col].dtype == object else df[col].astype(str).where(df[col].notna())
+            # Mã -1 = null hoặc ngoài tập category; số null đã có từ bước kiểm tra null -> không cần notna lần nữa
+            codes = self._domains[col].get_indexer(values)
+            n_unknown = int(np.count_nonzero(codes < 0)) - int(nulls[col])
+            if n_unknown:
+                rate = n_unknown / len(df)
+                examples = values[(codes < 0) & values.notna().to_numpy()].unique()[:3].tolist()
+                severity = rates_severity if rate > self.max_unknown_rate else "warning"
+                report.add(col, "category_domain", severity, f"{rate:.1%} giá trị ngoài tập category: {examples}", n_unknown)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,134 @@
+from typing import List, Optional, Tuple
+import time
+import numpy as np
+import pandas as pd
+import logging
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Cột định danh: không tham gia so sánh nội dung dòng"""
+ID_COLUMNS = ["Order", "PID"]
+"""Cột mô tả giao dịch chứ không phải căn nhà (kể cả cột one-hot "Sale Type_*"): bỏ qua khi tìm cùng 1 căn nhà bán lại"""
+SALE_COLUMNS = ["SalePrice", "Yr Sold", "Mo Sold", "Sale Type", "Sale Condition"]
+
+
+def _matching_columns(columns: pd.Index, names: List[str]) -> List[str]:
+    """Cột có tên trong names hoặc là cột one-hot của chúng (name_level)"""
+    prefixes = tuple(f"{name}_" for name in names)
+    return [col for col in columns if col in names or col.startswith(prefixes)]
+
+
+class DuplicateDetector:
+    """Phát hiện giao dịch trùng và gần trùng trong thời gian gần tuyến tính (không so sánh mọi cặp dòng).
+
+    - Trùng tuyệt đối (tin đăng lặp): hash uint64 của cả dòng trừ cột định danh (pd.util.hash_pandas_object,
+      vector hóa) -> duplicated(), giữ dòng đầu tiên.
+    - Gần trùng (cùng căn nhà bán lại, thuộc tính gần như giống hệt): chỉ so các cột thuộc tính căn nhà
+      (bỏ SALE_COLUMNS). LSH theo banding trên feature đã lượng tử hóa:
+        1. mỗi giá trị -> sign(x) * log1p(|x|), chia thành bin rộng 4 x rtol (sai lệch tương đối <= rtol
+           thường rơi cùng bin); mỗi band lấy ngẫu nhiên band_size cột + độ lệch bin ngẫu nhiên riêng
+        2. hash khối cột đã lượng tử của band -> các dòng cùng hash là ứng viên; mỗi dòng chỉ được so với
+           dòng đại diện đầu tiên của bucket -> tối đa n_bands x n cặp
+        3. kiểm tra cặp ứng viên: số cột lệch quá rtol (tương đối) <= max_mismatch
+        4. cặp đạt -> cạnh của đồ thị; connected_components -> nhóm gần trùng
+      Id nhóm = vị trí dòng nhỏ nhất trong nhóm -> dòng không trùng với ai có id = vị trí của chính nó.
+    """
+    def __init__(self, id_columns: Optional[List[str]] = None, sale_columns: Optional[List[str]] = None,
+                 rtol=0.02, max_mismatch=1, n_bands=16, band_size=None, random_state=42, chunk_pairs=20_000):
+        self.id_columns = id_columns if id_columns is not None else ID_COLUMNS
+        self.sale_columns = sale_columns if sale_columns is not None else SALE_COLUMNS
+        self.rtol = rtol
+        self.max_mismatch = max_mismatch
+        self.n_bands = n_bands
+        self.band_size = band_size
+        self.random_state = random_state
+        self.chunk_pairs = chunk_pairs
+
+    def exact_duplicates(self, df: pd.DataFrame) -> np.ndarray:
+        """Mask các dòng trùng tuyệt đối với 1 dòng đứng trước (trừ cột định danh)"""
+        content = df.drop(columns=[col for col in self.id_columns if col in df.columns])
+        hashes = pd.util.hash_pandas_object(content[sorted(content.columns)], index=False)
+        return hashes.duplicated(keep="first").to_numpy()
+
+    def attribute_matrix(self, df: pd.DataFrame) -> Tuple[np.ndarray, List[str]]:
+        excluded = set(_matching_columns(df.columns, self.id_columns + self.sale_columns))
+        columns = [col for col in df.columns if col not in excluded]
+        non_numeric = [col for col in columns if df[col].dtype.kind not in "biuf"]
+        if non_numeric:
+            raise TypeError(f"Phát hiện gần trùng cần cột số (chạy sau OneHotEncoding), các cột không phải số: {non_numeric[:5]}")
+        return df[columns].to_numpy(dtype=np.float64), columns
+
+    def _candidate_pairs(self, X: np.ndarray) -> np.ndarray:
+        """Cặp (đại diện bucket, dòng) của mọi band, đã bỏ trùng; shape (m, 2)"""
+        n, p = X.shape
+        rng = np.random.default_rng(self.random_state)
+        band_size = self.band_size or max(1, int(np.ceil(p / 4)))
+        width = 4 * self.rtol
+        scaled = np.sign(X) * np.log1p(np.abs(X)) / width
+
+        pairs = []
+        for _ in range(self.n_bands):
+            columns = rng.choice(p, size=min(band_size, p), replace=False)
+            quantized = np.floor(scaled[:, columns] + rng.random()).astype(np.int64)
+            hashes = pd.util.hash_pandas_object(pd.DataFrame(quantized), index=False).to_numpy()
+            # Dòng đại diện của mỗi bucket = dòng đầu tiên có cùng hash
+            codes = pd.factorize(hashes)[0]
+            first = np.full(codes.max() + 1, n, dtype=np.int64)
+            np.minimum.at(first, codes, np.arange(n))
+            representative = first[codes]
+            members = np.flatnonzero(representative != np.arange(n))
+            pairs.append(np.column_stack([representative[members], members]))
+
+        pairs = np.concatenate(pairs) if pairs else np.empty((0, 2), dtype=np.int64)
+        return np.unique(pairs, axis=0)
+
+    def _verify(self, X: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+        """Mask các cặp có <= max_mismatch cột lệch tương đối quá rtol; xử lý theo khối chunk_pairs cặp"""
+        keep = np.zeros(len(pairs), dtype=bool)
+        for start in range(0, len(pairs), self.chunk_pairs):
+            block = pairs[start:start + self.chunk_pairs]
+            left, right = X[block[:, 0]], X[block[:, 1]]
+            tolerance = self.rtol * np.maximum(np.abs(left), np.abs(right)) + 1e-9
+            mismatches = (np.abs(left - right) > tolerance).sum(axis=1)
+            keep[start:start + len(block)] = mismatches <= self.max_mismatch
+        return keep
+
+    def near_duplicate_groups(self, df: pd.DataFrame) -> np.ndarray:
+        """Id nhóm gần trùng cho từng dòng (theo vị trí), = vị trí nhỏ nhất trong nhóm"""
+        n = len(df)
+        if n == 0:
+            return np.empty(0, dtype=np.int64)
+        X, _ = self.attribute_matrix(df)
+        pairs = self._candidate_pairs(X)
+        matched = pairs[self._verify(X, pairs)]
+        graph = sparse.coo_matrix((np.ones(len(matched)), (matched[:, 0], matched[:, 1])), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+        group_first = np.full(labels.max() + 1, n, dtype=np.int64)
+        np.minimum.at(group_first, labels, np.arange(n))
+        logging.info(f"Gần trùng: {len(pairs)} cặp ứng viên ({self.n_bands} band), {len(matched)} cặp đạt ngưỡng.")
+        return group_first[labels]
+
+    def deduplicate(self, df: pd.DataFrame, drop_exact: bool = True) -> Tuple[pd.DataFrame, pd.Series, dict]:
+        """(df đã bỏ dòng trùng tuyệt đối, id nhóm gần trùng theo index của df, tóm tắt)"""
+        start = time.perf_counter()
+        exact = self.exact_duplicates(df) if drop_exact else np.zeros(len(df), dtype=bool)
+        deduplicated = df[~exact]
+        positions = self.near_duplicate_groups(deduplicated)
+        groups = pd.Series(deduplicated.index[positions], index=deduplicated.index, name="duplicate_group")
+
+        sizes = np.bincount(positions, minlength=len(deduplicated))
+        summary = {
+            "rows": len(df),
+            "exact_duplicates": int(exact.sum()),
+            "near_duplicate_groups": int((sizes > 1).sum()),
+            "rows_in_near_duplicate_groups": int(sizes[sizes > 1].sum()),
+            "duration_s": round(time.perf_counter() - start, 3),
+        }
+        logging.info(f"Dedup: {summary}")
+        return deduplicated, groups, summary
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,146 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import logging
+from src.deduplication import ID_COLUMNS
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+EPSILON = 1e-6
+"""Cột không được profile mặc định: định danh (Order, PID) và ngày bán tăng dần theo thời gian
+-> batch mới theo thời gian luôn nằm ngoài tham chiếu ở các cột này dù căn nhà không đổi"""
+DRIFT_EXCLUDE = ID_COLUMNS + ["Yr Sold", "Mo Sold"]
+
+class FeatureReference:
+    """Phân phối tham chiếu của từng feature, lấy từ dữ liệu train (clean_data).
+
+    - Cột số: n_bins - 1 biên bin cho mỗi cột, lưu thành 1 ma trận (p x n_bins-1).
+        + Cột ít giá trị (vd dummy OHE 0/1): biên là trung điểm giữa các giá trị -> mỗi bin = 1 category
+        + Cột liên tục: biên theo quantile
+      Biên thừa được đệm bằng +inf -> mọi cột có cùng số bin, tính PSI/KS vector hóa trên cả ma trận.
+    - Cột object: tần suất các category (tối đa max_categories, còn lại gộp vào "other").
+    - exclude: cột bỏ qua, mặc định DRIFT_EXCLUDE (Order, PID, Yr Sold, Mo Sold).
+    """
+    def __init__(self, n_bins=10, max_categories=20, exclude: Optional[List[str]] = None):
+        self.n_bins = n_bins
+        self.max_categories = max_categories
+        self.exclude = exclude if exclude is not None else DRIFT_EXCLUDE
+        self.numeric_columns: List[str] = []
+        self.edges: Optional[np.ndarray] = None
+        self.expected: Optional[np.ndarray] = None
+        self.categorical_columns: Dict[str, List] = {}
+        self.expected_categorical: Dict[str, np.ndarray] = {}
+
+    def _column_edges(self, values: np.ndarray) -> np.ndarray:
+        values = values[~np.isnan(values)]
+        uniques = np.unique(values)
+        if len(uniques) <= self.n_bins:
+            edges = (uniques[:-1] + uniques[1:]) / 2
+        else:
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, self.n_bins + 1)[1:-1]))
+        padded = np.full(self.n_bins - 1, np.inf)
+        padded[:len(edges)] = edges
+        return padded
+
+    def fit(self, df: pd.DataFrame) -> "FeatureReference":
+        logging.info(f"Tạo phân phối tham chiếu cho drift monitor, DataFrame shape: {df.shape}")
+        columns = [col for col in df.columns if col not in self.exclude]
+        self.numeric_columns = [col for col in columns if df[col].dtype.kind in "biuf"]
+        object_columns = [col for col in columns if col not in self.numeric_columns]
+
+        self.edges = np.vstack([self._column_edges(df[col].to_numpy(dtype=np.float64)) for col in self.numeric_columns]) \
+            if self.numeric_columns else np.empty((0, self.n_bins - 1))
+        counts = bin_counts(df[self.numeric_columns].to_numpy(dtype=np.float64), self.edges)
+        self.expected = counts / np.maximum(counts.sum(axis=1, keepdims=True), 1)
+
+        for col in object_columns:
+            freq = df[col].value_counts(normalize=True)
+            categories = freq.index[:self.max_categories].tolist()
+            self.categorical_columns[col] = categories
+            self.expected_categorical[col] = np.append(freq.iloc[:self.max_categories].to_numpy(), 1 - freq.iloc[:self.max_categories].sum())
+
+        logging.info(f"Tham chiếu gồm {len(self.numeric_columns)} cột số và {len(self.categorical_columns)} cột category.")
+        return self
+
+def bin_counts(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """Đếm số giá trị mỗi bin cho tất cả các cột cùng lúc: values (n x p), edges (p x k) -> counts (p x k+1).
+    NaN không được đếm."""
+    n_rows, n_features = values.shape
+    n_bins = edges.shape[1] + 1
+    bins = np.zeros(values.shape, dtype=np.int64)
+    for k in range(edges.shape[1]):
+        bins += values > edges[:, k]
+    valid = ~np.isnan(values)
+    flat = (np.arange(n_features) * n_bins + bins)[valid]
+    return np.bincount(flat, minlength=n_features * n_bins).reshape(n_features, n_bins).astype(np.float64)
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """PSI theo từng hàng của 2 ma trận tỉ lệ (p x bins)"""
+    expected = np.clip(expected, EPSILON, None)
+    actual = np.clip(actual, EPSILON, None)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=1)
+
+def ks_statistic(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """KS trên CDF theo bin: max |CDF_ref - CDF_batch| tại các biên bin"""
+    return np.abs(np.cumsum(expected, axis=1) - np.cumsum(actual, axis=1)).max(axis=1)
+
+class DriftMonitor:
+    """Cập nhật sketch từ các batch dữ liệu scoring. Chỉ giữ ma trận đếm (p x n_bins) và vector đếm
+    category -> bộ nhớ cố định, không phụ thuộc số batch hay số dòng đã thấy."""
+    def __init__(self, reference: FeatureReference):
+        self.reference = reference
+        self.counts = np.zeros_like(reference.expected)
+        self.categorical_counts = {col: np.zeros(len(cats) + 1) for col, cats in reference.categorical_columns.items()}
+        self.n_rows = 0
+
+    def update(self, batch: pd.DataFrame) -> "DriftMonitor":
+        """Cột thiếu trong batch được coi là NaN (không đếm)"""
+        numeric = batch.reindex(columns=self.reference.numeric_columns).to_numpy(dtype=np.float64)
+        self.counts += bin_counts(numeric, self.reference.edges)
+
+        for col, categories in self.reference.categorical_columns.items():
+            if col not in batch.columns:
+                continue
+            codes = pd.Categorical(batch[col], categories=categories).codes
+            codes = np.where(codes < 0, len(categories), codes)
+            self.categorical_counts[col] += np.bincount(codes, minlength=len(categories) + 1)
+
+        self.n_rows += len(batch)
+        return self
+
+    def scores(self) -> pd.DataFrame:
+        """PSI và KS của từng feature so với tham chiếu"""
+        totals = self.counts.sum(axis=1, keepdims=True)
+        actual = self.counts / np.maximum(totals, 1)
+        observed = totals[:, 0] > 0
+        report = pd.DataFrame({
+            "psi": np.where(observed, population_stability_index(self.reference.expected, actual), np.nan),
+            "ks": np.where(observed, ks_statistic(self.reference.expected, actual), np.nan),
+        }, index=self.reference.numeric_columns)
+
+        rows = {}
+        for col, counts in self.categorical_counts.items():
+            if counts.sum() == 0:
+                continue
+            expected = self.reference.expected_categorical[col][None, :]
+            actual = (counts / counts.sum())[None, :]
+            rows[col] = {"psi": population_stability_index(expected, actual)[0], "ks": np.nan}
+        if rows:
+            report = pd.concat([report, pd.DataFrame.from_dict(rows, orient="index")])
+        return report
+
+    def summary(self, psi_threshold=0.2, ks_threshold=0.1) -> dict:
+        """Tóm tắt để log metadata: drift khi có feature vượt ngưỡng PSI hoặc KS"""
+        report = self.scores()
+        drifted = report[(report["psi"] > psi_threshold) | (report["ks"] > ks_threshold)]
+        return {
+            "n_rows_monitored": int(self.n_rows),
+            "max_psi": float(np.nanmax(report["psi"])) if report["psi"].notna().any() else 0.0,
+            "max_ks": float(np.nanmax(report["ks"])) if report["ks"].notna().any() else 0.0,
+            "n_drifted_features": int(len(drifted)),
+            "drifted_features": drifted.sort_values("psi", ascending=False).index[:20].tolist(),
+            "drift_detected": bool(len(drifted) > 0),
+        }
+
+if __name__ == "__main__":
+    pass
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Optional
 from sklearn.base import RegressorMixin
 from sklearn.metrics import r2_score, mean_squared_error
 import numpy as np
@@ -37,5 +38,89 @@ class EvaluatorModel:
         logging.info("Đánh giá mô hình với phương pháp đã chọn.")
         return self._strategy.evaluator(model, X_test, y_test)  # ✅ ĐÃ THÊM RETURN
 
+class ChampionChallengerEvaluator:
+    """So sánh nhiều mô hình trên cùng 1 tập test trong 1 lượt.
+
+    - y_test chuẩn hóa 1 lần, mỗi mô hình predict 1 lần (batch) trên các cột nó cần của X_test
+      -> ma trận sai số bình phương E (n x m), chi phí tăng theo số mô hình chứ không theo số lần load dữ liệu.
+    - Bootstrap ghép cặp: cùng 1 bộ mẫu lại cho mọi mô hình, biểu diễn bằng ma trận trọng số W (B x n)
+      -> MSE/R² của mọi (bootstrap, mô hình) là 1 phép nhân W @ E, làm theo block để giới hạn bộ nhớ.
+    """
+    def __init__(self, n_bootstrap=1000, confidence=0.95, random_state=42, block_size=10_000_000):
+        self.n_bootstrap = n_bootstrap
+        self.confidence = confidence
+        self.random_state = random_state
+        self.block_size = block_size
+        self.names_ = []
+        self.errors_: Optional[np.ndarray] = None
+        self.y_: Optional[np.ndarray] = None
+
+    def evaluate(self, models: Dict[str, RegressorMixin], X_test: pd.DataFrame, y_test: pd.Series,
+                 predictions: Optional[Dict[str, np.ndarray]] = None) -> pd.DataFrame:
+        """Predict mỗi mô hình 1 lần, trả về bảng metrics (mse, r2, số feature) theo tên mô hình.
+        predictions: dự đoán đã có sẵn (vd của mô hình vừa train) -> không predict lại.
+        Mô hình cần cột không có trong X_test (train với bộ feature khác) bị bỏ qua."""
+        predictions = predictions or {}
+        self.y_ = np.asarray(y_test, dtype=np.float64).ravel()
+        names, errors, rows = [], [], []
+        for name, model in models.items():
+            columns = getattr(model, "feature_names_in_", None)
+            if columns is not None:
+                missing = pd.Index(columns).difference(X_test.columns)
+                if len(missing):
+                    logging.warning(f"Bỏ qua mô hình {name}: thiếu {len(missing)} cột trong X_test (vd {missing[:3].tolist()}).")
+                    continue
+                X = X_test[list(columns)]
+            else:
+                X = X_test
+            y_pred = predictions[name] if name in predictions else model.predict(X)
+            y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+            names.append(name)
+            errors.append((self.y_ - y_pred) ** 2)
+            rows.append({"mse": float(errors[-1].mean()), "r2": float(r2_score(self.y_, y_pred)), "num_features": X.shape[1]})
+
+        self.names_ = names
+        self.errors_ = np.column_stack(errors) if errors else np.empty((len(self.y_), 0))
+        table = pd.DataFrame(rows, index=pd.Index(names, name="model"))
+        logging.info(f"Đã đánh giá {len(names)} mô hình trên {len(self.y_)} mẫu test.")
+        return table
+
+    def bootstrap(self) -> Dict[str, np.ndarray]:
+        """MSE và R² của từng mô hình trên B mẫu bootstrap ghép cặp: mỗi mảng (B x m)."""
+        n = len(self.y_)
+        rng = np.random.default_rng(self.random_state)
+        rows_per_block = max(1, self.block_size // max(n, 1))
+        mse, r2 = [], []
+        for start in range(0, self.n_bootstrap, rows_per_block):
+            size = min(rows_per_block, self.n_bootstrap - start)
+            weights = rng.multinomial(n, np.full(n, 1 / n), size=size).astype(np.float64)
+            sse = weights @ self.errors_
+            sum_y = weights @ self.y_
+            sst = weights @ (self.y_ ** 2) - sum_y ** 2 / n
+            mse.append(sse / n)
+            r2.append(1 - sse / sst[:, None])
+        return {"mse": np.vstack(mse), "r2": np.vstack(r2)}
+
+    def compare(self, challenger: str, champion: str) -> dict:
+        """Hiệu metrics challenger - champion trên các mẫu bootstrap ghép cặp.
+        Challenger thắng khi MSE thấp hơn champion ở ít nhất `confidence` tỉ lệ mẫu bootstrap."""
+        i, j = self.names_.index(challenger), self.names_.index(champion)
+        samples = self.bootstrap()
+        mse_diff = samples["mse"][:, i] - samples["mse"][:, j]
+        r2_diff = samples["r2"][:, i] - samples["r2"][:, j]
+        alpha = (1 - self.confidence) / 2
+        win_rate = float((mse_diff < 0).mean())
+        result = {
+            "mse_diff": float(self.errors_[:, i].mean() - self.errors_[:, j].mean()),
+            "mse_diff_ci": [float(v) for v in np.quantile(mse_diff, [alpha, 1 - alpha])],
+            "r2_diff_mean": float(r2_diff.mean()),
+            "r2_diff_ci": [float(v) for v in np.quantile(r2_diff, [alpha, 1 - alpha])],
+            "challenger_win_rate": win_rate,
+            "challenger_wins": bool(win_rate >= self.confidence),
+        }
+        logging.info(f"{challenger} vs {champion}: ΔMSE={result['mse_diff']:.5f} "
+                     f"CI{result['mse_diff_ci']}, thắng {win_rate:.1%} mẫu bootstrap.")
+        return result
+
 if __name__ == "__main__":
     pass
\ No newline at end of file
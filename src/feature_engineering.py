@@ -5,7 +5,8 @@ import pandas as pd
 import numpy as np 
 import logging
 
-from sklearn.preprocessing import MinMaxScaler, StandardScaler, OneHotEncoder
+from sklearn.preprocessing import MinMaxScaler, StandardScaler, OneHotEncoder, TargetEncoder
+from src.compute_backend import get_backend
 
 logging.basicConfig(level = logging.INFO, format ="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -75,31 +76,41 @@ class OneHotEncoding(FeatureEngineeringStrategy):
         """ 
             - spares = false -> trả về một mảng numpy
             - drop = 'first' -> xóa đi cột đầu tiên, nhằm mục đích tránh overfiting bởi vì cột đầu tiên = 1 -(tất cả các cột còn lại) -> có mối quan hệ mật thiết.
+            - Lần gọi đầu fit encoder; các lần sau (cùng instance) chỉ transform với các level đã học
+              -> level mới bị bỏ qua (handle_unknown='ignore'), số cột không đổi
         """
         self._features = features
         self.encoder = OneHotEncoder(sparse_output=False, drop = 'first', handle_unknown='ignore') 
+        self.fitted_columns_ = None
     
     def transformation(self, df: pd.DataFrame) -> pd.DataFrame:
         logging.info("Áp dụng kĩ thuật OneHotEncoding cho các features.")
         df_transformed = df.copy()
         
-        # ✅ LOGIC MỚI: Tự động phát hiện các cột object nếu self._features là rỗng
-        if not self._features:
-            categorical_cols = df_transformed.select_dtypes(include=['object']).columns.tolist()
-            self._features = categorical_cols
-            logging.info(f"✅ Tự động phát hiện {len(self._features)} cột object để OHE.")
-        
-        ohe_cols = [col for col in self._features if col in df_transformed.columns and df_transformed[col].dtype == object]
+        if self.fitted_columns_ is None:
+            # ✅ LOGIC MỚI: Tự động phát hiện các cột object nếu self._features là rỗng
+            if not self._features:
+                categorical_cols = df_transformed.select_dtypes(include=['object']).columns.tolist()
+                self._features = categorical_cols
+                logging.info(f"✅ Tự động phát hiện {len(self._features)} cột object để OHE.")
+            
+            ohe_cols = [col for col in self._features if col in df_transformed.columns and df_transformed[col].dtype == object]
 
-        if not ohe_cols:
-             logging.warning("Không tìm thấy cột object/categorical nào hợp lệ để áp dụng OneHotEncoding.")
-             return df_transformed
+            if not ohe_cols:
+                 logging.warning("Không tìm thấy cột object/categorical nào hợp lệ để áp dụng OneHotEncoding.")
+                 return df_transformed
+        else:
+            ohe_cols = self.fitted_columns_
         
         # 2. Thực hiện OHE
         original_index = df_transformed.index
         
         # Fit/Transform chỉ trên các cột chuỗi
-        transformed_matrix = self.encoder.fit_transform(df_transformed[ohe_cols])
+        if self.fitted_columns_ is None:
+            transformed_matrix = self.encoder.fit_transform(df_transformed[ohe_cols])
+            self.fitted_columns_ = ohe_cols
+        else:
+            transformed_matrix = self.encoder.transform(df_transformed[ohe_cols])
 
         # Tạo DataFrame mới từ kết quả OHE với index GỐC
         encoder_df = pd.DataFrame(
@@ -116,9 +127,145 @@ class OneHotEncoding(FeatureEngineeringStrategy):
         logging.info(f"DataFrame mới có {df_transformed.shape[1]} cột.")
         return df_transformed
     
+def _categorical_columns(df: pd.DataFrame, features: list) -> list:
+    """Cột object cần encode: features chỉ định, hoặc tự động phát hiện nếu features rỗng"""
+    if not features:
+        features = df.select_dtypes(include=['object']).columns.tolist()
+        logging.info(f"✅ Tự động phát hiện {len(features)} cột object để encode.")
+    return [col for col in features if col in df.columns and df[col].dtype == object]
+
+class RareCategoryOneHotEncoding(FeatureEngineeringStrategy):
+    def __init__(self, features: list, min_frequency=0.01, other_label="__other__"):
+        """
+            - min_frequency: level có tần suất < min_frequency được gộp vào other_label
+              -> mỗi cột có tối đa 1/min_frequency level, độ rộng không tăng theo dữ liệu
+            - Level chưa từng gặp lúc inference cũng rơi vào other_label thay vì bị bỏ qua
+        """
+        self._features = features
+        self.min_frequency = min_frequency
+        self.other_label = other_label
+        self.levels_ = None
+        self.encoder = None
+
+    def transformation(self, df: pd.DataFrame) -> pd.DataFrame:
+        logging.info(f"Áp dụng OneHotEncoding có gộp level hiếm (min_frequency={self.min_frequency}).")
+        df_transformed = df.copy()
+        cat_cols = _categorical_columns(df_transformed, self._features) if self.levels_ is None else list(self.levels_)
+
+        if not cat_cols:
+            logging.warning("Không tìm thấy cột object/categorical nào hợp lệ để encode.")
+            return df_transformed
+
+        fitting = self.levels_ is None
+        if fitting:
+            self.levels_ = {}
+            for col in cat_cols:
+                freq = df_transformed[col].value_counts(normalize=True)
+                self.levels_[col] = sorted(freq[freq >= self.min_frequency].index.tolist())
+            # other_label luôn là 1 category -> level mới lúc inference có cột riêng, không bị bỏ qua
+            self.encoder = OneHotEncoder(
+                categories=[self.levels_[col] + [self.other_label] for col in cat_cols],
+                sparse_output=False, drop='first', handle_unknown='ignore'
+            )
+
+        for col in cat_cols:
+            df_transformed[col] = df_transformed[col].where(df_transformed[col].isin(self.levels_[col]), self.other_label)
+
+        if fitting:
+            transformed_matrix = self.encoder.fit_transform(df_transformed[cat_cols])
+        else:
+            transformed_matrix = self.encoder.transform(df_transformed[cat_cols])
+
+        encoder_df = pd.DataFrame(
+            transformed_matrix,
+            columns=self.encoder.get_feature_names_out(cat_cols),
+            index=df_transformed.index
+        )
+        df_transformed = pd.concat([df_transformed.drop(columns=cat_cols), encoder_df], axis=1)
+
+        logging.info(f"DataFrame mới có {df_transformed.shape[1]} cột.")
+        return df_transformed
+
+class HashingEncoding(FeatureEngineeringStrategy):
+    def __init__(self, features: list, n_buckets=64, prefix="hash"):
+        """
+            Hashing trick: mỗi cặp "cột=level" được băm vào 1 trong n_buckets cột dùng chung
+            -> độ rộng luôn là n_buckets, không cần lưu từ điển level, level mới vẫn được encode.
+        """
+        self._features = features
+        self.n_buckets = n_buckets
+        self.prefix = prefix
+
+    def _buckets(self, col: str, values: np.ndarray) -> np.ndarray:
+        """Băm ổn định (siphash của pandas, không phụ thuộc PYTHONHASHSEED) chỉ trên các level unique"""
+        codes, uniques = pd.factorize(values)
+        keys = np.array([f"{col}={value}" for value in uniques], dtype=object)
+        buckets = (pd.util.hash_array(keys) % np.uint64(self.n_buckets)).astype(np.int64)
+        return buckets[codes]
+
+    def transformation(self, df: pd.DataFrame) -> pd.DataFrame:
+        logging.info(f"Áp dụng Hashing encoding với {self.n_buckets} bucket.")
+        df_transformed = df.copy()
+        cat_cols = _categorical_columns(df_transformed, self._features)
+
+        if not cat_cols:
+            logging.warning("Không tìm thấy cột object/categorical nào hợp lệ để encode.")
+            return df_transformed
+
+        rows = np.arange(len(df_transformed))
+        hashed = np.zeros((len(df_transformed), self.n_buckets), dtype=np.float32)
+        for col in cat_cols:
+            np.add.at(hashed, (rows, self._buckets(col, df_transformed[col].to_numpy())), 1.0)
+
+        encoder_df = pd.DataFrame(
+            hashed,
+            columns=[f"{self.prefix}_{i}" for i in range(self.n_buckets)],
+            index=df_transformed.index
+        )
+        df_transformed = pd.concat([df_transformed.drop(columns=cat_cols), encoder_df], axis=1)
+
+        logging.info(f"DataFrame mới có {df_transformed.shape[1]} cột.")
+        return df_transformed
+
+class TargetEncoding(FeatureEngineeringStrategy):
+    def __init__(self, features: list, target_column="SalePrice", cv=5, random_state=42):
+        """
+            Thay mỗi cột categorical bằng 1 cột số: trung bình target (có làm mượt) của level đó.
+            - fit_transform dùng cross-fitting (cv fold): giá trị của 1 dòng chỉ tính từ các fold khác -> không leak target
+            - Lần gọi sau (inference) dùng mapping đã fit trên toàn bộ dữ liệu train
+        """
+        self._features = features
+        self.target_column = target_column
+        self.encoder = TargetEncoder(target_type="continuous", cv=cv, shuffle=True, random_state=random_state)
+        self.fitted_columns_ = None
+
+    def transformation(self, df: pd.DataFrame) -> pd.DataFrame:
+        logging.info("Áp dụng Target encoding (cross-fitted) cho các features.")
+        df_transformed = df.copy()
+
+        if self.fitted_columns_ is None:
+            cat_cols = _categorical_columns(df_transformed, self._features)
+            if not cat_cols:
+                logging.warning("Không tìm thấy cột object/categorical nào hợp lệ để encode.")
+                return df_transformed
+            if self.target_column not in df_transformed.columns:
+                raise KeyError(f"Target encoding cần cột target '{self.target_column}' lúc fit.")
+            transformed_matrix = self.encoder.fit_transform(df_transformed[cat_cols], df_transformed[self.target_column])
+            self.fitted_columns_ = cat_cols
+        else:
+            cat_cols = self.fitted_columns_
+            transformed_matrix = self.encoder.transform(df_transformed[cat_cols])
+
+        df_transformed[cat_cols] = transformed_matrix
+
+        logging.info(f"Đã encode {len(cat_cols)} cột, DataFrame vẫn có {df_transformed.shape[1]} cột.")
+        return df_transformed
+
 class FeatureEngineer:
-    def __init__(self, stratery: FeatureEngineeringStrategy):
+    def __init__(self, stratery: FeatureEngineeringStrategy, backend=None):
+        """backend: None/"pandas" (pd.DataFrame) hoặc "arrow" (pa.Table), xem src/compute_backend.py"""
         self._stratery = stratery
+        self._backend = get_backend(backend)
     
     def set_stratery(self, stratery: FeatureEngineeringStrategy):
         logging.info("Chuyển đổi chiến lược Feature Engineering")
@@ -126,7 +273,7 @@ class FeatureEngineer:
     
     def apply_Transform(self, df: pd.DataFrame) -> pd.DataFrame:
         logging.info("Bắt đầu áp dụng Feature Transformation.")
-        return self._stratery.transformation(df)
+        return self._backend.transform(self._stratery, df)
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -0,0 +1,127 @@
+from abc import ABC, abstractmethod
+from typing import List
+import numpy as np
+import pandas as pd
+import logging
+
+from sklearn.linear_model import Lasso
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+class FeatureSelectionStrategy(ABC):
+    @abstractmethod
+    def select(self, df: pd.DataFrame, target_column: str) -> List[str]:
+        """Trả về danh sách cột feature được giữ lại (không gồm target)"""
+        pass
+
+def _feature_columns(df: pd.DataFrame, target_column: str) -> List[str]:
+    return [col for col in df.columns if col != target_column]
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    """Chuẩn hóa từng cột về mean 0, norm 1 -> Z.T @ Z chính là ma trận tương quan"""
+    values = values - values.mean(axis=0)
+    norms = np.linalg.norm(values, axis=0)
+    norms[norms == 0] = 1.0
+    return values / norms
+
+"""Loại các cột gần như hằng số (vd: dummy OHE của level rất hiếm)"""
+class VarianceThresholdSelection(FeatureSelectionStrategy):
+    def __init__(self, threshold=0.01):
+        self.threshold = threshold
+
+    def select(self, df: pd.DataFrame, target_column: str) -> List[str]:
+        logging.info(f"Chọn feature theo variance threshold={self.threshold}")
+        features = _feature_columns(df, target_column)
+        variances = np.array([df[col].to_numpy(dtype=np.float64).var() for col in features])
+        selected = [col for col, var in zip(features, variances) if var > self.threshold]
+        logging.info(f"Variance threshold: giữ {len(selected)}/{len(features)} cột.")
+        return selected
+
+"""Loại các cột gần như cộng tuyến với cột khác, ma trận tương quan được tính theo từng block cột"""
+class CorrelationPruningSelection(FeatureSelectionStrategy):
+    def __init__(self, threshold=0.95, block_size=128):
+        """
+            - threshold: |corr| lớn hơn ngưỡng thì bỏ cột có tương quan với target yếu hơn
+            - block_size: số cột mỗi block -> bộ nhớ O(n x block_size) thay vì O(n x p) + O(p x p)
+        """
+        self.threshold = threshold
+        self.block_size = block_size
+
+    def select(self, df: pd.DataFrame, target_column: str) -> List[str]:
+        logging.info(f"Chọn feature bằng correlation pruning threshold={self.threshold}")
+        features = _feature_columns(df, target_column)
+        target = _standardize(df[target_column].to_numpy(dtype=np.float64)[:, None])[:, 0]
+
+        # Ưu tiên giữ các cột tương quan mạnh với target: duyệt theo |corr(feature, target)| giảm dần
+        target_corr = np.array([abs(_standardize(df[[col]].to_numpy(dtype=np.float64))[:, 0] @ target) for col in features])
+        ordered = [features[i] for i in np.argsort(-target_corr, kind="stable")]
+
+        kept: List[str] = []
+        kept_matrix = np.empty((len(df), 0))
+        for start in range(0, len(ordered), self.block_size):
+            block_cols = ordered[start:start + self.block_size]
+            block = _standardize(df[block_cols].to_numpy(dtype=np.float64))
+
+            # 1. So với các cột đã giữ ở các block trước
+            drop = np.zeros(len(block_cols), dtype=bool)
+            if kept:
+                drop |= (np.abs(kept_matrix.T @ block) > self.threshold).any(axis=0)
+
+            # 2. Tham lam trong block: giữ cột nếu không tương quan mạnh với cột đã giữ trước nó
+            block_corr = np.abs(block.T @ block)
+            block_kept = []
+            for j in range(len(block_cols)):
+                if drop[j]:
+                    continue
+                if block_kept and (block_corr[j, block_kept] > self.threshold).any():
+                    continue
+                block_kept.append(j)
+
+            kept.extend(block_cols[j] for j in block_kept)
+            kept_matrix = np.hstack([kept_matrix, block[:, block_kept]])
+
+        # Giữ thứ tự cột gốc
+        kept_set = set(kept)
+        selected = [col for col in features if col in kept_set]
+        logging.info(f"Correlation pruning: giữ {len(selected)}/{len(features)} cột.")
+        return selected
+
+"""Giữ các cột có hệ số khác 0 của Lasso (L1) trên dữ liệu đã chuẩn hóa"""
+class L1Selection(FeatureSelectionStrategy):
+    def __init__(self, alpha=0.001, max_iter=5000):
+        self.alpha = alpha
+        self.max_iter = max_iter
+
+    def select(self, df: pd.DataFrame, target_column: str) -> List[str]:
+        logging.info(f"Chọn feature bằng hệ số L1 (Lasso alpha={self.alpha})")
+        features = _feature_columns(df, target_column)
+        X = df[features].to_numpy(dtype=np.float64)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        X = (X - X.mean(axis=0)) / std
+
+        lasso = Lasso(alpha=self.alpha, max_iter=self.max_iter)
+        lasso.fit(X, df[target_column].to_numpy(dtype=np.float64))
+        selected = [col for col, coef in zip(features, lasso.coef_) if coef != 0]
+        logging.info(f"L1 selection: giữ {len(selected)}/{len(features)} cột.")
+        return selected
+
+class FeatureSelector:
+    def __init__(self, strategy: FeatureSelectionStrategy):
+        self._strategy = strategy
+
+    def set_strategy(self, strategy: FeatureSelectionStrategy):
+        logging.info("Chuyển đổi phương pháp chọn feature")
+        self._strategy = strategy
+
+    def select(self, df: pd.DataFrame, target_column: str) -> List[str]:
+        logging.info("Thực thi phương pháp chọn feature đã chọn")
+        return self._strategy.select(df, target_column)
+
+    @staticmethod
+    def apply_selection(df: pd.DataFrame, selected_features: List[str]) -> pd.DataFrame:
+        """Dùng lúc inference: chỉ dựng các cột đã được chọn, cột dummy không xuất hiện thì điền 0"""
+        return df.reindex(columns=selected_features, fill_value=0)
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,254 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterable, List, Optional
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import numpy as np
+import pandas as pd
+import logging
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Đường dẫn mặc định của feature store (tương đối với thư mục gốc của dự án)"""
+FEATURE_STORE_PATH = os.path.join("data", "feature_store.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS feature_versions (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    run_id TEXT,
+    key TEXT NOT NULL,
+    columns TEXT NOT NULL,
+    n_rows INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feature_versions_by_name ON feature_versions(name, version);
+-- 1 dòng / (version, PID): payload = vector float64 của dòng theo thứ tự feature_versions.columns
+CREATE TABLE IF NOT EXISTS features (
+    version INTEGER NOT NULL,
+    pid NOT NULL,
+    payload BLOB NOT NULL,
+    PRIMARY KEY (version, pid)
+) WITHOUT ROWID;
+"""
+
+
+class ConnectionPool:
+    """Pool kết nối SQLite dùng chung giữa các thread (tối đa `size` kết nối, tạo dần khi cần).
+
+    Kết nối mở với check_same_thread=False + WAL -> nhiều reader đọc song song với 1 writer;
+    mượn/trả qua LifoQueue nên kết nối vừa dùng (page cache còn nóng) được dùng lại trước.
+    """
+    def __init__(self, path: str, size: int = 4, timeout: float = 30.0):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._created < self.size
+                if can_open:
+                    self._created += 1
+            conn = self._open() if can_open else self._idle.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        self._created = 0
+
+
+class HotRowCache:
+    """LRU theo (version, PID) -> vector feature; version là bất biến nên không cần invalidation"""
+    def __init__(self, max_rows: int = 10_000):
+        self.max_rows = max_rows
+        self._rows: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, version: int, pids: list) -> dict:
+        found = {}
+        with self._lock:
+            for pid in pids:
+                row = self._rows.get((version, pid))
+                if row is not None:
+                    self._rows.move_to_end((version, pid))
+                    found[pid] = row
+            self.hits += len(found)
+            self.misses += len(pids) - len(found)
+        return found
+
+    def put_many(self, version: int, rows: dict):
+        if self.max_rows <= 0:
+            return
+        with self._lock:
+            for pid, row in rows.items():
+                self._rows[(version, pid)] = row
+                self._rows.move_to_end((version, pid))
+            while len(self._rows) > self.max_rows:
+                self._rows.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+
+class FeatureStore:
+    """Feature store local trên SQLite: các dòng engineered_data / clean_data theo khóa PID, version theo pipeline run.
+
+    - write(df, name, run_id): mỗi lần ghi tạo 1 version mới (bất biến) cho `name`; danh sách cột lưu 1 lần trong
+      feature_versions, mỗi dòng là 1 BLOB float64 -> schema không đổi khi OHE sinh thêm/bớt cột giữa các run.
+    - get_features(pids): đọc hàng loạt bằng 1 câu SELECT (PID truyền vào qua json_each, không giới hạn số biến),
+      ghép các BLOB thành 1 ma trận bằng np.frombuffer; dòng hay được hỏi nằm trong HotRowCache.
+    Scoring 1 căn nhà đã biết -> tra khóa, không phải chạy lại tiền xử lý.
+    """
+    def __init__(self, path: str = FEATURE_STORE_PATH, pool_size: int = 4, cache_rows: int = 10_000):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.pool = ConnectionPool(path, size=pool_size)
+        self.cache = HotRowCache(cache_rows)
+        self._versions = {}
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _transaction(self):
+        with self.pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def write(self, df: pd.DataFrame, name: str = "clean_data", run_id: Optional[str] = None, key: str = "PID") -> int:
+        """Ghi toàn bộ df thành version mới của `name`; trả về số version.
+        PID trùng (tin đăng lại giữ nguyên PID, chưa qua deduplication_step) -> giữ dòng cuối cùng của mỗi PID."""
+        duplicated = df[key].duplicated(keep="last")
+        if duplicated.any():
+            logging.warning(f"Feature store: {int(duplicated.sum())} dòng trùng cột khóa '{key}' -> giữ dòng cuối cùng của mỗi {key}.")
+            df = df[~duplicated]
+        # Cột khóa vẫn nằm trong payload: mô hình của ml_pipeline có PID trong feature_names_in_
+        non_numeric = [col for col in df.columns if df[col].dtype.kind not in "biuf"]
+        if non_numeric:
+            raise TypeError(f"Feature store chỉ lưu cột số, các cột không phải kiểu số: {non_numeric[:5]}")
+
+        start = time.perf_counter()
+        matrix = np.ascontiguousarray(df.to_numpy(dtype=np.float64))
+        pids = df[key].tolist()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT INTO feature_versions (name, run_id, key, columns, n_rows, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, run_id, key, json.dumps(df.columns.tolist()), len(df), time.time()),
+            )
+            version = cursor.lastrowid
+            conn.executemany("INSERT INTO features (version, pid, payload) VALUES (?, ?, ?)",
+                             ((version, pid, row.tobytes()) for pid, row in zip(pids, matrix)))
+        logging.info(f"Feature store: ghi {len(df)} dòng x {df.shape[1]} cột vào '{name}' version {version} "
+                     f"({time.perf_counter() - start:.2f}s).")
+        return version
+
+    def latest_version(self, name: str = "clean_data") -> Optional[int]:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT MAX(version) FROM feature_versions WHERE name = ?", (name,)).fetchone()
+        return row[0]
+
+    def _version_info(self, version: int) -> dict:
+        """(key, columns) của version; version bất biến nên đọc 1 lần rồi giữ trong bộ nhớ"""
+        if version not in self._versions:
+            with self.pool.connection() as conn:
+                row = conn.execute("SELECT name, key, columns FROM feature_versions WHERE version = ?", (version,)).fetchone()
+            if row is None:
+                raise KeyError(f"Không có version {version} trong feature store {self.path}.")
+            self._versions[version] = {"name": row[0], "key": row[1], "columns": json.loads(row[2])}
+        return self._versions[version]
+
+    def versions(self, name: Optional[str] = None) -> pd.DataFrame:
+        query = "SELECT version, name, run_id, n_rows, created_at FROM feature_versions"
+        with self.pool.connection() as conn:
+            if name is None:
+                return pd.read_sql_query(f"{query} ORDER BY version", conn)
+            return pd.read_sql_query(f"{query} WHERE name = ? ORDER BY version", conn, params=(name,))
+
+    def get_features(self, pids: Iterable, name: str = "clean_data", version: Optional[int] = None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Feature (gồm cả cột khóa) của các PID theo thứ tự yêu cầu (index = PID); PID không có trong version bị bỏ qua.
+        columns: chỉ lấy các cột này (vd feature_names_in_ của mô hình)."""
+        version = version if version is not None else self.latest_version(name)
+        if version is None:
+            raise KeyError(f"Feature store chưa có dữ liệu '{name}'.")
+        info = self._version_info(version)
+        pids = list(dict.fromkeys(pd.Index(pids).tolist()))
+
+        rows = self.cache.get_many(version, pids)
+        missing = [pid for pid in pids if pid not in rows]
+        if missing:
+            with self.pool.connection() as conn:
+                fetched = conn.execute(
+                    "SELECT pid, payload FROM features WHERE version = ? AND pid IN (SELECT value FROM json_each(?))",
+                    (version, json.dumps(missing)),
+                ).fetchall()
+            if fetched:
+                block = np.frombuffer(b"".join(payload for _, payload in fetched), dtype=np.float64)
+                block = block.reshape(len(fetched), len(info["columns"]))
+                loaded = {pid: block[i] for i, (pid, _) in enumerate(fetched)}
+                self.cache.put_many(version, loaded)
+                rows.update(loaded)
+
+        found = [pid for pid in pids if pid in rows]
+        if len(found) < len(pids):
+            logging.warning(f"Feature store: {len(pids) - len(found)}/{len(pids)} PID không có trong '{info['name']}' version {version}.")
+        matrix = np.vstack([rows[pid] for pid in found]) if found else np.empty((0, len(info["columns"])))
+        features = pd.DataFrame(matrix, columns=info["columns"], index=pd.Index(found, name=info["key"]))
+        return features[list(columns)] if columns is not None else features
+
+    def predict(self, model, pids: Iterable, name: str = "engineered_data", version: Optional[int] = None) -> pd.Series:
+        """Dự đoán (thang log như đầu ra của mô hình) cho các PID đã có trong store: tra khóa -> model.predict"""
+        columns = getattr(model, "feature_names_in_", None)
+        features = self.get_features(pids, name=name, version=version, columns=None if columns is None else list(columns))
+        return pd.Series(model.predict(features), index=features.index, name="prediction")
+
+    def prune(self, name: str = "clean_data", keep: int = 5) -> int:
+        """Xóa các version cũ của `name`, giữ `keep` version mới nhất; trả về số version đã xóa"""
+        with self._transaction() as conn:
+            old = [row[0] for row in conn.execute(
+                "SELECT version FROM feature_versions WHERE name = ? ORDER BY version DESC LIMIT -1 OFFSET ?", (name, keep))]
+            for version in old:
+                conn.execute("DELETE FROM features WHERE version = ?", (version,))
+                conn.execute("DELETE FROM feature_versions WHERE version = ?", (version,))
+        for version in old:
+            self._versions.pop(version, None)
+        if old:
+            logging.info(f"Feature store: xóa {len(old)} version cũ của '{name}'.")
+        return len(old)
+
+    def close(self):
+        self.pool.close()
+
+
+if __name__ == "__main__":
+    pass
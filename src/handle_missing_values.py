@@ -1,6 +1,13 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
 import pandas as pd
 import logging
+from sklearn.experimental import enable_iterative_imputer  # noqa: F401 (bật IterativeImputer)
+from sklearn.impute import IterativeImputer
+from sklearn.neighbors import BallTree, KDTree
+from src.compute_backend import get_backend
 
 """Thiết lập thông báo lỗi"""
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -28,8 +35,25 @@ class DropMissingValueStrategy(MissingValueHandlingStrategy):
     
 class FillMissingValuesStrategy(MissingValueHandlingStrategy):
     def __init__(self, method="mean", fill_value=None):
+        """
+            - Mặc định mean/median/mode tính trên chính df được điền
+            - Sau fit(df_train): giá trị điền của từng cột số được giữ lại (statistics_)
+              -> điền 1 batch nhỏ (vd delta của ingestion tăng dần) bằng thống kê của dữ liệu train
+        """
         self.method = method
         self.fill_value = fill_value
+        self.statistics_: Optional[pd.Series] = None
+
+    def fit(self, df: pd.DataFrame) -> "FillMissingValuesStrategy":
+        numeric = df.select_dtypes(include="number")
+        if self.method == "mean":
+            self.statistics_ = numeric.mean()
+        elif self.method == "median":
+            self.statistics_ = numeric.median()
+        elif self.method == "mode":
+            modes = numeric.mode()
+            self.statistics_ = modes.iloc[0] if not modes.empty else pd.Series(dtype=float)
+        return self
     
     def handle(self, df: pd.DataFrame) -> pd.DataFrame:
         logging.info(f"Điền các giá trị thiếu với method={self.method}")
@@ -38,7 +62,12 @@ class FillMissingValuesStrategy(MissingValueHandlingStrategy):
         # Chỉ xử lý cột số cho mean, median, mode
         numeric_columns = df_cleaned.select_dtypes(include="number").columns
         
-        if self.method == "mean":
+        if self.statistics_ is not None and self.method in ("mean", "median", "mode"):
+            # Đã fit -> điền bằng thống kê của dữ liệu fit, không tính lại trên df
+            columns = numeric_columns.intersection(self.statistics_.index)
+            df_cleaned[columns] = df_cleaned[columns].fillna(self.statistics_[columns])
+
+        elif self.method == "mean":
             df_cleaned[numeric_columns] = df_cleaned[numeric_columns].fillna(df[numeric_columns].mean())
         
         elif self.method == "median":
@@ -64,9 +93,127 @@ class FillMissingValuesStrategy(MissingValueHandlingStrategy):
         logging.info("Giá trị bị thiếu đã được xử lý.")
         return df_cleaned
 
+"""Cột định danh / target: không dùng làm feature khi tìm láng giềng hay hồi quy"""
+DEFAULT_EXCLUDE = ["Order", "PID", "SalePrice"]
+
+class KNNImputationStrategy(MissingValueHandlingStrategy):
+    def __init__(self, n_neighbors=5, index_columns: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 algorithm="ball_tree", leaf_size=40, batch_size=4096, n_jobs=1):
+        """
+            - Lần gọi đầu (fit): dựng KD-tree/Ball-tree trên các cột số không thiếu (index_columns, đã chuẩn hóa)
+              và giữ lại giá trị các cột số của dữ liệu train (float32)
+            - Mỗi dòng thiếu: tìm n_neighbors nhà giống nhất, điền trung bình giá trị của các láng giềng
+              -> scoring chỉ tốn O(log n) mỗi dòng, không quét lại dữ liệu train
+            - Truy vấn theo batch (batch_size dòng); n_jobs > 1 -> các batch chạy song song trong thread pool
+        """
+        if algorithm not in ("kd_tree", "ball_tree"):
+            raise ValueError(f"algorithm phải là kd_tree hoặc ball_tree, nhận được {algorithm}")
+        self.n_neighbors = n_neighbors
+        self.index_columns = index_columns
+        self.exclude = exclude if exclude is not None else DEFAULT_EXCLUDE
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.tree_ = None
+
+    def fit(self, df: pd.DataFrame) -> "KNNImputationStrategy":
+        numeric = df.select_dtypes(include="number").drop(columns=self.exclude, errors="ignore")
+        self.index_columns_ = self.index_columns or [col for col in numeric.columns if not numeric[col].isnull().any()]
+        if not self.index_columns_:
+            raise ValueError("Không có cột số nào đầy đủ để dựng index láng giềng.")
+        self.columns_ = numeric.columns.tolist()
+
+        index_values = numeric[self.index_columns_].to_numpy(dtype=np.float64)
+        self.index_mean_ = np.nanmean(index_values, axis=0)
+        self.index_scale_ = np.nanstd(index_values, axis=0)
+        self.index_scale_[self.index_scale_ == 0] = 1.0
+        index_values = (np.where(np.isnan(index_values), self.index_mean_, index_values) - self.index_mean_) / self.index_scale_
+
+        tree_class = KDTree if self.algorithm == "kd_tree" else BallTree
+        self.tree_ = tree_class(index_values, leaf_size=self.leaf_size)
+        self.values_ = numeric.to_numpy(dtype=np.float32)
+        self.column_means_ = np.nanmean(self.values_, axis=0)
+        logging.info(f"Đã dựng {self.algorithm} trên {len(self.values_)} dòng x {len(self.index_columns_)} cột đầy đủ.")
+        return self
+
+    def _fill_batch(self, query: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Giá trị điền (m x c) cho 1 batch: trung bình các láng giềng, bỏ qua láng giềng cũng bị thiếu"""
+        neighbours = self.tree_.query(query, k=min(self.n_neighbors, len(self.values_)), return_distance=False)
+        neighbour_values = self.values_[neighbours[:, :, None], positions]
+        counts = (~np.isnan(neighbour_values)).sum(axis=1)
+        sums = np.nansum(neighbour_values, axis=1)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), self.column_means_[positions])
+
+    def handle(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.tree_ is None:
+            self.fit(df)
+
+        df_cleaned = df.copy()
+        columns = [col for col in self.columns_ if col in df_cleaned.columns and df_cleaned[col].isnull().any()]
+        if not columns:
+            logging.info("Không có giá trị thiếu ở các cột số.")
+            return df_cleaned
+
+        values = df_cleaned[columns].to_numpy(dtype=np.float64)
+        rows = np.flatnonzero(np.isnan(values).any(axis=1))
+        logging.info(f"Điền {int(np.isnan(values).sum())} giá trị thiếu ở {len(rows)} dòng bằng {self.n_neighbors} láng giềng gần nhất.")
+
+        query = df_cleaned.iloc[rows].reindex(columns=self.index_columns_).to_numpy(dtype=np.float64)
+        query = (np.where(np.isnan(query), self.index_mean_, query) - self.index_mean_) / self.index_scale_
+        positions = np.array([self.columns_.index(col) for col in columns])
+
+        batches = [slice(start, start + self.batch_size) for start in range(0, len(rows), self.batch_size)]
+        with ThreadPoolExecutor(max_workers=self.n_jobs) as executor:
+            fills = list(executor.map(lambda batch: self._fill_batch(query[batch], positions), batches))
+
+        block = values[rows]
+        missing = np.isnan(block)
+        block[missing] = np.vstack(fills)[missing]
+        values[rows] = block
+        df_cleaned[columns] = values
+
+        logging.info("Giá trị bị thiếu đã được xử lý.")
+        return df_cleaned
+
+class IterativeImputationStrategy(MissingValueHandlingStrategy):
+    def __init__(self, max_iter=10, exclude: Optional[List[str]] = None, random_state=0):
+        """
+            - Hồi quy dây chuyền (IterativeImputer, BayesianRidge): mỗi cột thiếu được dự đoán từ các cột còn lại,
+              lặp max_iter vòng
+            - Lần gọi đầu fit, các lần sau chỉ transform với các mô hình hồi quy đã học
+              -> scoring tốn O(số cột x số vòng) mỗi dòng, không phụ thuộc kích thước dữ liệu train
+        """
+        self.max_iter = max_iter
+        self.exclude = exclude if exclude is not None else DEFAULT_EXCLUDE
+        self.random_state = random_state
+        self.imputer_ = None
+
+    def handle(self, df: pd.DataFrame) -> pd.DataFrame:
+        df_cleaned = df.copy()
+        if self.imputer_ is None:
+            numeric = df.select_dtypes(include="number").drop(columns=self.exclude, errors="ignore")
+            self.columns_ = numeric.columns.tolist()
+            self.imputer_ = IterativeImputer(max_iter=self.max_iter, random_state=self.random_state, skip_complete=True)
+            self.imputer_.fit(numeric.to_numpy(dtype=np.float64))
+            logging.info(f"Đã fit IterativeImputer trên {len(self.columns_)} cột số ({self.imputer_.n_iter_} vòng).")
+
+        block = df_cleaned.reindex(columns=self.columns_)
+        columns = [col for col in self.columns_ if col in df_cleaned.columns and df_cleaned[col].isnull().any()]
+        if not columns:
+            logging.info("Không có giá trị thiếu ở các cột số.")
+            return df_cleaned
+
+        imputed = pd.DataFrame(self.imputer_.transform(block.to_numpy(dtype=np.float64)), index=df_cleaned.index, columns=self.columns_)
+        df_cleaned[columns] = imputed[columns]
+        logging.info(f"Đã điền giá trị thiếu cho {len(columns)} cột bằng hồi quy dây chuyền.")
+        return df_cleaned
+
 class MissingValueHandler:
-    def __init__(self, strategy: MissingValueHandlingStrategy):
+    def __init__(self, strategy: MissingValueHandlingStrategy, backend=None):
+        """backend: None/"pandas" (pd.DataFrame) hoặc "arrow" (pa.Table), xem src/compute_backend.py"""
         self._strategy = strategy
+        self._backend = get_backend(backend)
     
     def set_strategy(self, strategy: MissingValueHandlingStrategy):
         logging.info("Chiến lược chọn phương pháp xử lý dữ liệu thiếu")
@@ -74,7 +221,7 @@ class MissingValueHandler:
     
     def handle_missing_value(self, df: pd.DataFrame) -> pd.DataFrame:
         logging.info("Thực thi chiến lược xử lý dữ liệu")
-        return self._strategy.handle(df)
+        return self._backend.handle_missing(self._strategy, df)
 
 if __name__ == "__main__":
     pass
\ No newline at end of file
@@ -0,0 +1,187 @@
+from typing import List, Optional, Tuple
+import os
+import time
+import joblib
+import pandas as pd
+import logging
+from src.deduplication import ID_COLUMNS
+from src.feature_engineering import FeatureEngineer, LogTransformation, OneHotEncoding
+from src.handle_missing_values import FillMissingValuesStrategy, MissingValueHandler
+from src.outlier_detection import OutlierDetector, WinsorizationCapper, ZScoreOutlierDetection
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Thư mục trạng thái của ingestion tăng dần (tương đối với thư mục gốc của dự án)"""
+INCREMENTAL_STATE_DIR = os.path.join("data", "incremental")
+HASH_INDEX_FILENAME = "hash_index.parquet"
+PROCESSED_FILENAME = "processed.parquet"
+PREPROCESSOR_FILENAME = "preprocessor.joblib"
+
+
+def row_hashes(df: pd.DataFrame, key: str = "PID") -> pd.Series:
+    """Hash nội dung (uint64) của từng dòng, index = key. Vector hóa bằng pd.util.hash_pandas_object."""
+    if df[key].duplicated().any():
+        raise ValueError(f"Cột khóa '{key}' có giá trị trùng, không thể dùng làm khóa dòng.")
+    values = pd.util.hash_pandas_object(df[sorted(df.columns)], index=False).to_numpy()
+    return pd.Series(values, index=pd.Index(df[key].to_numpy(), name=key), name="hash")
+
+
+class RowDelta:
+    """Khác biệt giữa 2 snapshot theo khóa: PID thêm mới, thay đổi nội dung, bị xóa"""
+    def __init__(self, inserted: pd.Index, updated: pd.Index, deleted: pd.Index):
+        self.inserted = inserted
+        self.updated = updated
+        self.deleted = deleted
+
+    @classmethod
+    def between(cls, previous: pd.Series, current: pd.Series) -> "RowDelta":
+        common = current.index.intersection(previous.index)
+        changed = current.loc[common].to_numpy() != previous.loc[common].to_numpy()
+        return cls(current.index.difference(previous.index), common[changed], previous.index.difference(current.index))
+
+    @property
+    def changed(self) -> pd.Index:
+        """PID cần xử lý lại (thêm mới + thay đổi)"""
+        return self.inserted.append(self.updated)
+
+    def to_dict(self) -> dict:
+        return {"inserted": len(self.inserted), "updated": len(self.updated), "deleted": len(self.deleted)}
+
+
+class DeltaPreprocessor:
+    """Chuỗi tiền xử lý của ml_pipeline (mean -> "Missing" -> OneHot -> log1p -> outlier) dựng từ chính các strategy
+    của pipeline (MissingValueHandler, FeatureEngineer, OutlierDetector / WinsorizationCapper), mỗi strategy fit 1 lần
+    và giữ trạng thái: mean từng cột số, level OHE, mean/std (zscore) hoặc biên winsorize (cap) của cột liên tục.
+
+    fit() trên toàn bộ dữ liệu cho đúng kết quả của ml_pipeline; transform() áp trạng thái đó lên 1 delta bất kỳ,
+    nên mỗi dòng được xử lý độc lập và có thể ghép vào bảng đã xử lý.
+    Cột định danh (Order, PID) không bao giờ tham gia z-score / winsorize: PID / Order mới nằm ngoài khoảng lúc fit
+    không làm dòng bị loại như outlier.
+    """
+    def __init__(self, log_features: Optional[List[str]] = None, fill_value="Missing", outlier_strategy="zscore",
+                 zscore_threshold=3.0, lower_quantile=0.01, upper_quantile=0.99, target_column="SalePrice"):
+        if outlier_strategy not in ("zscore", "cap"):
+            raise ValueError(f"Phương pháp không được hỗ trợ: {outlier_strategy}")
+        self.log_features = log_features if log_features is not None else ["Gr Liv Area", target_column]
+        self.fill_value = fill_value
+        self.outlier_strategy = outlier_strategy
+        self.zscore_threshold = zscore_threshold
+        self.lower_quantile = lower_quantile
+        self.upper_quantile = upper_quantile
+        self.target_column = target_column
+        self.encoder_: Optional[OneHotEncoding] = None
+
+    def _engineer(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.reindex(columns=self.columns_)
+        filled = MissingValueHandler(self.numeric_filler_).handle_missing_value(df)
+        filled = MissingValueHandler(self.categorical_filler_).handle_missing_value(filled)
+        encoded = FeatureEngineer(self.encoder_).apply_Transform(filled)
+        return FeatureEngineer(LogTransformation(self.log_features)).apply_Transform(encoded)
+
+    def fit(self, df: pd.DataFrame) -> "DeltaPreprocessor":
+        self.columns_ = df.columns.tolist()
+        self.numeric_filler_ = FillMissingValuesStrategy(method="mean").fit(df)
+        self.categorical_filler_ = FillMissingValuesStrategy(method="constant", fill_value=self.fill_value)
+        self.encoder_ = OneHotEncoding([])
+
+        engineered = self._engineer(df)
+        numeric = engineered.select_dtypes(include="number")
+        continuous = numeric.columns[numeric.nunique().to_numpy() > 2]
+        if self.outlier_strategy == "zscore":
+            self.outlier_columns_ = [col for col in continuous if col not in ID_COLUMNS]
+            self.detector_ = ZScoreOutlierDetection(threshold=self.zscore_threshold).fit(engineered[self.outlier_columns_])
+        else:
+            self.outlier_columns_ = [col for col in continuous if col not in ID_COLUMNS + [self.target_column]]
+            self.detector_ = WinsorizationCapper(self.lower_quantile, self.upper_quantile).fit(engineered[self.outlier_columns_])
+        logging.info(f"DeltaPreprocessor: {len(self.numeric_filler_.statistics_)} cột số, {len(self.encoder_.fitted_columns_ or [])} "
+                     f"cột category, {len(self.outlier_columns_)} cột liên tục cho {self.outlier_strategy}.")
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Dòng đã xử lý của df; zscore: dòng là outlier (theo mean/std đã fit) bị loại như outlier_detection_step,
+        cap: giá trị được winsorize theo biên đã fit"""
+        if self.encoder_ is None:
+            raise RuntimeError("DeltaPreprocessor chưa được fit.")
+        engineered = self._engineer(df)
+        if self.outlier_strategy == "cap":
+            return self.detector_.transform(engineered)
+        outliers = OutlierDetector(self.detector_).detected_outlier(engineered[self.outlier_columns_])
+        return engineered[~outliers.any(axis=1)]
+
+
+class IncrementalIngestor:
+    """Ingestion tăng dần theo khóa PID: chỉ dòng thêm mới / thay đổi đi qua tiền xử lý.
+
+    Trạng thái trong state_dir:
+    - hash_index.parquet: (PID, hash uint64) của snapshot thô lần trước, 16 byte/dòng
+    - preprocessor.joblib: DeltaPreprocessor đã fit
+    - processed.parquet: bảng đã xử lý (cùng schema clean_data)
+    Mỗi lần chạy: hash toàn bộ snapshot (vector hóa, rẻ) -> RowDelta -> transform(delta) -> bỏ dòng cũ của PID
+    thay đổi / bị xóa, ghép delta vào bảng. Chi phí tiền xử lý tỉ lệ với kích thước delta.
+    refit=True (hoặc chưa có trạng thái): fit lại trên toàn bộ snapshot và dựng lại bảng.
+    """
+    def __init__(self, state_dir: str = INCREMENTAL_STATE_DIR, key: str = "PID", order_column: Optional[str] = "Order",
+                 preprocessor: Optional[DeltaPreprocessor] = None):
+        self.state_dir = state_dir
+        self.key = key
+        self.order_column = order_column
+        self.preprocessor = preprocessor or DeltaPreprocessor()
+
+    def _path(self, filename: str) -> str:
+        return os.path.join(self.state_dir, filename)
+
+    def has_state(self) -> bool:
+        return all(os.path.exists(self._path(name)) for name in (HASH_INDEX_FILENAME, PROCESSED_FILENAME, PREPROCESSOR_FILENAME))
+
+    def _save(self, hashes: pd.Series, processed: pd.DataFrame, preprocessor: DeltaPreprocessor):
+        os.makedirs(self.state_dir, exist_ok=True)
+        hashes.reset_index().to_parquet(self._path(HASH_INDEX_FILENAME), index=False)
+        processed.to_parquet(self._path(PROCESSED_FILENAME), index=False)
+        joblib.dump(preprocessor, self._path(PREPROCESSOR_FILENAME))
+
+    def _load(self) -> Tuple[pd.Series, pd.DataFrame, DeltaPreprocessor]:
+        stored = pd.read_parquet(self._path(HASH_INDEX_FILENAME))
+        hashes = pd.Series(stored["hash"].to_numpy(), index=pd.Index(stored[self.key].to_numpy(), name=self.key), name="hash")
+        return hashes, pd.read_parquet(self._path(PROCESSED_FILENAME)), joblib.load(self._path(PREPROCESSOR_FILENAME))
+
+    def run(self, df: pd.DataFrame, refit: bool = False) -> Tuple[pd.DataFrame, dict]:
+        start = time.perf_counter()
+        current = row_hashes(df, self.key)
+
+        state = self._load() if not refit and self.has_state() else None
+        if state is not None and getattr(state[2], "detector_", None) is None:
+            logging.warning("Trạng thái tiền xử lý được lưu bởi phiên bản cũ của DeltaPreprocessor -> fit lại.")
+            state = None
+
+        if state is None:
+            logging.info("Chưa có trạng thái (hoặc refit) -> fit tiền xử lý và xử lý toàn bộ snapshot.")
+            preprocessor = self.preprocessor.fit(df)
+            processed = preprocessor.transform(df).reset_index(drop=True)
+            summary = {"mode": "full", "inserted": len(df), "updated": 0, "deleted": 0, "processed_rows": len(df)}
+        else:
+            previous, processed, preprocessor = state
+            delta = RowDelta.between(previous, current)
+            changed = delta.changed
+            if changed.empty and delta.deleted.empty:
+                summary = {"mode": "unchanged", **delta.to_dict(), "processed_rows": 0, "rows": len(processed),
+                           "duration_s": round(time.perf_counter() - start, 3)}
+                logging.info(f"Ingestion tăng dần: không có dòng nào thay đổi -> dùng lại bảng đã xử lý. {summary}")
+                return processed, summary
+
+            delta_rows = df[df[self.key].isin(changed)]
+            processed_delta = preprocessor.transform(delta_rows) if len(delta_rows) else processed.iloc[:0]
+
+            keep = ~processed[self.key].isin(changed.append(delta.deleted))
+            processed = pd.concat([processed[keep], processed_delta.reindex(columns=processed.columns)], ignore_index=True)
+            if self.order_column in processed.columns:
+                processed = processed.sort_values(self.order_column, kind="stable").reset_index(drop=True)
+            summary = {"mode": "delta", **delta.to_dict(), "processed_rows": len(delta_rows)}
+
+        self._save(current, processed, preprocessor)
+        summary.update(rows=len(processed), duration_s=round(time.perf_counter() - start, 3))
+        logging.info(f"Ingestion tăng dần: {summary}")
+        return processed, summary
+
+
+if __name__ == "__main__":
+    pass
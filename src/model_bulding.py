@@ -1,9 +1,12 @@
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 from sklearn.base import RegressorMixin
-from sklearn.linear_model import LinearRegression
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
+from src.data_splitter import TrainingMatrix
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -15,7 +18,58 @@ class ModelBuildingStrategy(ABC):
     def build_train_model(self, X_train: pd.DataFrame, y_train: pd.Series) -> RegressorMixin:
         pass
 
-class LinearRegressionStratery(ModelBuildingStrategy):
+    @abstractmethod
+    def build_train_model_from_matrix(self, matrix: TrainingMatrix) -> Pipeline:
+        """Train trực tiếp trên TrainingMatrix (có thể là memory-map) thay vì DataFrame"""
+        pass
+
+class PipelineModelStrategy(ModelBuildingStrategy):
+    """Strategy là 1 sklearn Pipeline cố định: chỉ cần make_pipeline, train từ ma trận dùng fit_pipeline_on_matrix"""
+    @abstractmethod
+    def make_pipeline(self) -> Pipeline:
+        """Pipeline chưa fit của strategy, dùng cho build_train_model_from_matrix"""
+        pass
+
+    def build_train_model_from_matrix(self, matrix: TrainingMatrix) -> Pipeline:
+        logging.info(f"Training {type(self).__name__} từ ma trận {matrix.shape} {matrix.X.dtype}.")
+        pipeline = fit_pipeline_on_matrix(self.make_pipeline(), matrix)
+        logging.info("Hoàn thành việc training model.")
+        return pipeline
+
+def fit_pipeline_on_matrix(pipeline: Pipeline, matrix: TrainingMatrix) -> Pipeline:
+    """Fit pipeline trực tiếp trên ma trận liền kề (có thể là memory-map read-only).
+
+    pipeline.fit(DataFrame) copy X ở mỗi tầng: DataFrame -> array trong scaler, output scaler,
+    rồi thêm 1 bản khi LinearRegression trừ mean (copy_X=True). Ở đây:
+    - transformer fit trên ma trận gốc (chỉ đọc), transform tạo đúng 1 bản riêng
+    - estimator cuối fit trên bản riêng đó với copy_X=False (được sửa tại chỗ, không copy thêm)
+    - không có transformer (vd Random Forest float32): fit thẳng trên page của memory-map
+    -> bộ nhớ riêng lúc train ~ 1 ma trận.
+    """
+    X, y = matrix.X, matrix.y
+    for _, transformer in pipeline.steps[:-1]:
+        X = transformer.fit(X).transform(X)
+
+    estimator = pipeline.steps[-1][1]
+    params = estimator.get_params()
+    owns_copy = X is not matrix.X
+    if owns_copy and params.get("copy_X"):
+        estimator.set_params(copy_X=False)
+    estimator.fit(X, y)
+    if owns_copy and params.get("copy_X"):
+        estimator.set_params(copy_X=True)
+
+    # Gắn tên cột như khi fit bằng DataFrame -> predict(X_test DataFrame) vẫn kiểm tra thứ tự cột
+    pipeline.steps[0][1].feature_names_in_ = np.asarray(matrix.columns, dtype=object)
+    return pipeline
+
+class LinearRegressionStratery(PipelineModelStrategy):
+    def make_pipeline(self) -> Pipeline:
+        return Pipeline([
+            ("scaler", StandardScaler()),
+            ("model", LinearRegression())
+        ])
+
     def build_train_model(self, X_train, y_train) -> Pipeline:
         
         if not isinstance(X_train, pd.DataFrame):
@@ -25,12 +79,71 @@ class LinearRegressionStratery(ModelBuildingStrategy):
         
         logging.info("Khởi tạo mô hình hồi quy tuyến tính  và chuẩn hóa")
 
-        pipeline = Pipeline([
+        pipeline = self.make_pipeline()
+
+        logging.info("Training Linear Regression model.")
+        pipeline.fit(X_train, y_train)
+
+        logging.info("Hoàn thành việc training model.")
+        return pipeline
+
+class RidgeRegressionStrategy(PipelineModelStrategy):
+    def __init__(self, alpha=1.0):
+        self.alpha = alpha
+
+    def make_pipeline(self) -> Pipeline:
+        return Pipeline([
             ("scaler", StandardScaler()),
-            ("model", LinearRegression())
+            ("model", Ridge(alpha=self.alpha))
         ])
 
-        logging.info("Training Linear Regression model.")
+    def build_train_model(self, X_train, y_train) -> Pipeline:
+
+        if not isinstance(X_train, pd.DataFrame):
+            raise TypeError("X_train không phải là dataframe")
+        if not isinstance(y_train, pd.Series):
+            raise TypeError("y_train không phải là dạng series")
+
+        logging.info(f"Khởi tạo mô hình Ridge (alpha={self.alpha}) và chuẩn hóa")
+
+        pipeline = self.make_pipeline()
+
+        logging.info("Training Ridge model.")
+        pipeline.fit(X_train, y_train)
+
+        logging.info("Hoàn thành việc training model.")
+        return pipeline
+
+class RandomForestStrategy(PipelineModelStrategy):
+    def __init__(self, n_estimators=100, max_depth=None, n_jobs=None, random_state=42):
+        self.n_estimators = n_estimators
+        self.max_depth = max_depth
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+
+    def make_pipeline(self) -> Pipeline:
+        """Mô hình cây không cần chuẩn hóa -> pipeline chỉ có bước model"""
+        return Pipeline([
+            ("model", RandomForestRegressor(
+                n_estimators=self.n_estimators,
+                max_depth=self.max_depth,
+                n_jobs=self.n_jobs,
+                random_state=self.random_state,
+            ))
+        ])
+
+    def build_train_model(self, X_train, y_train) -> Pipeline:
+
+        if not isinstance(X_train, pd.DataFrame):
+            raise TypeError("X_train không phải là dataframe")
+        if not isinstance(y_train, pd.Series):
+            raise TypeError("y_train không phải là dạng series")
+
+        logging.info(f"Khởi tạo mô hình Random Forest (n_estimators={self.n_estimators})")
+
+        pipeline = self.make_pipeline()
+
+        logging.info("Training Random Forest model.")
         pipeline.fit(X_train, y_train)
 
         logging.info("Hoàn thành việc training model.")
@@ -48,5 +161,9 @@ class ModelBuilder:
         logging.info("Build và training với mô hình đã chọn.")
         return self._strategy.build_train_model(X_train, y_train)
 
+    def build_model_from_matrix(self, matrix: TrainingMatrix):
+        logging.info("Build và training từ TrainingMatrix với mô hình đã chọn.")
+        return self._strategy.build_train_model_from_matrix(matrix)
+
 if __name__ == "__main__":
     pass
@@ -1,9 +1,11 @@
 from abc import ABC, abstractmethod
+from typing import List, Optional
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
 import logging
+from src.compute_backend import get_backend
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -16,10 +18,18 @@ class OutlierDetectionStrategy(ABC):
 class ZScoreOutlierDetection(OutlierDetectionStrategy):
     def __init__(self, threshold=3):
         self._threshold = threshold
+        self.mean_: Optional[pd.Series] = None
+        self.std_: Optional[pd.Series] = None
+
+    def fit(self, df: pd.DataFrame) -> "ZScoreOutlierDetection":
+        """Giữ mean/std của dữ liệu fit -> dòng mới (vd delta nhỏ) được chấm theo phân phối đó, không theo chính batch"""
+        self.mean_, self.std_ = df.mean(), df.std()
+        return self
     
     def detected_outlier(self, df):
         logging.info("Phát hiện outlier bằng phương pháp Zscore")
-        zscore = np.abs((df - df.mean()) / df.std())
+        mean, std = (self.mean_, self.std_) if self.mean_ is not None else (df.mean(), df.std())
+        zscore = np.abs((df - mean) / std)
         outlier = zscore > self._threshold
         logging.info(f"Hoàn tất việc tìm kiếm outlier với threshold={self._threshold}")
         return outlier
@@ -34,9 +44,58 @@ class IQROutlierDetection(OutlierDetectionStrategy):
         logging.info("Hoàn tất việc tìm kiếm outlier với phương pháp IQR")
         return outlier
 
+class WinsorizationCapper:
+    """Giới hạn (winsorize) giá trị các cột số theo biên học 1 lần trên dữ liệu train.
+
+    - fit: tính quantile lower/upper của cả khối cột trong 1 lần np.nanquantile,
+      lưu thành 2 mảng lower_/upper_ (p,) + danh sách cột -> artifact nhỏ, lưu cùng model.
+    - transform: 1 lần np.clip trên khối cột, dùng cho cả train và scoring (không tính lại quantile).
+      Cột không có trong frame (vd target lúc scoring) được bỏ qua.
+    """
+    def __init__(self, lower_quantile=0.01, upper_quantile=0.99):
+        if not 0 <= lower_quantile < upper_quantile <= 1:
+            raise ValueError(f"Cần 0 <= lower_quantile < upper_quantile <= 1, nhận được {lower_quantile}, {upper_quantile}")
+        self.lower_quantile = lower_quantile
+        self.upper_quantile = upper_quantile
+        self.columns_: List[str] = []
+        self.lower_: Optional[np.ndarray] = None
+        self.upper_: Optional[np.ndarray] = None
+
+    def fit(self, df: pd.DataFrame) -> "WinsorizationCapper":
+        numeric = df.select_dtypes(include=["number"])
+        logging.info(f"Học biên winsorize ({self.lower_quantile:.0%}, {self.upper_quantile:.0%}) cho {numeric.shape[1]} cột.")
+        self.columns_ = numeric.columns.tolist()
+        bounds = np.nanquantile(numeric.to_numpy(dtype=np.float64), [self.lower_quantile, self.upper_quantile], axis=0)
+        self.lower_, self.upper_ = bounds[0], bounds[1]
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        if self.lower_ is None:
+            raise RuntimeError("WinsorizationCapper chưa được fit.")
+        positions = pd.Index(self.columns_).get_indexer(df.columns)
+        present = positions >= 0
+        if not present.any():
+            logging.warning("Không có cột nào trùng với các cột đã học biên -> không winsorize.")
+            return df
+
+        columns = df.columns[present]
+        lower, upper = self.lower_[positions[present]], self.upper_[positions[present]]
+        block = df[columns].to_numpy(dtype=np.float64)
+        n_capped = int(((block < lower) | (block > upper)).sum())
+        np.clip(block, lower, upper, out=block)
+        logging.info(f"Đã winsorize {n_capped} giá trị trên {len(columns)} cột.")
+
+        capped = pd.DataFrame(block, index=df.index, columns=columns)
+        return pd.concat([df.drop(columns=columns), capped], axis=1)[df.columns]
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).transform(df)
+
 class OutlierDetector:
-    def __init__(self, strategy: OutlierDetectionStrategy):
+    def __init__(self, strategy: OutlierDetectionStrategy, backend=None):
+        """backend: None/"pandas" (pd.DataFrame) hoặc "arrow" (pa.Table), xem src/compute_backend.py"""
         self._strategy = strategy
+        self._backend = get_backend(backend)
     
     def set_strategy(self, strategy: OutlierDetectionStrategy):
         logging.info("Chọn phương pháp xử lý outlier")
@@ -44,20 +103,20 @@ class OutlierDetector:
     
     def detected_outlier(self, df: pd.DataFrame) -> pd.DataFrame:
         logging.info("Thực thi phương pháp xử lý outlier đã chọn")
-        return self._strategy.detected_outlier(df)  # ✅ Fixed method name
+        return self._backend.detect_outliers(self._strategy, df)
     
     def handle_outlier(self, df: pd.DataFrame, method="remove", **kwargs) -> pd.DataFrame:
         outliers = self.detected_outlier(df)
         if method == 'remove':
             logging.info("Xóa các outlier của dataset")
-            df_clean = df[(~outliers).all(axis=1)]
+            df_clean = self._backend.remove_rows(df, outliers)
         elif method == 'cap':
             logging.info("Giới hạn outlier trong dataset")
             """
                 - lower: giá trị thấp nhất cho phép
                 - upper: giá trị cao nhất cho phép
             """
-            df_clean = df.clip(lower=df.quantile(0.01), upper=df.quantile(0.99), axis=1)
+            df_clean = self._backend.cap(df, lower_quantile=0.01, upper_quantile=0.99)
         else:
             logging.info("Không áp dụng method nào và không có outlier nào được xử lý.")
             return df
@@ -0,0 +1,145 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+import logging
+from scipy import sparse
+from sklearn.pipeline import Pipeline
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+
+def source_groups(columns: List[str], source_columns: Optional[List[str]] = None) -> Dict[str, List[str]]:
+    """Gom cột one-hot/hash ("Neighborhood_NAmes", "Neighborhood___other__", ...) về cột gốc ("Neighborhood").
+    source_columns: danh sách cột gốc; mặc định lấy phần trước dấu "_" đầu tiên (tên cột Ames không có "_")."""
+    groups: Dict[str, List[str]] = {}
+    for col in columns:
+        source = None
+        if source_columns is not None:
+            source = next((s for s in source_columns if col == s or col.startswith(f"{s}_")), None)
+        groups.setdefault(source or col.split("_", 1)[0], []).append(col)
+    return groups
+
+
+class PredictionExplainer:
+    """Đóng góp của từng feature vào từng dự đoán, tính cho cả batch (không lặp theo dòng).
+
+    Với mọi dòng: expected_value_ + tổng các đóng góp = dự đoán (đơn vị của target, vd log giá).
+    - StandardScaler + mô hình tuyến tính: đóng góp = coef x feature đã chuẩn hóa (1 phép nhân trên cả ma trận),
+      expected_value_ = intercept_ (dự đoán tại giá trị trung bình của tập train).
+    - Cây / rừng (DecisionTree, RandomForest, ExtraTrees): phân rã theo đường đi (path-based, kiểu Saabas):
+      mỗi lần rẽ nhánh, thay đổi giá trị trung bình của node được tính cho feature dùng để rẽ.
+      Đóng góp cộng dồn theo đường đi được tính sẵn cho từng lá -> lúc explain: lá của mỗi dòng (apply, như predict)
+      rồi 1 phép nhân ma trận thưa (dòng x lá) @ (lá x feature). expected_value_ = trung bình giá trị gốc các cây.
+    Đóng góp của các cột one-hot được cộng về cột gốc (group=True).
+    """
+    def __init__(self, pipeline: Pipeline, source_columns: Optional[List[str]] = None):
+        self.pipeline = pipeline
+        self.source_columns = source_columns
+        self.feature_names = list(getattr(pipeline, "feature_names_in_", []))
+        *self.transformers, (_, self.estimator) = pipeline.steps
+        self.expected_value_: Optional[float] = None
+        self._node_contributions = None
+
+        if hasattr(self.estimator, "tree_") or hasattr(self.estimator, "estimators_"):
+            self.method = "tree_path"
+            self._node_contributions = self._build_node_contributions()
+        elif getattr(self.estimator, "coef_", None) is not None and np.ndim(self.estimator.coef_) == 1:
+            self.method = "linear"
+            self.expected_value_ = float(self.estimator.intercept_)
+        else:
+            raise TypeError(f"Chưa hỗ trợ giải thích mô hình {type(self.estimator).__name__}")
+        logging.info(f"Prediction explainer cho {type(self.estimator).__name__} (method={self.method}).")
+
+    def _trees(self) -> list:
+        if hasattr(self.estimator, "tree_"):
+            return [self.estimator.tree_]
+        return [tree.tree_ for tree in self.estimator.estimators_]
+
+    def _build_node_contributions(self) -> sparse.csr_matrix:
+        """Ma trận (tổng số node x số feature), dòng của lá = tổng đóng góp trên đường từ gốc tới lá đó.
+
+        Mỗi cạnh cha -> con đóng góp (giá trị con - giá trị cha) / số cây vào feature của cha. Cộng dồn theo
+        thứ tự node (sklearn đánh số con sau cha) -> lúc explain chỉ cần lá của mỗi dòng (apply), không cần decision_path.
+        """
+        trees = self._trees()
+        n_features = self.estimator.n_features_in_
+        blocks, roots = [], []
+        for tree in trees:
+            value = tree.value[:, 0, 0]
+            parent = np.full(tree.node_count, -1)
+            internal = np.flatnonzero(tree.children_left >= 0)
+            parent[tree.children_left[internal]] = internal
+            parent[tree.children_right[internal]] = internal
+            nodes = np.flatnonzero(parent >= 0)
+            delta = (value[nodes] - value[parent[nodes]]) / len(trees)
+            edges = sparse.csr_matrix((delta, (nodes, tree.feature[parent[nodes]])), shape=(tree.node_count, n_features))
+
+            # Ma trận tổ tiên (node x node): ancestors[v, u] = 1 nếu u nằm trên đường từ gốc tới v (kể cả v)
+            rows, cols = [np.zeros(1, dtype=np.int64)], [np.zeros(1, dtype=np.int64)]
+            path = {0: np.zeros(1, dtype=np.int64)}
+            for node in nodes:
+                path[node] = np.append(path[parent[node]], node)
+                rows.append(np.full(len(path[node]), node))
+                cols.append(path[node])
+            rows, cols = np.concatenate(rows), np.concatenate(cols)
+            ancestors = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(tree.node_count, tree.node_count))
+            blocks.append(ancestors @ edges)
+            roots.append(value[0])
+        self.expected_value_ = float(np.mean(roots))
+        self._node_offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        return sparse.vstack(blocks, format="csr")
+
+    def _transform(self, X: pd.DataFrame):
+        """Áp các bước tiền xử lý của pipeline; không có bước nào -> giữ DataFrame (mô hình kiểm tra tên cột)"""
+        values = X[self.feature_names] if self.feature_names else X
+        for _, transformer in self.transformers:
+            values = transformer.transform(values)
+        return values
+
+    def _grouping(self, columns: List[str]) -> Tuple[sparse.csr_matrix, List[str]]:
+        """Ma trận gom (n_feature x n_cột_gốc) và tên các cột gốc"""
+        groups = source_groups(columns, self.source_columns)
+        positions = {col: i for i, col in enumerate(columns)}
+        rows = np.concatenate([[positions[col] for col in members] for members in groups.values()])
+        cols = np.repeat(np.arange(len(groups)), [len(members) for members in groups.values()])
+        return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(columns), len(groups))), list(groups)
+
+    def explain(self, X: pd.DataFrame, group: bool = True) -> pd.DataFrame:
+        """Bảng đóng góp (n_dòng x n_feature), hoặc (n_dòng x n_cột_gốc) khi group=True."""
+        columns = self.feature_names or list(X.columns)
+        grouping, output_columns = self._grouping(columns) if group else (None, columns)
+        values = self._transform(X)
+
+        if self.method == "linear":
+            contributions = np.asarray(values, dtype=np.float64) * self.estimator.coef_
+            if grouping is not None:
+                contributions = np.asarray(contributions @ grouping)
+        else:
+            # Gom cột trước khi nhân -> ma trận lá nhỏ hơn, output hẹp hơn
+            node_contributions = self._node_contributions if grouping is None else (self._node_contributions @ grouping).tocsr()
+            leaves = self.estimator.apply(values).reshape(len(X), -1) + self._node_offsets
+            n_rows, n_trees = leaves.shape
+            indicator = sparse.csr_matrix(
+                (np.ones(leaves.size), leaves.ravel(), np.arange(0, leaves.size + 1, n_trees)),
+                shape=(n_rows, node_contributions.shape[0]),
+            )
+            contributions = (indicator @ node_contributions).toarray()
+
+        return pd.DataFrame(contributions, index=X.index, columns=output_columns)
+
+    def top_reasons(self, X: pd.DataFrame, k: int = 5) -> pd.DataFrame:
+        """k cột gốc đóng góp lớn nhất (theo trị tuyệt đối) cho mỗi dự đoán: dạng dài (dòng, hạng, cột, đóng góp)."""
+        contributions = self.explain(X, group=True)
+        values = contributions.to_numpy()
+        order = np.argsort(-np.abs(values), axis=1)[:, :k]
+        rows = np.repeat(np.arange(len(values)), order.shape[1])
+        return pd.DataFrame({
+            "row": contributions.index.to_numpy()[rows],
+            "rank": np.tile(np.arange(1, order.shape[1] + 1), len(values)),
+            "feature": contributions.columns.to_numpy()[order.ravel()],
+            "contribution": values[rows, order.ravel()],
+        })
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,87 @@
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Optional
+import logging
+import os
+
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Biến môi trường đặt ngân sách core chung cho mọi step (mặc định = số core của máy)"""
+CORE_BUDGET_ENV = "CORE_BUDGET"
+
+"""Biến môi trường BLAS/OpenMP đọc lúc import numpy trong process con"""
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def core_budget() -> int:
+    value = os.environ.get(CORE_BUDGET_ENV)
+    if value is None:
+        return os.cpu_count() or 1
+    if not value.isdigit() or int(value) < 1:
+        raise ValueError(f"{CORE_BUDGET_ENV} phải là số nguyên dương, nhận được {value!r}")
+    return int(value)
+
+
+class ResourceAllocation:
+    """Cách chia ngân sách core: workers process x blas_threads mỗi worker <= total_cores"""
+    def __init__(self, total_cores: int, workers: int, blas_threads: int):
+        self.total_cores = total_cores
+        self.workers = workers
+        self.blas_threads = blas_threads
+
+    def to_dict(self) -> dict:
+        return {"total_cores": self.total_cores, "workers": self.workers, "blas_threads": self.blas_threads}
+
+    def __repr__(self) -> str:
+        return f"ResourceAllocation(total_cores={self.total_cores}, workers={self.workers}, blas_threads={self.blas_threads})"
+
+
+@contextmanager
+def limit_threads(n_threads: int):
+    """Giới hạn thread pool BLAS/OpenMP (threadpoolctl) và n_jobs mặc định của sklearn/joblib trong khối lệnh"""
+    with threadpool_limits(limits=n_threads), parallel_config(n_jobs=n_threads):
+        yield
+
+
+def _init_worker(n_threads: int):
+    """Chạy 1 lần khi process con khởi động: đặt biến môi trường + giới hạn thread pool đã nạp"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(n_threads)
+    threadpool_limits(limits=n_threads)
+    try:
+        import pyarrow
+        pyarrow.set_cpu_count(n_threads)
+    except ImportError:
+        pass
+
+
+class ResourceController:
+    """Chia ngân sách core chung giữa số process worker và số thread BLAS mỗi worker để tránh oversubscription
+    (vd 8 worker x 8 thread OpenBLAS trên máy 8 core).
+
+    - allocate(n_tasks): workers = min(n_tasks, max_workers, total_cores), blas_threads = total_cores // workers
+    - process_pool(allocation): ProcessPoolExecutor mà mỗi worker đã bị giới hạn blas_threads thread
+    - limit(allocation): giới hạn thread trong process hiện tại (step chạy 1 mô hình)
+    """
+    def __init__(self, total_cores: Optional[int] = None, max_workers: Optional[int] = None):
+        self.total_cores = total_cores or core_budget()
+        self.max_workers = max_workers
+
+    def allocate(self, n_tasks: int) -> ResourceAllocation:
+        workers = max(1, min(n_tasks, self.max_workers or self.total_cores, self.total_cores))
+        allocation = ResourceAllocation(self.total_cores, workers, max(1, self.total_cores // workers))
+        logging.info(f"Phân bổ tài nguyên cho {n_tasks} task: {allocation}")
+        return allocation
+
+    def process_pool(self, allocation: ResourceAllocation) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=allocation.workers, initializer=_init_worker, initargs=(allocation.blas_threads,))
+
+    def limit(self, allocation: ResourceAllocation):
+        return limit_threads(allocation.blas_threads)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,152 @@
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+import logging
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.pipeline import Pipeline
+from src.data_splitter import TrainingMatrix
+from src.model_bulding import LinearRegressionStratery, ModelBuildingStrategy, RidgeRegressionStrategy
+from src.resource_control import ResourceController
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+"""Key của các dòng không thuộc segment nào có mô hình riêng (segment nhỏ, level gốc bị drop khi OHE, level lạ)"""
+GLOBAL_SEGMENT = "__global__"
+
+
+class SegmentKey:
+    """Lấy key segment (vd Neighborhood) cho cả batch, không lặp theo dòng.
+
+    - Cột category gốc còn trong dữ liệu -> dùng thẳng giá trị.
+    - Đã one-hot ("Neighborhood_NAmes", ...): key = level của cột dummy bằng 1 (argmax trên khối dummy);
+      dòng toàn 0 (level bị drop='first' hoặc cột dummy bị feature selection loại) -> GLOBAL_SEGMENT.
+    Danh sách cột dummy được chốt lúc fit -> train và scoring cho cùng 1 key.
+    """
+    def __init__(self, column: str):
+        self.column = column
+        self.dummy_columns_: List[str] = []
+
+    def fit(self, X: pd.DataFrame) -> "SegmentKey":
+        if self.column not in X.columns:
+            prefix = f"{self.column}_"
+            self.dummy_columns_ = [col for col in X.columns if col.startswith(prefix)]
+            if not self.dummy_columns_:
+                raise KeyError(f"Không tìm thấy cột '{self.column}' hoặc cột one-hot '{prefix}*'.")
+        return self
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        if not self.dummy_columns_:
+            return X[self.column].astype(str).to_numpy(dtype=object)
+        dummies = X.reindex(columns=self.dummy_columns_, fill_value=0).to_numpy()
+        levels = np.array([col[len(self.column) + 1:] for col in self.dummy_columns_] + [GLOBAL_SEGMENT], dtype=object)
+        position = np.where(dummies.max(axis=1) > 0, dummies.argmax(axis=1), len(self.dummy_columns_))
+        return levels[position]
+
+
+def _fit_segment(strategy: ModelBuildingStrategy, matrix: TrainingMatrix, rows: Optional[np.ndarray] = None) -> Pipeline:
+    """Chạy trong process worker: matrix đã là tập con của segment, hoặc memory-map + chỉ số dòng (rows)"""
+    if rows is not None:
+        matrix = TrainingMatrix(matrix.X[rows], matrix.y[rows], matrix.columns, matrix.target_column, matrix.index[rows])
+    return strategy.build_train_model_from_matrix(matrix)
+
+
+class SegmentedModel(BaseEstimator, RegressorMixin):
+    """Mô hình định tuyến: 1 mô hình cho mỗi segment + mô hình global cho phần còn lại.
+
+    predict: key segment của cả batch -> mã số nguyên (pd.Categorical trên danh sách segment đã biết)
+    -> argsort ổn định + ranh giới nhóm (group index) -> mỗi segment gọi predict 1 lần trên khối dòng của nó.
+    Vòng lặp chỉ theo số segment (vài chục), không theo số dòng.
+    """
+    def __init__(self, segment_key: SegmentKey, global_model: Pipeline, segment_models: Dict[str, Pipeline]):
+        self.segment_key = segment_key
+        self.global_model = global_model
+        self.segment_models = segment_models
+
+    @property
+    def segments_(self) -> List[str]:
+        return list(self.segment_models)
+
+    def fit(self, X, y=None):
+        """Đã fit bởi SegmentedModelStrategy; có mặt để tương thích sklearn Pipeline"""
+        return self
+
+    def group_index(self, X: pd.DataFrame):
+        """(thứ tự dòng đã gom theo segment, vị trí bắt đầu của từng nhóm); mã 0 = global, i = segments_[i - 1]"""
+        codes = pd.Categorical(self.segment_key.transform(X), categories=self.segments_).codes.astype(np.int64) + 1
+        order = np.argsort(codes, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(self.segments_) + 1))])
+        return order, bounds
+
+    def predict(self, X: pd.DataFrame) -> np.ndarray:
+        order, bounds = self.group_index(X)
+        models = [self.global_model, *self.segment_models.values()]
+        prediction = np.empty(len(X), dtype=np.float64)
+        for model, start, stop in zip(models, bounds[:-1], bounds[1:]):
+            if stop > start:
+                rows = order[start:stop]
+                prediction[rows] = model.predict(X.iloc[rows])
+        return prediction
+
+
+class SegmentedModelStrategy(ModelBuildingStrategy):
+    """Train 1 mô hình cho mỗi segment (vd Neighborhood, MS Zoning) song song trong process pool.
+
+    - segment có ít hơn min_segment_size dòng -> dùng mô hình global (train trên toàn bộ dữ liệu).
+    - segment_strategy mặc định Ridge: mỗi segment chỉ vài trăm dòng so với ~250 feature sau OHE,
+      hồi quy tuyến tính thường sẽ khớp quá mức.
+    - Kết quả là 1 Pipeline duy nhất bọc SegmentedModel -> artifact, evaluator, predict giữ nguyên giao diện.
+    """
+    def __init__(self, segment_column="Neighborhood", min_segment_size=100,
+                 global_strategy: Optional[ModelBuildingStrategy] = None,
+                 segment_strategy: Optional[ModelBuildingStrategy] = None,
+                 controller: Optional[ResourceController] = None):
+        self.segment_column = segment_column
+        self.min_segment_size = min_segment_size
+        self.global_strategy = global_strategy or LinearRegressionStratery()
+        self.segment_strategy = segment_strategy or RidgeRegressionStrategy(alpha=100.0)
+        self.controller = controller or ResourceController()
+
+    def build_train_model(self, X_train: pd.DataFrame, y_train: pd.Series) -> Pipeline:
+        if not isinstance(X_train, pd.DataFrame):
+            raise TypeError("X_train không phải là dataframe")
+        if not isinstance(y_train, pd.Series):
+            raise TypeError("y_train không phải là dạng series")
+        return self.build_train_model_from_matrix(TrainingMatrix.from_frame(X_train, y_train, dtype=np.float64))
+
+    def build_train_model_from_matrix(self, matrix: TrainingMatrix) -> Pipeline:
+        X, _ = matrix.to_frame()
+        segment_key = SegmentKey(self.segment_column).fit(X)
+        keys = segment_key.transform(X)
+        levels, counts = np.unique(keys, return_counts=True)
+        large = [level for level, count in zip(levels, counts) if count >= self.min_segment_size and level != GLOBAL_SEGMENT]
+        logging.info(f"Segment theo '{self.segment_column}': {len(large)}/{len(levels)} segment đủ {self.min_segment_size} dòng, "
+                     f"phần còn lại dùng mô hình global.")
+
+        # Memory-map -> worker tự đọc các dòng của segment; ngược lại gửi đúng tập con của segment
+        payloads = []
+        for level in large:
+            rows = np.flatnonzero(keys == level)
+            if matrix.path is not None:
+                payloads.append((matrix, rows))
+            else:
+                payloads.append((TrainingMatrix(matrix.X[rows], matrix.y[rows], matrix.columns, matrix.target_column), None))
+
+        allocation = self.controller.allocate(len(payloads) + 1)
+        strategies = [self.global_strategy] + [self.segment_strategy] * len(payloads)
+        matrices = [matrix] + [segment for segment, _ in payloads]
+        segment_rows = [None] + [rows for _, rows in payloads]
+        if allocation.workers > 1:
+            with self.controller.process_pool(allocation) as executor:
+                models = list(executor.map(_fit_segment, strategies, matrices, segment_rows))
+        else:
+            with self.controller.limit(allocation):
+                models = [_fit_segment(*args) for args in zip(strategies, matrices, segment_rows)]
+
+        routed = SegmentedModel(segment_key, models[0], dict(zip(large, models[1:])))
+        routed.feature_names_in_ = np.asarray(matrix.columns, dtype=object)
+        logging.info("Hoàn thành việc training mô hình theo segment.")
+        return Pipeline([("model", routed)])
+
+
+if __name__ == "__main__":
+    pass
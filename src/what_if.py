@@ -0,0 +1,128 @@
+from typing import Callable, Optional, Sequence
+import numpy as np
+import pandas as pd
+import logging
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+MODES = ("set", "add", "multiply")
+
+
+class WhatIfScorer:
+    """Chấm "nếu ... thì giá bao nhiêu" cho nhiều nhà x nhiều giá trị của 1 feature, trả về 1 mảng (n_nhà x n_giá_trị).
+
+    - Pipeline tuyến tính (StandardScaler tùy chọn + mô hình có coef_ 1 chiều, vd LinearRegression/Ridge):
+      dự đoán gốc tính 1 lần, mỗi kịch bản chỉ là delta hạng 1: coef_j / scale_j x (giá trị mới - giá trị cũ),
+      cộng bằng broadcasting -> không dựng lại DataFrame, không gọi predict thêm.
+    - Mô hình khác (vd Random Forest): predict theo chunk, mỗi chunk là 1 ma trận (dòng x giá trị) dựng bằng np.repeat.
+
+    Giá trị ở không gian feature của mô hình (sau feature engineering). Feature đã log1p (vd Gr Liv Area):
+    log_feature=True -> values được hiểu theo đơn vị gốc (vd +200 sqft) rồi mới log1p lại.
+    inverse_target: hàm đưa dự đoán về đơn vị giá (vd np.expm1 khi target đã log1p).
+    """
+    def __init__(self, pipeline: Pipeline, inverse_target: Optional[Callable] = None, chunk_size=1_000_000):
+        self.pipeline = pipeline
+        self.inverse_target = inverse_target
+        self.chunk_size = chunk_size
+        self.feature_names = list(getattr(pipeline, "feature_names_in_", []))
+        self.weights_ = self._linear_weights()
+        logging.info(f"What-if scorer: {'delta hạng 1 (tuyến tính)' if self.is_linear else 'predict theo chunk'}.")
+
+    @property
+    def is_linear(self) -> bool:
+        return self.weights_ is not None
+
+    def _linear_weights(self) -> Optional[np.ndarray]:
+        """Hệ số theo đơn vị feature gốc (coef / scale) nếu pipeline là affine + tuyến tính, ngược lại None"""
+        *transformers, (_, estimator) = self.pipeline.steps
+        coef = getattr(estimator, "coef_", None)
+        if coef is None or np.ndim(coef) != 1:
+            return None
+        weights = np.asarray(coef, dtype=np.float64)
+        for _, transformer in transformers:
+            if not isinstance(transformer, StandardScaler):
+                return None
+            if transformer.scale_ is not None:
+                weights = weights / transformer.scale_
+        return weights
+
+    def _prepare(self, X: pd.DataFrame) -> pd.DataFrame:
+        return X[self.feature_names] if self.feature_names else X
+
+    def _finish(self, prices: np.ndarray) -> np.ndarray:
+        return self.inverse_target(prices) if self.inverse_target is not None else prices
+
+    @staticmethod
+    def _scenario_values(current: np.ndarray, values: np.ndarray, mode: str, log_feature: bool) -> np.ndarray:
+        """Giá trị feature mới cho mọi (nhà, kịch bản): (n x m)"""
+        if mode not in MODES:
+            raise ValueError(f"mode phải thuộc {MODES}, nhận được {mode}")
+        base = np.expm1(current) if log_feature else current
+        if mode == "set":
+            new = np.broadcast_to(values[None, :], (len(current), len(values)))
+        elif mode == "add":
+            new = base[:, None] + values[None, :]
+        else:
+            new = base[:, None] * values[None, :]
+        return np.log1p(new) if log_feature else new
+
+    def price_grid(self, X: pd.DataFrame, feature: str, values: Sequence[float], mode: str = "set",
+                   log_feature: bool = False) -> np.ndarray:
+        """Dự đoán (n_nhà x n_giá_trị) khi feature được đặt bằng / cộng thêm / nhân với từng giá trị trong values."""
+        X = self._prepare(X)
+        if feature not in X.columns:
+            raise KeyError(f"Không tìm thấy feature '{feature}' trong các cột của mô hình.")
+        values = np.asarray(values, dtype=np.float64)
+        current = X[feature].to_numpy(dtype=np.float64)
+        scenarios = self._scenario_values(current, values, mode, log_feature)
+
+        if self.is_linear:
+            baseline = np.asarray(self.pipeline.predict(X), dtype=np.float64)
+            weight = self.weights_[X.columns.get_loc(feature)]
+            grid = baseline[:, None] + weight * (scenarios - current[:, None])
+        else:
+            grid = self._chunked_predict(X, [X.columns.get_loc(feature)], scenarios[:, :, None])
+        return self._finish(grid)
+
+    def category_grid(self, X: pd.DataFrame, feature: str, levels: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Dự đoán (n_nhà x n_level) khi cột category đã one-hot (cột "<feature>_<level>") được đổi sang từng level.
+        Level bị drop khi OHE (drop='first') tương ứng với mọi cột dummy = 0, truyền bằng tên level đó."""
+        X = self._prepare(X)
+        prefix = f"{feature}_"
+        group = [col for col in X.columns if col.startswith(prefix)]
+        if not group:
+            raise KeyError(f"Không tìm thấy cột one-hot nào của '{feature}'.")
+        levels = list(levels) if levels is not None else [col[len(prefix):] for col in group]
+        # one_hot (m x g): vector dummy của từng level, level không có cột -> toàn 0 (level gốc)
+        one_hot = np.array([[col == prefix + level for col in group] for level in levels], dtype=np.float64)
+        positions = [X.columns.get_loc(col) for col in group]
+
+        if self.is_linear:
+            baseline = np.asarray(self.pipeline.predict(X), dtype=np.float64)
+            weights = self.weights_[positions]
+            current = X[group].to_numpy(dtype=np.float64) @ weights
+            grid = baseline[:, None] - current[:, None] + (one_hot @ weights)[None, :]
+        else:
+            scenarios = np.broadcast_to(one_hot[None, :, :], (len(X), len(levels), len(group)))
+            grid = self._chunked_predict(X, positions, scenarios)
+        return self._finish(grid)
+
+    def _chunked_predict(self, X: pd.DataFrame, positions: list, scenarios: np.ndarray) -> np.ndarray:
+        """scenarios (n x m x len(positions)): giá trị mới của các cột positions. Mỗi chunk gọi predict 1 lần."""
+        n_rows, n_scenarios = scenarios.shape[:2]
+        rows_per_chunk = max(1, self.chunk_size // max(n_scenarios, 1))
+        matrix = X.to_numpy(dtype=np.float64)
+        grid = np.empty((n_rows, n_scenarios), dtype=np.float64)
+        for start in range(0, n_rows, rows_per_chunk):
+            stop = min(start + rows_per_chunk, n_rows)
+            block = np.repeat(matrix[start:stop], n_scenarios, axis=0)
+            block[:, positions] = scenarios[start:stop].reshape(-1, len(positions))
+            prediction = self.pipeline.predict(pd.DataFrame(block, columns=X.columns, copy=False))
+            grid[start:stop] = np.asarray(prediction).reshape(stop - start, n_scenarios)
+        return grid
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,21 @@
+from typing import Annotated
+import logging
+import pandas as pd
+from materializer.comps_index_materializer import CompsIndexMaterializer
+from src.comps_index import CompsIndex
+from zenml import step
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+@step(enable_cache=False, output_materializers=CompsIndexMaterializer)
+def comps_index_step(
+    df: Annotated[pd.DataFrame, "clean_data"],
+    target_column: str,
+    id_column: str = "PID",
+    log_target: bool = True
+) -> Annotated[CompsIndex, "comps_index"]:
+    """Dựng index comps (k giao dịch lịch sử giống nhất) trên feature đã chuẩn hóa của dữ liệu train.
+    log_target: target của df đã log1p (như clean_data) -> giá bán của comps được lưu lại theo thang gốc."""
+    index = CompsIndex(id_column=id_column, target_column=target_column, log_target=log_target).fit(df)
+    logging.info(f"✅ Đã tạo comps index cho {len(index)} giao dịch.")
+    return index
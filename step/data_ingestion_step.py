@@ -1,12 +1,23 @@
 from zenml import step
+from zenml.steps import get_step_context
 from typing import Annotated
+import logging
 import pandas as pd
-from src.data_ingestion import DataIngestorFactory
+from src.data_ingestion import DataIngestorFactory, file_extension_of
+from materializer.dataframe_materializer import ArrowDataFrameMaterializer
 
-@step
+@step(output_materializers=ArrowDataFrameMaterializer)
 def data_ingestion_step(file_path: str) -> Annotated[pd.DataFrame, "raw_data"]:
-    """Đọc dữ liệu từ file zip."""
-    file_extension = ".zip"
+    """Đọc dữ liệu từ file zip/csv/csv.gz/parquet hoặc từ thư mục/glob nhiều shard."""
+    file_extension = file_extension_of(file_path)
     data_ingestion = DataIngestorFactory.get_data_ingestor(file_extension)
     df = data_ingestion.ingest(file_path)
+
+    # Ghi lại cách chia core của process pool khi đọc nhiều shard
+    allocation = getattr(data_ingestion, "allocation_", None)
+    if allocation is not None:
+        try:
+            get_step_context().add_output_metadata(output_name="raw_data", metadata={"resource_allocation": allocation.to_dict()})
+        except RuntimeError:
+            logging.warning("Không có step context (chạy local) -> bỏ qua log phân bổ tài nguyên.")
     return df
\ No newline at end of file
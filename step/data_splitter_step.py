@@ -1,52 +1,85 @@
-from typing import Tuple, Annotated
+from typing import Optional, Tuple, Annotated
+import numpy as np
 import pandas as pd
-from src.data_splitter import DataSplitter, SimpleTrainTestSplitStrategy
+from src.data_splitter import (
+    DataSplitter,
+    GroupShuffleSplitStrategy,
+    RandomIndexSplitStrategy,
+    SimpleTrainTestSplitStrategy,
+    StratifiedBinnedSplitStrategy,
+    TimeBasedSplitStrategy,
+    TrainingMatrix,
+)
+from materializer.dataframe_materializer import NumpyMemmapDataFrameMaterializer
+from materializer.training_matrix_materializer import TrainingMatrixMaterializer
 from zenml import step
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-@step(enable_cache=False)
+@step(enable_cache=False, output_materializers={
+    "train_matrix": TrainingMatrixMaterializer,
+    "X_test": NumpyMemmapDataFrameMaterializer,
+    "y_test": NumpyMemmapDataFrameMaterializer,
+})
 def data_splitter_step(
     df: Annotated[pd.DataFrame, "transformed_data"],
-    target_column: str
+    target_column: str,
+    strategy: str = "simple",
+    matrix_dtype: str = "float32",
+    groups: Optional[pd.Series] = None
 ) -> Tuple[
-    Annotated[pd.DataFrame, "X_train"],
-    Annotated[pd.DataFrame, "y_train"],
+    Annotated[TrainingMatrix, "train_matrix"],
     Annotated[pd.DataFrame, "X_test"],
     Annotated[pd.DataFrame, "y_test"]
 ]:
     """Chia dữ liệu thành train và test sets.
+
+    Tập train được ghi đúng 1 lần thành ma trận liền kề (matrix_dtype: "float32" hoặc "float64")
+    kèm danh sách cột -> model_building_step fit thẳng trên ma trận (memory-map) thay vì DataFrame.
+    strategy="group": cần groups (duplicate_groups của deduplication_step), các dòng gần trùng nằm cùng 1 phía.
     
     Returns:
-        Tuple theo thứ tự: X_train, y_train, X_test, y_test
+        Tuple theo thứ tự: train_matrix, X_test, y_test
     """
     logging.info("=" * 80)
     logging.info("BẮT ĐẦU DATA SPLITTER STEP")
     logging.info("=" * 80)
     
-    splitter = DataSplitter(strategy=SimpleTrainTestSplitStrategy())
+    if matrix_dtype not in ("float32", "float64"):
+        raise ValueError(f"matrix_dtype phải là float32 hoặc float64, nhận được {matrix_dtype}")
+
+    if strategy == "simple":
+        splitter = DataSplitter(strategy=SimpleTrainTestSplitStrategy())
+    elif strategy == "random_index":
+        splitter = DataSplitter(strategy=RandomIndexSplitStrategy())
+    elif strategy == "stratified":
+        splitter = DataSplitter(strategy=StratifiedBinnedSplitStrategy())
+    elif strategy == "time":
+        splitter = DataSplitter(strategy=TimeBasedSplitStrategy())
+    elif strategy == "group":
+        if groups is None:
+            raise ValueError("strategy='group' cần groups (id nhóm gần trùng theo index).")
+        splitter = DataSplitter(strategy=GroupShuffleSplitStrategy(groups))
+    else:
+        raise ValueError(f"Phương pháp không được hỗ trợ: {strategy}")
     X_train, y_train, X_test, y_test = splitter.split(df, target_column)
     
-    if isinstance(y_train, pd.Series):
-        y_train = y_train.to_frame(name=target_column)
-        logging.info("Đổi y_train thành DataFrame")
+    train_matrix = TrainingMatrix.from_frame(X_train, y_train, dtype=np.dtype(matrix_dtype))
     if isinstance(y_test, pd.Series):
         y_test = y_test.to_frame(name=target_column)
         logging.info("Đổi y_test thành DataFrame")
     
     logging.info("-------------------------------------------------------------------")
-    logging.info(f"  [0] X_train: {X_train.shape} - {X_train.columns[:3].tolist()}...")
-    logging.info(f"  [1] y_train: {y_train.shape} - {y_train.columns.tolist()}")
-    logging.info(f"  [2] X_test:  {X_test.shape} - {X_test.columns[:3].tolist()}...")
-    logging.info(f"  [3] y_test:  {y_test.shape} - {y_test.columns.tolist()}")
+    logging.info(f"  [0] train_matrix: {train_matrix.shape} {train_matrix.X.dtype} ({train_matrix.nbytes / 1e6:.1f} MB) - {train_matrix.columns[:3]}...")
+    logging.info(f"  [1] X_test:  {X_test.shape} - {X_test.columns[:3].tolist()}...")
+    logging.info(f"  [2] y_test:  {y_test.shape} - {y_test.columns.tolist()}")
 
-    assert y_train.shape[1] == 1, f"y_train phải có 1 cột, có {y_train.shape[1]}"
+    assert train_matrix.target_column == target_column, f"train_matrix target phải là {target_column}"
     assert y_test.shape[1] == 1, f"y_test phải có 1 cột, có {y_test.shape[1]}"
-    assert y_train.columns[0] == target_column, f"y_train column phải là {target_column}"
     assert y_test.columns[0] == target_column, f"y_test column phải là {target_column}"
     
     logging.info("Hoàn thành")
     logging.info("=" * 80)
 
-    return X_train, y_train, X_test, y_test
\ No newline at end of file
+    return train_matrix, X_test, y_test
\ No newline at end of file
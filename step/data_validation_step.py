@@ -0,0 +1,43 @@
+from typing import Annotated
+import logging
+import os
+import pandas as pd
+from src.data_validation import CONTRACT_PATH, SchemaContract
+from zenml import step
+from zenml.steps import get_step_context
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+@step(enable_cache=False)
+def data_validation_step(
+    df: Annotated[pd.DataFrame, "raw_data"],
+    contract_path: str = CONTRACT_PATH,
+    with_target: bool = True,
+    fail_on_error: bool = True
+) -> Annotated[dict, "validation_report"]:
+    """Kiểm tra dữ liệu thô theo hợp đồng schema ngay sau ingestion; có lỗi -> dừng run trước mọi bước tiền xử lý.
+
+    Chưa có file hợp đồng -> suy ra từ chính dữ liệu này và ghi ra contract_path (lần chạy đầu).
+    """
+    if not os.path.exists(contract_path):
+        logging.warning(f"Chưa có hợp đồng schema tại {contract_path} -> suy ra từ dữ liệu hiện tại.")
+        SchemaContract.infer(df).save(contract_path)
+    contract = SchemaContract.load(contract_path)
+
+    report = contract.validate(df, with_target=with_target)
+    summary = report.to_dict()
+    logging.info(f"Kiểm tra dữ liệu: {summary['n_errors']} lỗi, {summary['n_warnings']} cảnh báo "
+                 f"({summary['n_rows']} dòng x {summary['n_columns']} cột, {summary['duration_ms']:.1f} ms).")
+    if report.issues:
+        logging.info(f"\n{report.to_frame().to_string(index=False)}")
+
+    try:
+        get_step_context().add_output_metadata(output_name="validation_report", metadata={
+            key: value for key, value in summary.items() if key != "issues"
+        })
+    except RuntimeError:
+        logging.warning("Không có step context (chạy local) -> bỏ qua log metadata kiểm tra dữ liệu.")
+
+    if fail_on_error:
+        report.raise_for_errors()
+    return summary
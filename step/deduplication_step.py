@@ -0,0 +1,35 @@
+from typing import Annotated, Tuple
+import logging
+import pandas as pd
+from materializer.dataframe_materializer import ArrowDataFrameMaterializer
+from src.deduplication import DuplicateDetector
+from zenml import step
+from zenml.steps import get_step_context
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+@step(enable_cache=False, output_materializers={"deduplicated_data": ArrowDataFrameMaterializer})
+def deduplication_step(
+    df: Annotated[pd.DataFrame, "engineered_data"],
+    rtol: float = 0.02,
+    max_mismatch: int = 1,
+    drop_exact: bool = True
+) -> Tuple[
+    Annotated[pd.DataFrame, "deduplicated_data"],
+    Annotated[pd.Series, "duplicate_groups"]
+]:
+    """Bỏ tin đăng trùng tuyệt đối và gom các giao dịch gần trùng (cùng căn nhà bán lại) thành nhóm, trước bước outlier.
+
+    duplicate_groups (id nhóm theo index) được data_splitter_step(strategy="group") dùng để giữ cả nhóm
+    ở cùng phía train/test -> không rò rỉ cùng 1 căn nhà giữa X_train và X_test.
+    """
+    detector = DuplicateDetector(rtol=rtol, max_mismatch=max_mismatch)
+    deduplicated, groups, summary = detector.deduplicate(df, drop_exact=drop_exact)
+
+    try:
+        get_step_context().add_output_metadata(output_name="deduplicated_data", metadata={"deduplication": summary})
+    except RuntimeError:
+        logging.warning("Không có step context (chạy local) -> bỏ qua log metadata dedup.")
+
+    logging.info(f"✅ Dedup: bỏ {summary['exact_duplicates']} dòng trùng, {summary['near_duplicate_groups']} nhóm gần trùng.")
+    return deduplicated, groups
@@ -0,0 +1,24 @@
+from typing import Annotated, List, Optional
+import logging
+import pandas as pd
+from src.drift_monitor import DRIFT_EXCLUDE, FeatureReference
+from zenml import step
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+@step(enable_cache=False)
+def drift_reference_step(
+    df: Annotated[pd.DataFrame, "clean_data"],
+    target_column: str,
+    n_bins: int = 10,
+    exclude: Optional[List[str]] = None
+) -> Annotated[FeatureReference, "drift_reference"]:
+    """Lưu histogram tham chiếu từng feature + tần suất category của dữ liệu train cho drift monitor.
+
+    Ngoài target, mặc định bỏ qua DRIFT_EXCLUDE: cột định danh (Order, PID) và ngày bán (Yr Sold, Mo Sold)
+    luôn lệch với batch mới theo thời gian -> nếu profile, mỗi batch đều bị báo drift và xếp hàng retrain.
+    exclude: thay cho DRIFT_EXCLUDE (target luôn bị bỏ qua)."""
+    excluded = exclude if exclude is not None else DRIFT_EXCLUDE
+    reference = FeatureReference(n_bins=n_bins, exclude=[target_column, *excluded]).fit(df)
+    logging.info(f"✅ Đã tạo drift reference cho {len(reference.numeric_columns) + len(reference.categorical_columns)} feature.")
+    return reference
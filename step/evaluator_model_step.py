@@ -1,10 +1,13 @@
 
 from zenml import step, Model
+from zenml.client import Client
 from zenml.steps import get_step_context
 from typing import Annotated, Dict
 import logging
 import pandas as pd
 
+from src.evaluator_model import ChampionChallengerEvaluator
+
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import mean_squared_error, r2_score
 
@@ -26,17 +29,32 @@ def model_evaluator_step(
     trained_model: Annotated[Pipeline, "trained_model"],
     X_test: Annotated[pd.DataFrame, "X_test"],
     y_test: Annotated[pd.DataFrame, "y_test"],
+    mode: str = "champion_challenger",
+    r2_threshold: float = 0.85,
+    n_recent_versions: int = 3,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
 ) -> Annotated[Dict[str, float], "evaluation_metrics"]:
+    """Đánh giá mô hình vừa train và quyết định promote lên production.
+
+    mode="threshold": promote khi R² >= r2_threshold.
+    mode="champion_challenger": ngoài ngưỡng R², mô hình mới (challenger) phải thắng production hiện tại
+    (champion) trên bootstrap ghép cặp. n_recent_versions version gần nhất được chấm cùng lượt để so sánh.
+    """
 
     logging.info("BẮT ĐẦU MODEL EVALUATION STEP")
 
+    if mode not in ("threshold", "champion_challenger"):
+        raise ValueError(f"mode không được hỗ trợ: {mode}")
+
     # 1. Ensure y_test is Series
     if isinstance(y_test, pd.DataFrame):
         y_test = y_test.iloc[:, 0]
         logging.info("Converted y_test DataFrame -> Series")
 
-    # 2. Predict
-    y_pred = trained_model.predict(X_test)
+    # 2. Predict (X_test giữ đủ cột -> mô hình nào cũng được chấm trên chính các cột nó đã train)
+    columns = getattr(trained_model, "feature_names_in_", None)
+    y_pred = trained_model.predict(X_test if columns is None else X_test[list(columns)])
 
     # 3. Metrics
     mse = mean_squared_error(y_test, y_pred)
@@ -45,7 +63,16 @@ def model_evaluator_step(
     logging.info(f"✅ Evaluation finished | MSE={mse:.4f} | R²={r2:.4f}")
 
     # 4. STEP CONTEXT
-    step_context = get_step_context()
+    # Khi chạy local (pipeline/local_runner.py) không có step context
+    # -> chỉ trả về metrics, bỏ qua log metadata và promotion.
+    try:
+        step_context = get_step_context()
+    except RuntimeError:
+        logging.warning("Không có step context (chạy local) -> bỏ qua log metadata và promotion.")
+        return {
+            "mse": float(mse),
+            "r2": float(r2),
+        }
 
     # LOG METADATA → OUTPUT ARTIFACT (DASHBOARD HIỆN)
     step_context.add_output_metadata(
@@ -69,14 +96,21 @@ def model_evaluator_step(
             "r2": float(r2),
             "num_features": int(X_test.shape[1]),
             "num_test_samples": int(X_test.shape[0]),
-            "r2_threshold": 0.85,
+            "r2_threshold": r2_threshold,
         }
     )
 
     logging.info("Metrics đã được lưu vào Model Version metadata")
 
     # 6. Promotion logic
-    if r2 >= 0.85:
+    promote = r2 >= r2_threshold
+    if promote and mode == "champion_challenger":
+        promote = _challenger_wins(
+            trained_model, y_pred, X_test, y_test, model_version,
+            n_recent_versions=n_recent_versions, n_bootstrap=n_bootstrap, confidence=confidence,
+        )
+
+    if promote:
         model_version.set_stage("production", force=True)
         model_version.log_metadata({"promoted_to_production": True})
 
@@ -94,3 +128,67 @@ def model_evaluator_step(
         "mse": float(mse),
         "r2": float(r2),
     }
+
+
+def _load_pipeline(model_name: str, version) -> Pipeline:
+    """sklearn_pipeline của 1 model version. Version của run lỗi giữa chừng (vd dừng ở data_validation_step)
+    không có artifact này -> KeyError/RuntimeError/ValueError tùy chỗ lỗi."""
+    return Model(name=model_name, version=version).load_artifact("sklearn_pipeline")
+
+
+def _load_reference_models(model_version: Model, n_recent_versions: int) -> Dict[str, Pipeline]:
+    """Load mô hình production hiện tại + n_recent_versions version gần nhất (trừ version đang chạy)."""
+    models = {}
+    try:
+        production = Model(name=model_version.name, version="production")
+        production_number = production.number
+    except (KeyError, RuntimeError) as e:
+        logging.warning(f"Chưa có version production ({e}).")
+        production_number = None
+    if production_number is not None:
+        try:
+            models["production"] = _load_pipeline(model_version.name, production_number)
+        except (KeyError, RuntimeError, ValueError) as e:
+            # Có production nhưng không load được -> để _challenger_wins từ chối promote
+            logging.warning(f"Không load được sklearn_pipeline của production v{production_number} ({e}).")
+            models["production"] = None
+
+    versions = Client().list_model_versions(model=model_version.name, sort_by="desc:number", size=n_recent_versions + 2)
+    recent = [v for v in versions.items if v.number not in (model_version.number, production_number)]
+    for version in recent[:n_recent_versions]:
+        try:
+            models[f"v{version.number}"] = _load_pipeline(model_version.name, version.number)
+        except (KeyError, RuntimeError, ValueError):
+            # Version của run lỗi giữa chừng (vd dừng ở data_validation_step) không có sklearn_pipeline
+            logging.warning(f"Version {version.number} không có sklearn_pipeline -> bỏ qua.")
+    return models
+
+
+def _challenger_wins(trained_model: Pipeline, y_pred, X_test: pd.DataFrame, y_test: pd.Series, model_version: Model,
+                     n_recent_versions: int, n_bootstrap: int, confidence: float) -> bool:
+    """Chấm challenger cùng production và các version gần nhất trên cùng tập test, log bảng so sánh
+    vào metadata. Mỗi mô hình được chấm trên chính các cột nó đã train (feature_names_in_).
+
+    - Chưa từng có production -> challenger thắng (lần promote đầu tiên).
+    - Có production nhưng không load / không chấm được trên X_test -> fail closed, không promote.
+    """
+    references = _load_reference_models(model_version, n_recent_versions)
+    has_production = "production" in references
+    models = {"challenger": trained_model, **{name: model for name, model in references.items() if model is not None}}
+    evaluator = ChampionChallengerEvaluator(n_bootstrap=n_bootstrap, confidence=confidence)
+    leaderboard = evaluator.evaluate(models, X_test, y_test, predictions={"challenger": y_pred})
+    logging.info(f"Bảng so sánh:\n{leaderboard.to_string(float_format='%.4f')}")
+
+    comparison = {"leaderboard": leaderboard.round(6).to_dict(orient="index")}
+    if "production" in evaluator.names_:
+        comparison.update(evaluator.compare("challenger", "production"))
+        wins = comparison["challenger_wins"]
+    elif has_production:
+        logging.warning("Có mô hình production nhưng không chấm được trên tập test -> không promote.")
+        comparison["challenger_wins"] = False
+        wins = False
+    else:
+        logging.warning("Chưa có mô hình production -> challenger được promote lần đầu.")
+        wins = True
+    model_version.log_metadata({"champion_challenger": comparison})
+    return wins
@@ -1,33 +1,76 @@
-from zenml import step
+from zenml import save_artifact, step
+from zenml.steps import get_step_context
 from typing import Annotated, Optional # ✅ THÊM Optional
+import logging
 import pandas as pd
 from src.feature_engineering import (
     FeatureEngineer,
+    HashingEncoding,
     LogTransformation,
     MinMaxScaling,
     OneHotEncoding,
+    RareCategoryOneHotEncoding,
     StandardScaling,
+    TargetEncoding,
 )
+from materializer.dataframe_materializer import ArrowDataFrameMaterializer
+from src.compute_backend import apply_to_frame
 
-@step
+"""Strategy có trạng thái đã fit (level / mapping target) -> tên artifact lưu encoder để dùng lại lúc inference"""
+ENCODER_ARTIFACTS = {
+    "rare_onehot_encoding": "rare_onehot_encoder",
+    "target_encoding": "target_encoder",
+}
+
+@step(output_materializers=ArrowDataFrameMaterializer)
 def feature_engineering_step(
     df: Annotated[pd.DataFrame, "outlier_removed_data"],
     strategy: str = "log",
-    features: Optional[list] = None 
+    features: Optional[list] = None,
+    min_frequency: float = 0.01,
+    n_buckets: int = 64,
+    target_column: str = "SalePrice",
+    backend: str = "pandas"
 ) -> Annotated[pd.DataFrame, "transformed_data"]:
-    """Áp dụng feature engineering."""
+    """Áp dụng feature engineering.
+
+    backend="arrow": log / scaling / OneHot chạy bằng pyarrow.compute (src/compute_backend.py),
+    đầu vào / đầu ra của step vẫn là DataFrame.
+
+    strategy="rare_onehot_encoding" / "target_encoding": encoder đã fit (level giữ lại / mapping target) được lưu
+    thành artifact "rare_onehot_encoder" / "target_encoder" -> lúc inference load lại bằng encoder_loader,
+    level mới rơi vào other_label / giá trị trung bình thay vì fit lại trên dữ liệu scoring.
+    """
     features_list = features if features is not None else [] 
+    encoder = None
 
     if strategy == "log":
-        engineer = FeatureEngineer(LogTransformation(features_list))
+        engineer = FeatureEngineer(LogTransformation(features_list), backend=backend)
     elif strategy == "standard_scaling":
-        engineer = FeatureEngineer(StandardScaling(features_list))
+        engineer = FeatureEngineer(StandardScaling(features_list), backend=backend)
     elif strategy == "minmax_scaling":
-        engineer = FeatureEngineer(MinMaxScaling(features_list))
+        engineer = FeatureEngineer(MinMaxScaling(features_list), backend=backend)
     elif strategy == "onehot_encoding":
-        engineer = FeatureEngineer(OneHotEncoding(features_list))
+        engineer = FeatureEngineer(OneHotEncoding(features_list), backend=backend)
+    elif strategy == "rare_onehot_encoding":
+        encoder = RareCategoryOneHotEncoding(features_list, min_frequency=min_frequency)
+        engineer = FeatureEngineer(encoder, backend=backend)
+    elif strategy == "hashing_encoding":
+        engineer = FeatureEngineer(HashingEncoding(features_list, n_buckets=n_buckets), backend=backend)
+    elif strategy == "target_encoding":
+        encoder = TargetEncoding(features_list, target_column=target_column)
+        engineer = FeatureEngineer(encoder, backend=backend)
     else:
         raise ValueError(f"Phương pháp không được hỗ trợ: {strategy}")
 
-    transformed_df = engineer.apply_Transform(df)
-    return transformed_df
\ No newline at end of file
+    transformed_df = apply_to_frame(backend, engineer.apply_Transform, df)
+
+    if encoder is not None:
+        artifact_name = ENCODER_ARTIFACTS[strategy]
+        try:
+            get_step_context()
+            save_artifact(encoder, name=artifact_name)
+            logging.info(f"Encoder đã fit được lưu thành artifact {artifact_name}")
+        except RuntimeError:
+            logging.warning(f"Không có step context (chạy local) -> bỏ qua lưu {artifact_name}.")
+    return transformed_df
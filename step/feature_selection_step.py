@@ -0,0 +1,88 @@
+from typing import Annotated, Optional, Tuple
+import logging
+import time
+import pandas as pd
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from src.data_splitter import TrainingMatrix
+from src.feature_selection import (
+    CorrelationPruningSelection,
+    FeatureSelector,
+    L1Selection,
+    VarianceThresholdSelection,
+)
+from materializer.training_matrix_materializer import TrainingMatrixMaterializer
+from zenml import step
+from zenml.steps import get_step_context
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+def _fit_predict_time(X: pd.DataFrame, y: pd.Series) -> Tuple[float, float]:
+    """Thời gian fit và predict của pipeline StandardScaler + LinearRegression trên X"""
+    pipeline = Pipeline([("scaler", StandardScaler()), ("model", LinearRegression())])
+    start = time.perf_counter()
+    pipeline.fit(X, y)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    pipeline.predict(X)
+    return fit_time, time.perf_counter() - start
+
+@step(enable_cache=False, output_materializers=TrainingMatrixMaterializer)
+def feature_selection_step(
+    train_matrix: Annotated[TrainingMatrix, "train_matrix"],
+    variance_threshold: float = 0.01,
+    correlation_threshold: float = 0.95,
+    l1_alpha: Optional[float] = None,
+    report_speedup: bool = True,
+) -> Annotated[TrainingMatrix, "selected_train_matrix"]:
+    """Thu hẹp ma trận feature sau OHE: variance threshold -> correlation pruning -> (tùy chọn) L1.
+
+    Chạy sau data_splitter_step: các strategy chỉ được fit trên tập train (thứ tự theo tương quan với target,
+    L1 đều dùng nhãn) -> nhãn của tập test không ảnh hưởng cột nào được giữ.
+    Danh sách cột được chọn đi theo mô hình (feature_names_in_): evaluator / feature store / explainer
+    cắt X theo feature_names_in_ nên không cần artifact danh sách cột riêng.
+
+    Returns:
+        TrainingMatrix: ma trận train chỉ gồm các cột được chọn
+    """
+    target_column = train_matrix.target_column
+    X_train, y_train = train_matrix.to_frame()
+    train_df = X_train.assign(**{target_column: y_train})
+    logging.info(f"Bắt đầu bước chọn feature trên tập train, shape: {train_df.shape}")
+    n_features = len(train_matrix.columns)
+
+    strategies = [
+        VarianceThresholdSelection(threshold=variance_threshold),
+        CorrelationPruningSelection(threshold=correlation_threshold),
+    ]
+    if l1_alpha is not None:
+        strategies.append(L1Selection(alpha=l1_alpha))
+
+    selected_features = list(train_matrix.columns)
+    selector = FeatureSelector(strategies[0])
+    for strategy in strategies:
+        selector.set_strategy(strategy)
+        selected_features = selector.select(train_df[selected_features + [target_column]], target_column)
+
+    selected_matrix = train_matrix.select_columns(selected_features)
+    logging.info(f"✅ Giữ {len(selected_features)}/{n_features} cột ({1 - len(selected_features) / n_features:.1%} giảm độ rộng).")
+
+    metadata = {
+        "num_features_before": int(n_features),
+        "num_features_after": len(selected_features),
+        "selected_features": selected_features,
+    }
+    if report_speedup:
+        fit_full, predict_full = _fit_predict_time(X_train, y_train)
+        fit_selected, predict_selected = _fit_predict_time(X_train[selected_features], y_train)
+        metadata["fit_speedup"] = fit_full / fit_selected
+        metadata["predict_speedup"] = predict_full / predict_selected
+        logging.info(f"Fit nhanh {metadata['fit_speedup']:.2f}x, predict nhanh {metadata['predict_speedup']:.2f}x so với đủ cột.")
+
+    try:
+        get_step_context().add_output_metadata(output_name="selected_train_matrix", metadata=metadata)
+    except RuntimeError:
+        logging.warning("Không có step context (chạy local) -> bỏ qua log metadata.")
+
+    return selected_matrix
@@ -0,0 +1,34 @@
+from typing import Annotated
+import logging
+import pandas as pd
+from src.feature_store import FEATURE_STORE_PATH, FeatureStore
+from zenml import step
+from zenml.steps import get_step_context
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+@step(enable_cache=False)
+def feature_store_step(
+    df: pd.DataFrame,
+    name: str,
+    key: str = "PID",
+    store_path: str = FEATURE_STORE_PATH,
+    keep_versions: int = 5
+) -> Annotated[dict, "feature_store_version"]:
+    """Ghi các dòng đã tiền xử lý (engineered_data / clean_data) vào feature store theo PID, 1 version / pipeline run
+    -> scoring căn nhà đã biết chỉ cần FeatureStore.get_features(pids), không chạy lại tiền xử lý."""
+    try:
+        run_id = str(get_step_context().pipeline_run.id)
+    except RuntimeError:
+        logging.warning("Không có step context (chạy local) -> version feature store không gắn với pipeline run.")
+        run_id = None
+
+    store = FeatureStore(store_path)
+    try:
+        version = store.write(df, name=name, run_id=run_id, key=key)
+        store.prune(name, keep=keep_versions)
+    finally:
+        store.close()
+
+    logging.info(f"✅ Feature store: '{name}' version {version} ({len(df)} dòng).")
+    return {"name": name, "version": version, "run_id": run_id, "n_rows": len(df), "store_path": store_path}
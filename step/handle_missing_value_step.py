@@ -30,30 +30,61 @@
 #     return cleaned_df
 
 from typing import Annotated, Optional # <-- THÊM Optional
+import logging
 import pandas as pd
 from src.handle_missing_values import (
     DropMissingValueStrategy,
     FillMissingValuesStrategy,
+    IterativeImputationStrategy,
+    KNNImputationStrategy,
     MissingValueHandler,
 )
-from zenml import step
+from materializer.dataframe_materializer import ArrowDataFrameMaterializer
+from src.compute_backend import apply_to_frame
+from zenml import save_artifact, step
+from zenml.steps import get_step_context
 
-@step
+@step(output_materializers=ArrowDataFrameMaterializer)
 def handle_missing_values_step(
     df: Annotated[pd.DataFrame, "raw_data"],
     strategy: str = "mean",
-    fill_value: Optional[str] = None 
+    fill_value: Optional[str] = None,
+    n_neighbors: int = 5,
+    n_jobs: int = 1,
+    backend: str = "pandas"
 ) -> Annotated[pd.DataFrame, "clean_data"]:
-    """Xử lý các giá trị thiếu."""
+    """Xử lý các giá trị thiếu.
+
+    backend="arrow": mean/median/mode/constant/drop chạy bằng pyarrow.compute (src/compute_backend.py),
+    đầu vào / đầu ra của step vẫn là DataFrame.
+
+    strategy="knn" / "iterative": imputer đã fit (index láng giềng / các mô hình hồi quy) được lưu thành
+    artifact "knn_imputer" / "iterative_imputer" -> lúc scoring load lại, không quét lại dữ liệu train.
+    """
+    imputer = None
     if strategy == "drop":
-        handler = MissingValueHandler(DropMissingValueStrategy(axis=0))
+        handler = MissingValueHandler(DropMissingValueStrategy(axis=0), backend=backend)
     elif strategy in ["mean", "median", "mode"]:
-        handler = MissingValueHandler(FillMissingValuesStrategy(method=strategy))
+        handler = MissingValueHandler(FillMissingValuesStrategy(method=strategy), backend=backend)
     elif strategy == "constant":
         # Truyền fill_value
-        handler = MissingValueHandler(FillMissingValuesStrategy(method=strategy, fill_value=fill_value))
+        handler = MissingValueHandler(FillMissingValuesStrategy(method=strategy, fill_value=fill_value), backend=backend)
+    elif strategy == "knn":
+        imputer = KNNImputationStrategy(n_neighbors=n_neighbors, n_jobs=n_jobs)
+        handler = MissingValueHandler(imputer, backend=backend)
+    elif strategy == "iterative":
+        imputer = IterativeImputationStrategy()
+        handler = MissingValueHandler(imputer, backend=backend)
     else:
         raise ValueError(f"Phương pháp không được hỗ trợ: {strategy}")
 
-    cleaned_df = handler.handle_missing_value(df)
+    cleaned_df = apply_to_frame(backend, handler.handle_missing_value, df)
+
+    if imputer is not None:
+        try:
+            get_step_context()
+            save_artifact(imputer, name=f"{strategy}_imputer")
+            logging.info(f"Imputer đã fit được lưu thành artifact {strategy}_imputer")
+        except RuntimeError:
+            logging.warning(f"Không có step context (chạy local) -> bỏ qua lưu {strategy}_imputer.")
     return cleaned_df
\ No newline at end of file
@@ -0,0 +1,28 @@
+from typing import Annotated, Tuple
+import logging
+import pandas as pd
+from materializer.dataframe_materializer import ArrowDataFrameMaterializer
+from src.incremental_ingestion import INCREMENTAL_STATE_DIR, IncrementalIngestor
+from zenml import step
+from zenml.steps import get_step_context
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+@step(enable_cache=False, output_materializers={"clean_data": ArrowDataFrameMaterializer})
+def incremental_ingestion_step(
+    df: Annotated[pd.DataFrame, "raw_data"],
+    state_dir: str = INCREMENTAL_STATE_DIR,
+    refit: bool = False
+) -> Tuple[
+    Annotated[pd.DataFrame, "clean_data"],
+    Annotated[dict, "delta_summary"]
+]:
+    """Chỉ đưa các dòng (theo PID) thêm mới / thay đổi qua điền thiếu, OneHot, log, lọc outlier bằng trạng thái
+    đã fit lần trước, rồi ghép vào bảng đã xử lý lưu trong state_dir. refit=True -> fit lại trên toàn bộ dữ liệu."""
+    clean_data, summary = IncrementalIngestor(state_dir=state_dir).run(df, refit=refit)
+    try:
+        get_step_context().add_output_metadata(output_name="clean_data", metadata={"delta": summary})
+    except RuntimeError:
+        logging.warning("Không có step context (chạy local) -> bỏ qua log delta.")
+    logging.info(f"✅ clean_data: {clean_data.shape[0]} dòng ({summary['mode']}, xử lý {summary['processed_rows']} dòng).")
+    return clean_data, summary
@@ -1,9 +1,12 @@
-from typing import Annotated
-import pandas as pd
-from sklearn.linear_model import LinearRegression
+from typing import Annotated, Optional
+import numpy as np
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import StandardScaler
+from src.data_splitter import TrainingMatrix
+from src.model_bulding import LinearRegressionStratery, ModelBuilder
+from src.resource_control import ResourceController
+from src.segmented_model import SegmentedModelStrategy
 from zenml import step, Model
+from zenml.steps import get_step_context
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -17,51 +20,47 @@ model = Model(
 
 @step(enable_cache=False, model=model)
 def model_building_step(
-    X_train: Annotated[pd.DataFrame, "X_train"],
-    y_train: Annotated[pd.DataFrame, "y_train"]
+    train_matrix: Annotated[TrainingMatrix, "train_matrix"],
+    segment_column: Optional[str] = None,
+    min_segment_size: int = 100
 ) -> Annotated[Pipeline, "sklearn_pipeline"]:
-    """Xây dựng và train mô hình Linear Regression."""
+    """Xây dựng và train mô hình Linear Regression trực tiếp trên ma trận train (memory-map).
+
+    segment_column (vd "Neighborhood", "MS Zoning"): train thêm 1 mô hình cho mỗi segment đủ min_segment_size dòng
+    (song song trong process pool), lưu chung thành 1 Pipeline định tuyến theo segment.
+    """
     logging.info("=" * 80)
     logging.info("BẮT ĐẦU MODEL BUILDING STEP")
     logging.info("=" * 80)
     
-    logging.info(f"[INPUT] X_train - Shape: {X_train.shape}, Type: {type(X_train).__name__}")
-    if hasattr(X_train, 'columns'):
-        logging.info(f"        First 5 columns: {X_train.columns.tolist()[:5]}")
-    
-    logging.info(f"[INPUT] y_train - Shape: {y_train.shape}, Type: {type(y_train).__name__}")
-    if hasattr(y_train, 'columns'):
-        logging.info(f"        Columns: {y_train.columns.tolist()}")
-    
-    logging.info("=" * 80)
-
-    if not isinstance(X_train, pd.DataFrame):
-        raise TypeError(f"X_train phải là DataFrame, nhận được {type(X_train)}")
-    if not isinstance(y_train, pd.DataFrame):
-        raise TypeError(f"y_train phải là DataFrame, nhận được {type(y_train)}")
+    if not isinstance(train_matrix, TrainingMatrix):
+        raise TypeError(f"train_matrix phải là TrainingMatrix, nhận được {type(train_matrix)}")
 
-    if y_train.shape[1] != 1:
-        raise ValueError(
-            f"   y_train phải có đúng 1 cột, nhận được {y_train.shape[1]} cột.\n"
-            f"   Columns: {y_train.columns.tolist()}\n"
-            f"   Có thể ZenML đã load nhầm artifact!"
-        )
-
-    y_train_series = y_train.iloc[:, 0]
-    logging.info(f"Converted y_train to Series: {y_train_series.shape}")
-    
-    # Xây dựng pipeline
-    pipeline = Pipeline(
-        steps=[
-            ("scaler", StandardScaler()),
-            ("model", LinearRegression())
-        ]
-    )
+    logging.info(f"[INPUT] X - Shape: {train_matrix.shape}, dtype: {train_matrix.X.dtype}, "
+                 f"memory-map: {isinstance(train_matrix.X, np.memmap)}")
+    logging.info(f"        First 5 columns: {train_matrix.columns[:5]}")
+    logging.info(f"[INPUT] y - Shape: {train_matrix.y.shape}, target: {train_matrix.target_column}")
+    logging.info("=" * 80)
 
-    # Huấn luyện mô hình
+    controller = ResourceController()
     logging.info("Bắt đầu train mô hình...")
-    pipeline.fit(X_train, y_train_series)
+    if segment_column is not None:
+        # Mỗi segment 1 task -> SegmentedModelStrategy tự chia ngân sách core cho process pool
+        strategy = SegmentedModelStrategy(segment_column=segment_column, min_segment_size=min_segment_size, controller=controller)
+        pipeline = ModelBuilder(strategy).build_model_from_matrix(train_matrix)
+        metadata = {"segment_column": segment_column, "segments": pipeline[-1].segments_}
+    else:
+        # Huấn luyện mô hình: 1 task -> toàn bộ ngân sách core cho BLAS
+        allocation = controller.allocate(n_tasks=1)
+        with controller.limit(allocation):
+            pipeline = ModelBuilder(LinearRegressionStratery()).build_model_from_matrix(train_matrix)
+        metadata = {"resource_allocation": allocation.to_dict()}
     logging.info("Hoàn tất train mô hình")
+
+    try:
+        get_step_context().add_output_metadata(output_name="sklearn_pipeline", metadata=metadata)
+    except RuntimeError:
+        logging.warning("Không có step context (chạy local) -> bỏ qua log metadata mô hình.")
     logging.info("=" * 80)
     
-    return pipeline
\ No newline at end of file
+    return pipeline
@@ -1,4 +1,9 @@
 from sklearn.pipeline import Pipeline
+from src.comps_index import CompsIndex
+from src.feature_engineering import FeatureEngineeringStrategy
+from src.handle_missing_values import MissingValueHandlingStrategy
+from src.outlier_detection import WinsorizationCapper
+from step.feature_engineering_step import ENCODER_ARTIFACTS
 from zenml import Model, step
 from typing import Annotated
 import logging
@@ -17,4 +22,41 @@ def model_loader(model_name: str) -> Annotated[Pipeline, "loaded_model"]:
     model_pipeline: Pipeline = model.load_artifact("sklearn_pipeline")
 
     logging.info(f"Mô hình {model_name} đã được load thành công.")
-    return model_pipeline
\ No newline at end of file
+    return model_pipeline
+
+@step
+def outlier_capper_loader(model_name: str) -> Annotated[WinsorizationCapper, "loaded_outlier_capper"]:
+    """Load biên winsorize đã học lúc train (khi outlier_detection_step chạy với strategy="cap")."""
+    logging.info(f"Đang load outlier_capper của mô hình production: {model_name}")
+    capper: WinsorizationCapper = Model(name=model_name, version="production").load_artifact("outlier_capper")
+    logging.info(f"Đã load biên winsorize cho {len(capper.columns_)} cột.")
+    return capper
+
+
+@step
+def imputer_loader(model_name: str, strategy: str = "knn") -> Annotated[MissingValueHandlingStrategy, "loaded_imputer"]:
+    """Load imputer đã fit lúc train (handle_missing_values_step với strategy="knn" hoặc "iterative")."""
+    logging.info(f"Đang load {strategy}_imputer của mô hình production: {model_name}")
+    imputer: MissingValueHandlingStrategy = Model(name=model_name, version="production").load_artifact(f"{strategy}_imputer")
+    logging.info(f"Đã load {type(imputer).__name__}.")
+    return imputer
+
+
+@step
+def encoder_loader(model_name: str, strategy: str = "rare_onehot_encoding") -> Annotated[FeatureEngineeringStrategy, "loaded_encoder"]:
+    """Load encoder đã fit lúc train (feature_engineering_step với strategy="rare_onehot_encoding" hoặc "target_encoding")."""
+    if strategy not in ENCODER_ARTIFACTS:
+        raise ValueError(f"Strategy {strategy} không lưu encoder, chỉ hỗ trợ: {list(ENCODER_ARTIFACTS)}")
+    logging.info(f"Đang load {ENCODER_ARTIFACTS[strategy]} của mô hình production: {model_name}")
+    encoder: FeatureEngineeringStrategy = Model(name=model_name, version="production").load_artifact(ENCODER_ARTIFACTS[strategy])
+    logging.info(f"Đã load {type(encoder).__name__}.")
+    return encoder
+
+
+@step
+def comps_index_loader(model_name: str) -> Annotated[CompsIndex, "loaded_comps_index"]:
+    """Load comps index đã dựng lúc train (memory-map khi artifact store là ổ đĩa local)."""
+    logging.info(f"Đang load comps_index của mô hình production: {model_name}")
+    index: CompsIndex = Model(name=model_name, version="production").load_artifact("comps_index")
+    logging.info(f"Đã load comps index với {len(index)} giao dịch.")
+    return index
@@ -52,19 +52,37 @@
     
 #     return df_cleaned
 
-from typing import Annotated
+from typing import Annotated, List, Optional
 import logging
 import pandas as pd
-from src.outlier_detection import OutlierDetector, ZScoreOutlierDetection
-from zenml import step
+from src.compute_backend import apply_to_frame
+from src.deduplication import ID_COLUMNS
+from src.handle_missing_values import DEFAULT_EXCLUDE
+from src.outlier_detection import IQROutlierDetection, OutlierDetector, WinsorizationCapper, ZScoreOutlierDetection
+from materializer.dataframe_materializer import ArrowDataFrameMaterializer
+from zenml import save_artifact, step
+from zenml.steps import get_step_context
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-@step(enable_cache=False)
+@step(enable_cache=False, output_materializers=ArrowDataFrameMaterializer)
 def outlier_detection_step(
     df: Annotated[pd.DataFrame, "clean_data"],
+    strategy: str = "zscore",
+    lower_quantile: float = 0.01,
+    upper_quantile: float = 0.99,
+    cap_exclude: Optional[List[str]] = None,
+    backend: str = "pandas",
 ) -> Annotated[pd.DataFrame, "outlier_removed_data"]:
-    """Phát hiện và loại bỏ outliers."""
+    """Phát hiện và loại bỏ outliers.
+
+    strategy="cap": không xóa dòng mà winsorize các cột continuous theo biên (lower_quantile, upper_quantile)
+    học trên dữ liệu train. Biên được lưu thành artifact "outlier_capper" gắn với model version
+    -> lúc scoring load lại và chỉ cần 1 lần np.clip, không tính lại quantile.
+    cap_exclude: cột không bao giờ bị winsorize, mặc định target + cột định danh (SalePrice, Order, PID).
+    backend="arrow": mask z-score / IQR được tính bằng pyarrow.compute (src/compute_backend.py); strategy="cap"
+    luôn dùng WinsorizationCapper (pandas) vì biên cần được lưu lại.
+    """
     logging.info(f"Bắt đầu bước phát hiện outlier, DataFrame shape: {df.shape}")
     
     # 1. Xác định các cột liên tục (Continuous Features)
@@ -83,13 +101,33 @@ def outlier_detection_step(
 
     # 2. Áp dụng Outlier Detection chỉ trên các cột Continuous
     df_continuous = df[continuous_cols]
+
+    if strategy == "cap":
+        # Không winsorize nhãn và khóa PID/Order (comps index, feature store, dedup dùng các khóa này)
+        excluded = set(cap_exclude if cap_exclude is not None else DEFAULT_EXCLUDE)
+        capped_cols = [col for col in continuous_cols if col not in excluded]
+        capper = WinsorizationCapper(lower_quantile=lower_quantile, upper_quantile=upper_quantile).fit(df[capped_cols])
+        df_capped = capper.transform(df)
+        try:
+            get_step_context()
+            save_artifact(capper, name="outlier_capper")
+            logging.info("Biên winsorize đã được lưu thành artifact outlier_capper")
+        except RuntimeError:
+            logging.warning("Không có step context (chạy local) -> bỏ qua lưu outlier_capper.")
+        logging.info(f"✅ Outlier capped. Rows: {df_capped.shape[0]}")
+        return df_capped
     
-    # Sử dụng ZScoreOutlierDetection (threshold=3)
-    outlier_detector = OutlierDetector(ZScoreOutlierDetection(threshold=3))
+    if strategy == "zscore":
+        # Sử dụng ZScoreOutlierDetection (threshold=3)
+        outlier_detector = OutlierDetector(ZScoreOutlierDetection(threshold=3), backend=backend)
+    elif strategy == "iqr":
+        outlier_detector = OutlierDetector(IQROutlierDetection(), backend=backend)
+    else:
+        raise ValueError(f"Phương pháp không được hỗ trợ: {strategy}")
     
-    # Lấy mask outliers (True nếu là outlier)
+    # Lấy mask outliers (True nếu là outlier); cột định danh (Order, PID) không phải phân phối cần lọc
     # df_continuous.shape: (2930, X)
-    outliers_mask = outlier_detector.detected_outlier(df_continuous) 
+    outliers_mask = apply_to_frame(backend, outlier_detector.detected_outlier, df_continuous.drop(columns=ID_COLUMNS, errors="ignore")) 
     
     # Chỉ loại bỏ hàng nếu nó là outlier TRONG BẤT KỲ cột continuous nào
     outliers_to_remove = outliers_mask.any(axis=1) 